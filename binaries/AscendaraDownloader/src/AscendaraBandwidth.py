@@ -0,0 +1,105 @@
+# ==============================================================================
+# Ascendara Bandwidth
+# ==============================================================================
+# Token-bucket bandwidth limiter shared by every download thread of a process
+# and, through small lease files in a coordination directory, by every running
+# Ascendara download process. The user's downloadLimit is split between the
+# processes that are actively transferring, so the total stays under the cap.
+
+
+
+
+
+
+
+
+
+import os
+import time
+import atexit
+import logging
+from threading import Lock
+
+LEASE_SUFFIX = ".lease"
+LEASE_TTL = 5.0  # A process that hasn't transferred for this long no longer counts
+REFRESH_INTERVAL = 1.0  # How often the share of the global budget is recomputed
+
+
+class BandwidthLimiter:
+    def __init__(self, limit_kbps, coordination_dir):
+        self.limit = limit_kbps * 1024 if limit_kbps and limit_kbps > 0 else 0
+        self.rate = self.limit  # This process's share in bytes per second
+        self._lease_dir = os.path.join(coordination_dir, "bandwidth")
+        self._lease_path = os.path.join(self._lease_dir, f"{os.getpid()}{LEASE_SUFFIX}")
+        self._last = time.monotonic()
+        self._last_refresh = -REFRESH_INTERVAL
+        self.transferred = 0  # Every byte the downloads of this process received
+        self._lock = Lock()
+        if self.limit:
+            try:
+                os.makedirs(self._lease_dir, exist_ok=True)
+                atexit.register(self.close)
+            except OSError as e:
+                logging.warning(f"[AscendaraBandwidth] Could not create {self._lease_dir}, limiting this process only: {e}")
+                self._lease_dir = None
+            # Register our lease right away so other processes see us before our first chunk
+            self._refresh(self._last)
+        self._tokens = self.rate
+
+    def share(self):
+        """Bytes per second this process may currently use (0 means unlimited)."""
+        if self.limit:
+            with self._lock:
+                self._refresh(time.monotonic())
+        return self.rate
+
+    def consume(self, amount):
+        """Block until amount bytes fit in this process's share of the budget."""
+        with self._lock:
+            self.transferred += amount
+            if not self.limit:
+                return
+            now = time.monotonic()
+            self._refresh(now)
+            # Refill at most one second worth of burst, then go into debt for this chunk
+            self._tokens = min(self.rate, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            self._tokens -= amount
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0
+        if wait > 0:
+            time.sleep(wait)
+
+    def _refresh(self, now):
+        if not self._lease_dir or now - self._last_refresh < REFRESH_INTERVAL:
+            return
+        self._last_refresh = now
+        try:
+            # Heartbeat our own lease, then count the leases that are still fresh
+            with open(self._lease_path, 'a'):
+                pass
+            os.utime(self._lease_path)
+            wall_now = time.time()
+            active = 0
+            for entry in os.scandir(self._lease_dir):
+                if not entry.name.endswith(LEASE_SUFFIX):
+                    continue
+                try:
+                    if wall_now - entry.stat().st_mtime <= LEASE_TTL:
+                        active += 1
+                    elif wall_now - entry.stat().st_mtime > LEASE_TTL * 12:
+                        os.remove(entry.path)  # Left behind by a process that crashed
+                except OSError:
+                    continue
+            rate = self.limit / max(active, 1)
+            if rate != self.rate:
+                logging.info(f"[AscendaraBandwidth] {active} active download(s), using {rate / 1024:.0f} KB/s of {self.limit / 1024:.0f} KB/s")
+                self.rate = rate
+        except OSError as e:
+            logging.warning(f"[AscendaraBandwidth] Could not update bandwidth lease: {e}")
+
+    def close(self):
+        try:
+            if os.path.exists(self._lease_path):
+                os.remove(self._lease_path)
+        except OSError:
+            pass
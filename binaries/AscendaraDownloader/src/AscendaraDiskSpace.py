@@ -0,0 +1,165 @@
+# ==============================================================================
+# Ascendara Disk Space
+# ==============================================================================
+# Free space preflight and file preallocation for the downloader binaries. A
+# release needs room for its archives and their extracted contents at the
+# same time, so that total is checked against the free space of the game
+# folder before the transfer starts rather than discovered as ENOSPC hours
+# later. Downloads reserve their full size on disk up front where the OS can.
+
+
+
+
+
+
+
+
+
+import os
+import sys
+import errno
+import shutil
+import logging
+from AscendaraExtraction import archive_kind
+
+SAFETY_MARGIN = 256 * 1024 * 1024  # Left free for the filemap, logs and everything else on the drive
+# Extracted bytes per archive byte when the archive index isn't known; game data rarely compresses much
+EXTRACTION_RATIO = 1.0
+ERROR_HANDLE_DISK_FULL = 39
+ERROR_DISK_FULL = 112
+ERROR_NOT_ALL_ASSIGNED = 1300
+
+_valid_data_allowed = None  # Whether this process may call SetFileValidData, once checked
+
+
+def _format_size(size):
+    for unit in ("B", "KB", "MB", "GB", "TB"):
+        if size < 1024 or unit == "TB":
+            return f"{size:.2f} {unit}"
+        size /= 1024.0
+
+
+class InsufficientSpaceError(OSError):
+    """ENOSPC raised before anything is written; its message matches the app's out-of-space error."""
+    def __init__(self, path, required, free):
+        super().__init__(errno.ENOSPC, "No space left on device", path)
+        self.required = required
+        self.free = free
+
+    def __str__(self):
+        return (f"[Errno {errno.ENOSPC}] No space left on device: {_format_size(self.required)} needed "
+                f"in {self.filename}, {_format_size(self.free)} free")
+
+
+def free_space(path):
+    """Free bytes on the drive holding path, which may not exist yet."""
+    path = os.path.abspath(path)
+    while not os.path.exists(path) and os.path.dirname(path) != path:
+        path = os.path.dirname(path)
+    return shutil.disk_usage(path).free
+
+
+def extraction_estimate(filename, size):
+    """Bytes the contents of an archive or archive volume are expected to need once extracted, or 0 for other files."""
+    return int(size * EXTRACTION_RATIO) if archive_kind(filename) else 0
+
+
+def check_free_space(path, required, margin=SAFETY_MARGIN):
+    """Raise InsufficientSpaceError unless required bytes plus margin fit on the drive holding path."""
+    free = free_space(path)
+    logging.info(f"[AscendaraDiskSpace] {_format_size(required)} needed in {path}, {_format_size(free)} free")
+    if required + margin > free:
+        raise InsufficientSpaceError(path, required + margin, free)
+
+
+def _allow_valid_data():
+    """Enable SeManageVolumePrivilege for this process, which SetFileValidData needs; only elevated processes hold it."""
+    global _valid_data_allowed
+    if _valid_data_allowed is None:
+        import ctypes
+        from ctypes import wintypes
+
+        class LUID(ctypes.Structure):
+            _fields_ = [("LowPart", wintypes.DWORD), ("HighPart", wintypes.LONG)]
+
+        class TOKEN_PRIVILEGES(ctypes.Structure):
+            _fields_ = [("PrivilegeCount", wintypes.DWORD), ("Luid", LUID), ("Attributes", wintypes.DWORD)]
+
+        kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+        advapi32 = ctypes.WinDLL("advapi32", use_last_error=True)
+        kernel32.GetCurrentProcess.restype = wintypes.HANDLE
+        advapi32.OpenProcessToken.argtypes = [wintypes.HANDLE, wintypes.DWORD, ctypes.POINTER(wintypes.HANDLE)]
+        advapi32.AdjustTokenPrivileges.argtypes = [wintypes.HANDLE, wintypes.BOOL, ctypes.POINTER(TOKEN_PRIVILEGES),
+                                                   wintypes.DWORD, ctypes.c_void_p, ctypes.c_void_p]
+        token = wintypes.HANDLE()
+        privileges = TOKEN_PRIVILEGES(1, LUID(), 0x2)  # SE_PRIVILEGE_ENABLED
+        _valid_data_allowed = False
+        # TOKEN_ADJUST_PRIVILEGES | TOKEN_QUERY
+        if advapi32.OpenProcessToken(kernel32.GetCurrentProcess(), 0x28, ctypes.byref(token)):
+            try:
+                if advapi32.LookupPrivilegeValueW(None, "SeManageVolumePrivilege", ctypes.byref(privileges.Luid)) and \
+                        advapi32.AdjustTokenPrivileges(token, False, ctypes.byref(privileges), 0, None, None):
+                    # AdjustTokenPrivileges also succeeds for privileges the token doesn't hold
+                    _valid_data_allowed = ctypes.get_last_error() != ERROR_NOT_ALL_ASSIGNED
+            finally:
+                kernel32.CloseHandle(token)
+        logging.info(f"[AscendaraDiskSpace] SetFileValidData is {'available' if _valid_data_allowed else 'not permitted'}")
+    return _valid_data_allowed
+
+
+def _reserve_windows(f, size):
+    """Move the end of f to size with SetEndOfFile, which allocates its clusters; False where that isn't possible."""
+    import ctypes
+    import msvcrt
+    from ctypes import wintypes
+    kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+    kernel32.SetEndOfFile.argtypes = [wintypes.HANDLE]
+    kernel32.SetFileValidData.argtypes = [wintypes.HANDLE, ctypes.c_longlong]
+    handle = msvcrt.get_osfhandle(f.fileno())
+    f.flush()
+    position = f.tell()
+    f.seek(size)
+    try:
+        if not kernel32.SetEndOfFile(handle):
+            error = ctypes.get_last_error()
+            if error in (ERROR_DISK_FULL, ERROR_HANDLE_DISK_FULL):
+                raise OSError(errno.ENOSPC, "No space left on device", f.name)
+            logging.debug(f"[AscendaraDiskSpace] SetEndOfFile failed for {f.name}: {ctypes.FormatError(error)}")
+            return False
+    finally:
+        f.seek(position)
+    # Unwritten ranges then read back whatever the clusters held before, which segments overwrite anyway
+    if _allow_valid_data() and not kernel32.SetFileValidData(handle, size):
+        logging.debug(f"[AscendaraDiskSpace] SetFileValidData failed for {f.name}: {ctypes.FormatError(ctypes.get_last_error())}")
+    return True
+
+
+def preallocate(f, size):
+    """Reserve size bytes for the open file f where the OS can, so segments can be written at any offset.
+
+    posix_fallocate allocates real blocks, so a full drive fails here instead
+    of mid-download and the file is laid out contiguously. Elsewhere on POSIX
+    the file is extended sparsely. On Windows SetEndOfFile allocates the
+    clusters the same way; NTFS then zero-fills up to each write past the
+    valid data length, which SetFileValidData moves to the end when the
+    process may use it (elevated runs). Where neither call is possible the
+    file is truncated to size.
+    """
+    if size <= 0:
+        return
+    if hasattr(os, "posix_fallocate"):
+        try:
+            os.posix_fallocate(f.fileno(), 0, size)
+            return
+        except OSError as e:
+            if e.errno == errno.ENOSPC:
+                raise
+            # Filesystems without fallocate support (some network shares) get a plain extended file
+            logging.debug(f"[AscendaraDiskSpace] Could not preallocate {size} bytes: {e}")
+    if sys.platform == "win32":
+        try:
+            if _reserve_windows(f, size):
+                return
+        except (AttributeError, ValueError, ImportError) as e:
+            logging.debug(f"[AscendaraDiskSpace] Could not reserve {size} bytes for {f.name}: {e}")
+    f.truncate(size)
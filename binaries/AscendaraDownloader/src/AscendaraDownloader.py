@@ -19,18 +19,27 @@ import os
 import sys
 import json
 import time
-import shutil
 import string
 from tempfile import NamedTemporaryFile
 from argparse import ArgumentParser
-from pySmartDL import SmartDL
-import zipfile
+from pySmartDL import SmartDL, utils as smartdl_utils
 import logging
 import random
 import requests
 import os
 import re
-import zipfile
+import threading
+from AscendaraHttpClient import get_session
+from AscendaraBandwidth import BandwidthLimiter
+from AscendaraProgress import ProgressWriter, settle_progress_writes, open_progress_channel
+from AscendaraExtraction import read_installed_filemap, remove_stale_files, find_archive_sets, archive_kind
+from AscendaraExtractors import ExtractionProgress, extract_archive_set, can_extract, is_archive
+from AscendaraVerification import verify_files
+from AscendaraRemoteZip import peek_remote_zip, DELTA_MAX_RATIO
+from AscendaraDiskSpace import check_free_space, preallocate, EXTRACTION_RATIO
+from AscendaraSegmentedDownload import SegmentedDownload, probe_remote_file, stream_to_file
+from AscendaraTelemetry import DownloadTelemetry
+from urllib.parse import urlparse
 import atexit
 import subprocess
 
@@ -103,12 +112,35 @@ def read_size(size, decimal_places=2):
         i += 1
     return f"{size:.{decimal_places}f} {units[i]}"
 
+def format_speed(bytes_per_sec):
+    if bytes_per_sec >= 1024**3:
+        return f"{bytes_per_sec/1024**3:.2f} GB/s"
+    elif bytes_per_sec >= 1024**2:
+        return f"{bytes_per_sec/1024**2:.2f} MB/s"
+    elif bytes_per_sec >= 1024:
+        return f"{bytes_per_sec/1024:.2f} KB/s"
+    else:
+        return f"{bytes_per_sec:.2f} B/s"
+
+def format_eta(seconds):
+    seconds = int(seconds)
+    if seconds < 60:
+        return f"{seconds} seconds"
+    minutes = seconds // 60
+    sec = seconds % 60
+    if minutes < 60:
+        return f"{minutes} minute{'s' if minutes != 1 else ''}, {sec} second{'s' if sec != 1 else ''}"
+    hours = minutes // 60
+    min_left = minutes % 60
+    return f"{hours} hour{'s' if hours != 1 else ''}, {min_left} minute{'s' if min_left != 1 else ''}"
+
 def sanitize_folder_name(name):
     valid_chars = "-_.() %s%s" % (string.ascii_letters, string.digits)
     sanitized_name = ''.join(c for c in name if c in valid_chars)
     return sanitized_name
 
 def safe_write_json(filepath, data):
+    settle_progress_writes(filepath)
     temp_dir = os.path.dirname(filepath)
     temp_file_path = None
     retry_attempts = 5
@@ -170,7 +202,7 @@ def handleerror(game_info, game_info_path, e):
 
 # Downloader class for managing downloads and extraction
 class SmartDLDownloader:
-    def __init__(self, game, online, dlc, isVr, updateFlow, version, size, download_dir):
+    def __init__(self, game, online, dlc, isVr, updateFlow, version, size, download_dir, progress_stream=None, verify_hashes=False):
         self.game = game
         self.online = online
         self.dlc = dlc
@@ -181,6 +213,19 @@ class SmartDLDownloader:
         self.download_dir = os.path.join(download_dir, sanitize_folder_name(game))
         os.makedirs(self.download_dir, exist_ok=True)
         self.game_info_path = os.path.join(self.download_dir, f"{sanitize_folder_name(game)}.ascendara.json")
+        max_speed, self.threads = self._read_download_settings()
+        # Shares downloadLimit with every other running Ascendara download
+        self.limiter = BandwidthLimiter(max_speed, os.path.dirname(LOG_PATH))
+        # Progress ticks are written in the background; phase changes still use safe_write_json
+        self.progress_writer = ProgressWriter(self.game_info_path)
+        # Optional live event stream; when present the JSON file only records state changes
+        self.progress_channel = open_progress_channel(progress_stream, game)
+        # Also compare CRC32 checksums from the archive index, not just sizes
+        self.verify_hashes = verify_hashes
+        # Updates only write what changed since the installed version, judged against its filemap
+        self.installed_filemap = read_installed_filemap(self.download_dir) if updateFlow else {}
+        # Phase timings of this run, appended to the log directory once it ends
+        self.telemetry = DownloadTelemetry(game, "AscendaraDownloader", os.path.dirname(LOG_PATH))
         # Initialize or update the game info JSON file for tracking download state
         if updateFlow and os.path.exists(self.game_info_path):
             with open(self.game_info_path, 'r') as f:
@@ -210,6 +255,68 @@ class SmartDLDownloader:
             }
         safe_write_json(self.game_info_path, self.game_info)
 
+    @staticmethod
+    def _read_download_settings():
+        """Return (downloadLimit in KB/s, threadCount) from the Ascendara settings file."""
+        max_speed = 0
+        threads = None
+        try:
+            settings_path = None
+            if sys.platform == 'win32':
+                appdata = os.environ.get('APPDATA')
+                if appdata:
+                    candidate = os.path.join(appdata, 'Electron', 'ascendarasettings.json')
+                    if os.path.exists(candidate):
+                        settings_path = candidate
+            elif sys.platform == 'darwin':
+                user_data_dir = os.path.expanduser('~/Library/Application Support/ascendara')
+                candidate = os.path.join(user_data_dir, 'ascendarasettings.json')
+                if os.path.exists(candidate):
+                    settings_path = candidate
+            if settings_path and os.path.exists(settings_path):
+                with open(settings_path, 'r', encoding='utf-8') as f:
+                    settings = json.load(f)
+                    try:
+                        max_speed = int(settings.get('downloadLimit', 0))
+                    except Exception:
+                        max_speed = 0
+                    try:
+                        threads = int(settings.get('threadCount', 0)) or None
+                    except Exception:
+                        threads = None
+            logging.info(f"[AscendaraDownloader] Download settings: max_speed={max_speed}, threads={threads}")
+        except Exception as e:
+            logging.error(f"[AscendaraDownloader] Could not read ascendara settings: {e}")
+            max_speed = 0
+            threads = None
+        return max_speed, threads
+
+    def _report_progress(self, phase, done_bytes, total_bytes, rate, eta):
+        if self.progress_channel:
+            self.progress_channel.progress(phase, done_bytes, total_bytes, rate, eta)
+        else:
+            self.progress_writer.submit(self.game_info)
+
+    def _report_extract_progress(self, written_bytes, total_bytes, rate, eta):
+        percent = written_bytes / total_bytes * 100 if total_bytes else 100
+        self.game_info["downloadingData"]["progressCompleted"] = f"{percent:.2f}"
+        self.game_info["downloadingData"]["progressDownloadSpeeds"] = format_speed(rate)
+        self.game_info["downloadingData"]["timeUntilComplete"] = format_eta(eta)
+        self._report_progress("extracting", written_bytes, total_bytes, rate, eta)
+
+    def _report_verify_progress(self, checked_bytes, total_bytes):
+        percent = checked_bytes / total_bytes * 100 if total_bytes else 100
+        self.game_info["downloadingData"]["progressCompleted"] = f"{percent:.2f}"
+        self._report_progress("verifying", checked_bytes, total_bytes, 0, 0)
+
+    def _report_phase(self, phase, **fields):
+        if phase == "error":
+            self.telemetry.fail(fields.get("message"))
+        if self.progress_channel:
+            self.progress_channel.phase(phase, **fields)
+
+    DEFAULT_SEGMENTS = 5  # Connections per journaled download when threadCount isn't set, as SmartDL uses
+
     VALID_BUZZHEAVIER_DOMAINS = [
         'buzzheavier.com',
         'bzzhr.co',
@@ -218,6 +325,14 @@ class SmartDLDownloader:
     ]
 
     def download(self, url, withNotification=None):
+        buzzheavier = any(domain in url for domain in self.VALID_BUZZHEAVIER_DOMAINS)
+        self.telemetry.set_provider("buzzheavier" if buzzheavier else "direct", urlparse(url).netloc)
+        try:
+            self._download(url, withNotification)
+        finally:
+            self.telemetry.finish()
+
+    def _download(self, url, withNotification=None):
         try:
             # Buzzheavier detection
             if any(domain in url for domain in self.VALID_BUZZHEAVIER_DOMAINS):
@@ -229,14 +344,17 @@ class SmartDLDownloader:
                             "Download Complete",
                             f"Successfully downloaded from buzzheavier: {self.game_info['game']}"
                         )
-                    self.game_info["downloadingData"]["downloading"] = False
-                    self.game_info["downloadingData"]["progressCompleted"] = "100.00"
-                    self.game_info["downloadingData"]["progressDownloadSpeeds"] = "0.00 KB/s"
-                    self.game_info["downloadingData"]["timeUntilComplete"] = "0s"
-                    safe_write_json(self.game_info_path, self.game_info)
+                    # A verified install has already dropped downloadingData
+                    if "downloadingData" in self.game_info:
+                        self.game_info["downloadingData"]["downloading"] = False
+                        self.game_info["downloadingData"]["progressCompleted"] = "100.00"
+                        self.game_info["downloadingData"]["progressDownloadSpeeds"] = "0.00 KB/s"
+                        self.game_info["downloadingData"]["timeUntilComplete"] = "0s"
+                        safe_write_json(self.game_info_path, self.game_info)
                 except Exception as e:
                     logging.error(f"[AscendaraDownloader] Buzzheavier download failed: {e}")
                     handleerror(self.game_info, self.game_info_path, e)
+                    self._report_phase("error", message=str(e))
                     if withNotification:
                         _launch_notification(
                             withNotification,
@@ -247,6 +365,7 @@ class SmartDLDownloader:
 
             self.game_info["downloadingData"]["downloading"] = True
             safe_write_json(self.game_info_path, self.game_info)
+            self._report_phase("downloading")
             base_name = os.path.basename(url.split('?')[0])
             dest = os.path.join(self.download_dir, base_name)
             # Notification: Download Started (GoFile style)
@@ -256,90 +375,79 @@ class SmartDLDownloader:
                     "Download Started",
                     f"Starting download for {self.game_info['game']}"
                 )
+            # One ranged GET gives the file name, size, range support and where the URL redirects to
             try:
-                head = requests.head(url, allow_redirects=True, timeout=10)
-                cd = head.headers.get('content-disposition')
-                if cd and 'filename=' in cd:
-                    fname = re.findall('filename="?([^";]+)', cd)
-                    if fname:
-                        base_name = fname[0]
-                        dest = os.path.join(self.download_dir, base_name)
-            except Exception:
-                pass  # If anything fails, fallback to base_name from URL
+                with self.telemetry.phase("probe"):
+                    remote = probe_remote_file(url)
+            except requests.exceptions.RequestException as e:
+                logging.warning(f"[AscendaraDownloader] Range probe failed: {e}")
+                remote = None
+            cd = remote["disposition"] if remote else None
+            if cd and 'filename=' in cd:
+                fname = re.findall('filename="?([^";]+)', cd)
+                if fname:
+                    base_name = fname[0]
+                    dest = os.path.join(self.download_dir, base_name)
             logging.info(f"[AscendaraDownloader] Download destination: {dest}")
 
-            try:
-                resp = requests.head(url, allow_redirects=True)
-                size_bytes = None
-                if 'Content-Length' in resp.headers:
-                    size_bytes = int(resp.headers['Content-Length'])
-                elif resp.status_code == 405:  # HEAD not allowed, try GET with Range
-                    resp = requests.get(url, stream=True, headers={"Range": "bytes=0-0"})
-                    if 'Content-Range' in resp.headers:
-                        size_bytes = int(resp.headers['Content-Range'].split('/')[-1])
-                if size_bytes:
-                    def _read_size(size, decimal_places=2):
-                        if size == 0:
-                            return "0 B"
-                        units = ["B", "KB", "MB", "GB", "TB", "PB"]
-                        i = 0
-                        while size >= 1024 and i < len(units) - 1:
-                            size /= 1024.0
-                            i += 1
-                        return f"{size:.{decimal_places}f} {units[i]}"
-                    self.game_info['size'] = _read_size(size_bytes)
-                    safe_write_json(self.game_info_path, self.game_info)
-            except Exception as e:
-                logging.warning(f"[AscendaraDownloader] Could not determine remote file size: {e}")
-
-            max_speed = 0
-            threads = None
-            try:
-                settings_path = None
-                if sys.platform == 'win32':
-                    appdata = os.environ.get('APPDATA')
-                    if appdata:
-                        candidate = os.path.join(appdata, 'Electron', 'ascendarasettings.json')
-                        if os.path.exists(candidate):
-                            settings_path = candidate
-                elif sys.platform == 'darwin':
-                    user_data_dir = os.path.expanduser('~/Library/Application Support/ascendara')
-                    candidate = os.path.join(user_data_dir, 'ascendarasettings.json')
-                    if os.path.exists(candidate):
-                        settings_path = candidate
-                if settings_path and os.path.exists(settings_path):
-                    with open(settings_path, 'r', encoding='utf-8') as f:
-                        settings = json.load(f)
-                        try:
-                            max_speed = int(settings.get('downloadLimit', 0))
-                        except Exception:
-                            max_speed = 0
-                        try:
-                            threads = int(settings.get('threadCount', 0)) or None
-                        except Exception:
-                            threads = None
-                logging.info(f"[AscendaraDownloader] Download settings: max_speed={max_speed}, threads={threads}")
-            except Exception as e:
-                logging.error(f"[AscendaraDownloader] Could not read ascendara settings: {e}")
-                max_speed = 0
-                threads = None
-
-            obj = SmartDL(url, dest, progress_bar=True)
-            if max_speed and max_speed > 0:
-                obj.set_speed(max_speed)
-            if threads and threads > 0:
-                obj.threads = threads
-            obj.start(blocking=False)
-            while not obj.isFinished():
-                progress = obj.get_progress() * 100
-                speed = obj.get_speed(human=True)
-                eta = obj.get_eta(human=True)
-                self.game_info["downloadingData"]["progressCompleted"] = f"{progress:.2f}"
-                self.game_info["downloadingData"]["progressDownloadSpeeds"] = speed
-                self.game_info["downloadingData"]["timeUntilComplete"] = eta
+            size_bytes = remote["size"] if remote else None
+            if size_bytes:
+                self.game_info['size'] = read_size(size_bytes)
                 safe_write_json(self.game_info_path, self.game_info)
-                time.sleep(0.5)
-            if obj.isSuccessful():
+
+            # An update of a zip can read its index from the server before any of its body is downloaded;
+            # a fresh install downloads it whole anyway, so it skips the extra ranged requests
+            remote_zip = None
+            if self.installed_filemap:
+                with self.telemetry.phase("probe"):
+                    remote_zip = peek_remote_zip(url, limiter=self.limiter, remote=remote) if remote else None
+            extract_bytes = None
+            if remote_zip:
+                try:
+                    if self._update_from_remote_zip(remote_zip, withNotification):
+                        return
+                    # Zips extract over the installed files, so only growth beyond them needs room
+                    extract_bytes = max(0, remote_zip.install_size - self._installed_size())
+                finally:
+                    remote_zip.close()
+            if size_bytes:
+                # The archive and its extracted contents share the drive until the archive is deleted
+                if extract_bytes is None:
+                    extract_bytes = int(size_bytes * EXTRACTION_RATIO)
+                check_free_space(self.download_dir, size_bytes - self._partial_size(dest) + extract_bytes)
+
+            if remote and remote["ranges"] and remote["size"]:
+                # Journaled next to the game's files, so a relaunch resumes instead of starting over
+                self._download_journaled(url, dest, remote)
+                download_errors = None
+            else:
+                logging.info(f"[AscendaraDownloader] Server does not support ranges, downloading with SmartDL without resume")
+                with self.telemetry.phase("transfer"):
+                    obj = SmartDL(url, dest, progress_bar=True)
+                    if self.threads and self.threads > 0:
+                        obj.threads = self.threads
+                    obj.start(blocking=False)
+                    speed_share = self.limiter.share()
+                    if speed_share:
+                        obj.limit_speed(speed_share)
+                    while not obj.isFinished():
+                        # Follow our share of the global limit as other downloads start and finish
+                        if self.limiter.limit and self.limiter.share() != speed_share:
+                            speed_share = self.limiter.share()
+                            obj.limit_speed(speed_share)
+                        progress = obj.get_progress() * 100
+                        speed = obj.get_speed(human=True)
+                        eta = obj.get_eta(human=True)
+                        self.game_info["downloadingData"]["progressCompleted"] = f"{progress:.2f}"
+                        self.game_info["downloadingData"]["progressDownloadSpeeds"] = speed
+                        self.game_info["downloadingData"]["timeUntilComplete"] = eta
+                        self._report_progress("downloading", obj.get_dl_size(), obj.filesize or 0, obj.get_speed(), obj.get_eta())
+                        # SmartDL bypasses the limiter's byte count, so its speed readings stand in for the peak
+                        self.telemetry.note_rate("transfer", obj.get_speed())
+                        time.sleep(0.5)
+                self.telemetry.add_bytes("transfer", obj.get_dl_size())
+                download_errors = None if obj.isSuccessful() else obj.get_errors()
+            if download_errors is None:
                 logging.info(f"[AscendaraDownloader] Download completed successfully.")
                 if withNotification:
                     _launch_notification(
@@ -364,7 +472,8 @@ class SmartDLDownloader:
                 # Rename file if extension is wrong
                 ext_map = {'zip': '.zip', 'rar': '.rar', '7z': '.7z', 'exe': '.exe'}
                 correct_ext = ext_map.get(filetype)
-                if correct_ext and not dest.endswith(correct_ext):
+                # Volumes such as .7z.001 already name their kind and must keep their number
+                if correct_ext and not dest.endswith(correct_ext) and archive_kind(dest) != filetype:
                     new_dest = dest + correct_ext if not os.path.splitext(dest)[1] else dest[:-len(os.path.splitext(dest)[1])] + correct_ext
                     logging.info(f"[AscendaraDownloader] Renaming file to: {new_dest}")
                     os.rename(dest, new_dest)
@@ -381,14 +490,14 @@ class SmartDLDownloader:
 
                 self._extract_files(dest)
             else:
-                logging.error(f"[AscendaraDownloader] Download failed: {obj.get_errors()}")
+                logging.error(f"[AscendaraDownloader] Download failed: {download_errors}")
                 if withNotification:
                     _launch_notification(
                         withNotification,
                         "Download Error",
-                        f"Error downloading {self.game_info['game']}: {obj.get_errors()}"
+                        f"Error downloading {self.game_info['game']}: {download_errors}"
                     )
-                raise Exception(str(obj.get_errors()))
+                raise Exception(str(download_errors))
         except Exception as e:
             # Detect SSL version error and set provider_blocked_error
             err_str = str(e)
@@ -403,9 +512,11 @@ class SmartDLDownloader:
             ):
                 logging.error(f"[AscendaraDownloader] Provider blocked, SSL, or connection reset error detected: {e}")
                 handleerror(self.game_info, self.game_info_path, 'provider_blocked_error')
+                self._report_phase("error", message='provider_blocked_error')
             else:
                 logging.error(f"[AscendaraDownloader] Error in download method: {e}")
                 handleerror(self.game_info, self.game_info_path, e)
+                self._report_phase("error", message=str(e))
             # Notification: Download Error (exception)
             if withNotification:
                 _launch_notification(
@@ -416,6 +527,116 @@ class SmartDLDownloader:
             # Do not re-raise to prevent crash
             return
 
+    @staticmethod
+    def _partial_size(dest):
+        """Bytes an interrupted journaled download of dest already holds on disk."""
+        part_path = f"{dest}.part"
+        return os.path.getsize(part_path) if os.path.isfile(part_path) else 0
+
+    def _download_journaled(self, url, dest, remote, segments=None):
+        """Fetch url into dest over ranged connections, resuming from the journal of an earlier run.
+
+        The journal beside the partial file keeps the URL, where it resolved to,
+        the total size, the ETag and the completed ranges; it is dropped when
+        the server reports a different size or ETag.
+        """
+        logging.info(f"[AscendaraDownloader] Downloading {os.path.basename(dest)} ({read_size(remote['size'])}) "
+                     f"from {remote['final_url']}")
+        download = SegmentedDownload(
+            url,
+            dest,
+            remote["size"],
+            segments=segments or self.threads or self.DEFAULT_SEGMENTS,
+            on_progress=self._progress_reporter(remote["size"]),
+            limiter=self.limiter,
+            etag=remote["etag"],
+            final_url=remote["final_url"],
+        )
+        try:
+            with self.telemetry.phase("transfer", counter=lambda: self.limiter.transferred):
+                download.run()
+        finally:
+            self.telemetry.retry("transfer", download.retries)
+
+    def _progress_reporter(self, total_size):
+        """on_progress for a journaled download, publishing percent, speed and ETA at most every 0.5 seconds."""
+        lock = threading.Lock()
+        start = time.monotonic()
+        state = {"last": 0, "resumed": None}
+        def on_progress(downloaded):
+            with lock:
+                now = time.monotonic()
+                if state["resumed"] is None:
+                    state["resumed"] = downloaded  # Bytes from an earlier run don't count toward the speed
+                if now - state["last"] < 0.5 and downloaded < total_size:
+                    return
+                state["last"] = now
+                speed = (downloaded - state["resumed"]) / (now - start) if now > start else 0
+                eta = (total_size - downloaded) / speed if speed else 0
+                self.game_info["downloadingData"]["progressCompleted"] = f"{downloaded / total_size * 100:.2f}"
+                self.game_info["downloadingData"]["progressDownloadSpeeds"] = f"{smartdl_utils.sizeof_human(speed)}/s"
+                self.game_info["downloadingData"]["timeUntilComplete"] = smartdl_utils.time_human(eta, fmt_short=True)
+                self._report_progress("downloading", downloaded, total_size, speed, eta)
+        return on_progress
+
+    def _installed_size(self):
+        return sum(info.get("size", 0) for info in self.installed_filemap.values())
+
+    def _update_from_remote_zip(self, remote_zip, withNotification=None):
+        """Fetch only the changed members of a zip release; False when a full download is the better choice."""
+        root, watching_data, members = remote_zip.plan(self.download_dir, game_folder=sanitize_folder_name(self.game),
+                                                       installed=self.installed_filemap)
+        fetch_size = remote_zip.fetch_size(members)
+        if fetch_size > remote_zip.size * DELTA_MAX_RATIO:
+            logging.info(f"[AscendaraDownloader] {read_size(fetch_size)} of {read_size(remote_zip.size)} changed, downloading the whole archive")
+            return False
+        logging.info(f"[AscendaraDownloader] Updating {len(members)} changed member(s): fetching {read_size(fetch_size)} "
+                     f"instead of {read_size(remote_zip.size)}")
+        # Changed members are written next to the files they replace before the old ones go
+        check_free_space(self.download_dir, sum(info.file_size for info in members))
+        self.game_info["downloadingData"]["downloading"] = True
+        safe_write_json(self.game_info_path, self.game_info)
+        self._report_phase("downloading")
+
+        start = time.monotonic()
+        baseline = remote_zip.reader.fetched
+        last_report = 0
+        def on_fetch(fetched):
+            nonlocal last_report
+            now = time.monotonic()
+            if now - last_report < 0.5:
+                return
+            last_report = now
+            done = fetched - baseline
+            rate = done / (now - start) if now > start else 0
+            eta = (fetch_size - done) / rate if rate else 0
+            self.game_info["downloadingData"]["progressCompleted"] = f"{min(done / fetch_size * 100, 100) if fetch_size else 100:.2f}"
+            self.game_info["downloadingData"]["progressDownloadSpeeds"] = f"{smartdl_utils.sizeof_human(rate)}/s"
+            self.game_info["downloadingData"]["timeUntilComplete"] = smartdl_utils.time_human(eta, fmt_short=True)
+            self._report_progress("downloading", done, fetch_size, rate, eta)
+        try:
+            # Members are written as they arrive, so this is transfer and extraction in one
+            with self.telemetry.phase("transfer", counter=lambda: self.limiter.transferred):
+                remote_zip.extract(self.download_dir, members, root, on_progress=on_fetch)
+        finally:
+            self.telemetry.retry("transfer", remote_zip.reader.retries)
+
+        self.game_info["downloadingData"]["downloading"] = False
+        self.game_info["downloadingData"]["progressCompleted"] = "100.00"
+        self.game_info["downloadingData"]["progressDownloadSpeeds"] = "0.00 KB/s"
+        self.game_info["downloadingData"]["timeUntilComplete"] = "0s"
+        if withNotification:
+            _launch_notification(
+                withNotification,
+                "Download Complete",
+                f"Successfully updated {self.game_info['game']}"
+            )
+        self.game_info["downloadingData"]["extracting"] = True
+        safe_write_json(self.game_info_path, self.game_info)
+        self._report_phase("extracting")
+        self._finish_extraction(watching_data, complete=True)
+        return True
+
     @staticmethod
     def _resolve_buzzheavier_url(input_str):
         input_str = input_str.strip()
@@ -425,79 +646,77 @@ class SmartDLDownloader:
         raise ValueError(f"URL domain not recognized: {input_str}")
 
     def _download_buzzheavier(self, input_str):
-        import requests
         from bs4 import BeautifulSoup
         from tqdm import tqdm
+        http = get_session()
         url = self._resolve_buzzheavier_url(input_str)
-        response = requests.get(url)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'html.parser')
-        title = soup.title.string.strip() if soup.title else 'buzzheavier_download'
-        logging.info(f"[Buzzheavier] Title: {title}")
-        download_url = url + '/download'
-        headers = {
-            'hx-current-url': url,
-            'hx-request': 'true',
-            'referer': url
-        }
-        head_response = requests.head(download_url, headers=headers, allow_redirects=False)
+        with self.telemetry.phase("resolve"):
+            response = http.get(url)
+            response.raise_for_status()
+            soup = BeautifulSoup(response.text, 'html.parser')
+            title = soup.title.string.strip() if soup.title else 'buzzheavier_download'
+            logging.info(f"[Buzzheavier] Title: {title}")
+            download_url = url + '/download'
+            headers = {
+                'hx-current-url': url,
+                'hx-request': 'true',
+                'referer': url
+            }
+            head_response = http.head(download_url, headers=headers, allow_redirects=False)
         hx_redirect = head_response.headers.get('hx-redirect')
         if not hx_redirect:
             raise Exception("Download link not found. Is this a directory?")
         logging.info(f"[Buzzheavier] Download link: {hx_redirect}")
         domain = url.split('/')[2]
         final_url = f'https://{domain}' + hx_redirect if hx_redirect.startswith('/dl/') else hx_redirect
-        file_response = requests.get(final_url, stream=True)
+        dest_path = os.path.join(self.download_dir, title)
+        with self.telemetry.phase("probe"):
+            remote = probe_remote_file(final_url, session=http)
+        if remote["ranges"] and remote["size"]:
+            check_free_space(self.download_dir, remote["size"] - self._partial_size(dest_path) + int(remote["size"] * EXTRACTION_RATIO))
+            self._report_phase("downloading")
+            # Several ranged connections, journaled so a relaunch continues where this one stopped
+            self._download_journaled(final_url, dest_path, remote)
+            logging.info(f"[Buzzheavier] Downloaded as: {dest_path}")
+            self._extract_files(dest_path)
+            return
+        # Without range support there is nothing to resume or split, so stream it in one pass
+        file_response = http.get(final_url, stream=True, headers={"Accept-Encoding": "identity"})
         file_response.raise_for_status()
         total_size = int(file_response.headers.get('content-length', 0))
-        block_size = 1024
-        dest_path = os.path.join(self.download_dir, title)
+        if total_size:
+            check_free_space(self.download_dir, total_size + int(total_size * EXTRACTION_RATIO))
+        self._report_phase("downloading")
         start_time = time.time()
         downloaded = 0
         last_update_time = start_time
-        speed = 0
         with open(dest_path, 'wb') as f, tqdm(
             total=total_size, unit='B', unit_scale=True, desc=title
         ) as progress_bar:
-            for chunk in file_response.iter_content(chunk_size=block_size):
-                if chunk:
-                    f.write(chunk)
-                    progress_bar.update(len(chunk))
-                    downloaded += len(chunk)
-                    now = time.time()
-                    elapsed = now - start_time
-                    # Update every 0.5s or on last chunk
-                    if elapsed > 0 and (now - last_update_time > 0.5 or downloaded == total_size):
-                        percent = (downloaded / total_size) * 100 if total_size else 0
-                        speed = downloaded / elapsed if elapsed > 0 else 0
-                        remaining = total_size - downloaded
-                        eta = remaining / speed if speed > 0 else 0
-                        def format_speed(bytes_per_sec):
-                            if bytes_per_sec >= 1024**3:
-                                return f"{bytes_per_sec/1024**3:.2f} GB/s"
-                            elif bytes_per_sec >= 1024**2:
-                                return f"{bytes_per_sec/1024**2:.2f} MB/s"
-                            elif bytes_per_sec >= 1024:
-                                return f"{bytes_per_sec/1024:.2f} KB/s"
-                            else:
-                                return f"{bytes_per_sec:.2f} B/s"
-                        def format_eta(seconds):
-                            seconds = int(seconds)
-                            if seconds < 60:
-                                return f"{seconds} seconds"
-                            minutes = seconds // 60
-                            sec = seconds % 60
-                            if minutes < 60:
-                                return f"{minutes} minute{'s' if minutes != 1 else ''}, {sec} second{'s' if sec != 1 else ''}"
-                            hours = minutes // 60
-                            min_left = minutes % 60
-                            return f"{hours} hour{'s' if hours != 1 else ''}, {min_left} minute{'s' if min_left != 1 else ''}"
-                        self.game_info["downloadingData"]["progressCompleted"] = f"{percent:.2f}"
-                        self.game_info["downloadingData"]["progressDownloadSpeeds"] = format_speed(speed)
-                        self.game_info["downloadingData"]["timeUntilComplete"] = format_eta(eta)
-                        self.game_info["downloadingData"]["downloading"] = True
-                        safe_write_json(self.game_info_path, self.game_info)
-                        last_update_time = now
+            def on_data(count):
+                nonlocal downloaded, last_update_time
+                self.limiter.consume(count)
+                progress_bar.update(count)
+                downloaded += count
+                now = time.time()
+                elapsed = now - start_time
+                # Update every 0.5s or on last chunk
+                if elapsed > 0 and (now - last_update_time > 0.5 or downloaded == total_size):
+                    percent = (downloaded / total_size) * 100 if total_size else 0
+                    speed = downloaded / elapsed
+                    eta = (total_size - downloaded) / speed if speed > 0 else 0
+                    self.game_info["downloadingData"]["progressCompleted"] = f"{percent:.2f}"
+                    self.game_info["downloadingData"]["progressDownloadSpeeds"] = format_speed(speed)
+                    self.game_info["downloadingData"]["timeUntilComplete"] = format_eta(eta)
+                    self.game_info["downloadingData"]["downloading"] = True
+                    self._report_progress("downloading", downloaded, total_size, speed, eta)
+                    last_update_time = now
+            # Reserve the whole file up front; written sequentially over the reservation
+            preallocate(f, total_size)
+            with self.telemetry.phase("transfer", counter=lambda: self.limiter.transferred):
+                stream_to_file(file_response, f, on_data)
+            # Never leave preallocated zeros behind a short transfer
+            f.truncate(downloaded)
 
         logging.info(f"[Buzzheavier] Downloaded as: {dest_path}")
         self._extract_files(dest_path)
@@ -566,115 +785,70 @@ class SmartDLDownloader:
         logging.info(f"[AscendaraDownloader] Scanning for archives to extract in: {self.download_dir}")
         self.game_info["downloadingData"]["extracting"] = True
         safe_write_json(self.game_info_path, self.game_info)
-        watching_path = os.path.join(self.download_dir, "filemap.ascendara.json")
+        self._report_phase("extracting")
         watching_data = {}
-        archive_exts = {'.rar', '.zip'}
         extracted = False
-        for root, _, files in os.walk(self.download_dir):
-            for file in files:
-                ext = os.path.splitext(file)[1].lower()
-                if ext in archive_exts:
-                    archive_path = os.path.join(root, file)
-                    logging.info(f"[AscendaraDownloader] Extracting {archive_path}")
+        failed = False
+        # A SteamRIP or game-named root folder is stripped while extracting, not moved afterwards
+        game_folder = sanitize_folder_name(self.game)
+        if _archive_path:
+            archive_paths = [_archive_path]
+        else:
+            # Only the downloaded file is an archive to extract; no need to walk an existing install
+            archive_paths = [entry.path for entry in os.scandir(self.download_dir) if entry.is_file()]
+        # Volumes of a split release are one set, extracted once from its first volume
+        archive_sets = find_archive_sets(archive_paths)
+        # Totals come from the archive indexes, so bytes written, throughput and ETA are real numbers
+        progress = ExtractionProgress([archive_set for archive_set in archive_sets if can_extract(archive_set)],
+                                      on_update=self._report_extract_progress)
+        for index, archive_set in enumerate(archive_sets, 1):
+            if not can_extract(archive_set):
+                logging.warning(f"[AscendaraDownloader] No extractor for {archive_set.kind} archives, skipping {archive_set.name}")
+                continue
+            logging.info(f"[AscendaraDownloader] Extracting set {index}/{len(archive_sets)}: {archive_set.head} "
+                         f"({len(archive_set.volumes)} volume(s))")
+            try:
+                # Skips .url files and _CommonRedist and strips the root folder while writing
+                with self.telemetry.phase("extract"):
+                    entries = extract_archive_set(archive_set, self.download_dir, game_folder=game_folder,
+                                                  installed=self.installed_filemap, on_progress=progress.tracker(archive_set))
+                self.telemetry.add_bytes("extract", sum(entry.get("size", 0) for entry in entries.values()))
+                watching_data.update(entries)
+                extracted = True
+            except Exception as e:
+                logging.error(f"[AscendaraDownloader] Extraction failed: {archive_set.head}. Error: {e}")
+                failed = True
+                continue
+            finally:
+                progress.finish(archive_set)
+            # Delete every volume of the set after successful extraction
+            with self.telemetry.phase("cleanup"):
+                for volume in archive_set.volumes:
                     try:
-                        if ext == '.zip':
-                            with zipfile.ZipFile(archive_path, 'r') as zip_ref:
-                                for zip_info in zip_ref.infolist():
-                                    if not zip_info.filename.endswith('.url') and '_CommonRedist' not in zip_info.filename:
-                                        extracted_path = os.path.join(self.download_dir, zip_info.filename)
-                                        zip_ref.extract(zip_info, self.download_dir)
-                                        key = f"{os.path.relpath(extracted_path, self.download_dir)}"
-                                        watching_data[key] = {"size": zip_info.file_size}
-                            # Delete the original .zip file after successful extraction
-                            try:
-                                os.remove(archive_path)
-                                logging.info(f"[AscendaraDownloader] Deleted archive after extraction: {archive_path}")
-                            except Exception as e:
-                                logging.warning(f"[AscendaraDownloader] Could not delete archive {archive_path}: {e}")
-                        elif ext == '.rar':
-                            try:
-                                from unrar import rarfile
-                            except ImportError:
-                                logging.error("[AscendaraDownloader] Python module 'unrar' is not installed. Please install it with 'pip install unrar' to extract .rar files.")
-                                continue
-                            try:
-                                with rarfile.RarFile(archive_path) as rar_ref:
-                                    rar_ref.extractall(self.download_dir)
-                                    for rar_info in rar_ref.infolist():
-                                        if not rar_info.filename.endswith('.url') and '_CommonRedist' not in rar_info.filename:
-                                            extracted_path = os.path.join(self.download_dir, rar_info.filename)
-                                            key = f"{os.path.relpath(extracted_path, self.download_dir)}"
-                                            watching_data[key] = {"size": rar_info.file_size}
-                                # Delete the original .rar file after successful extraction
-                                try:
-                                    os.remove(archive_path)
-                                    logging.info(f"[AscendaraDownloader] Deleted archive after extraction: {archive_path}")
-                                except Exception as e:
-                                    logging.warning(f"[AscendaraDownloader] Could not delete archive {archive_path}: {e}")
-                            except Exception as e:
-                                logging.error(f"[AscendaraDownloader] unrar extraction failed: {e}")
-                                continue
-                        extracted = True
+                        os.remove(volume)
+                        logging.info(f"[AscendaraDownloader] Deleted archive after extraction: {volume}")
                     except Exception as e:
-                        logging.error(f"[AscendaraDownloader] Extraction failed: {archive_path}. Error: {e}")
-                        continue
-        nested_dir = os.path.join(self.download_dir, sanitize_folder_name(self.game))
-
-        moved = False
-        if os.path.isdir(nested_dir):
-            for item in os.listdir(nested_dir):
-                src = os.path.join(nested_dir, item)
-                dst = os.path.join(self.download_dir, item)
-                if os.path.exists(dst):
-                    if os.path.isdir(dst):
-                        shutil.rmtree(dst, ignore_errors=True)
-                    else:
-                        os.remove(dst)
-                shutil.move(src, dst)
-            shutil.rmtree(nested_dir, ignore_errors=True)
-            print(f"[AscendaraDownloader] Moved files from nested '{nested_dir}' to '{self.download_dir}'.")
-            moved = True
-            # Rebuild filemap after flattening
-            watching_data = {}
-            for dirpath, _, filenames in os.walk(self.download_dir):
-                rel_dir = os.path.relpath(dirpath, self.download_dir)
-                for fname in filenames:
-                    if fname.endswith('.url') or '_CommonRedist' in dirpath:
-                        continue
-                    if os.path.splitext(fname)[1].lower() in archive_exts:
-                        continue
-                    rel_path = os.path.normpath(os.path.join(rel_dir, fname)) if rel_dir != '.' else fname
-                    rel_path = rel_path.replace('\\', '/').replace('\\', '/')
-                    watching_data[rel_path] = {"size": os.path.getsize(os.path.join(dirpath, fname))}
-            safe_write_json(watching_path, watching_data)
-            
-        # Remove archive files from watching_data
-        watching_data = {k: v for k, v in watching_data.items() if os.path.splitext(k)[1].lower() not in archive_exts}
+                        logging.warning(f"[AscendaraDownloader] Could not delete archive {volume}: {e}")
+        logging.info(f"[AscendaraDownloader] Extraction finished: {progress.summary()}")
+
+        self._finish_extraction(watching_data, complete=extracted and not failed)
+
+    def _finish_extraction(self, watching_data, complete):
+        """Write the filemap of what was extracted and move on to verification."""
+        watching_path = os.path.join(self.download_dir, "filemap.ascendara.json")
+        # Remove archive files from watching_data; .url files and _CommonRedist were never extracted
+        watching_data = {k: v for k, v in watching_data.items() if not is_archive(k)}
+        if self.installed_filemap and complete:
+            # Only once the whole new version is in place, or a failed archive would take its old files with it
+            with self.telemetry.phase("cleanup"):
+                remove_stale_files(self.download_dir, self.installed_filemap, watching_data)
         safe_write_json(watching_path, watching_data)
-        # Remove all .url files after extraction
-        for root, dirs, files in os.walk(self.download_dir, topdown=False):
-            for fname in files:
-                if fname.endswith('.url'):
-                    file_path = os.path.join(root, fname)
-                    try:
-                        os.remove(file_path)
-                        logging.info(f"[AscendaraDownloader] Deleted .url file: {file_path}")
-                    except Exception as e:
-                        logging.warning(f"[AscendaraDownloader] Could not delete .url file: {file_path}: {e}")
-            # Remove _CommonRedist folders
-            for d in dirs:
-                if d.lower() == '_commonredist':
-                    dir_path = os.path.join(root, d)
-                    try:
-                        shutil.rmtree(dir_path)
-                        logging.info(f"[AscendaraDownloader] Deleted _CommonRedist folder: {dir_path}")
-                    except Exception as e:
-                        logging.warning(f"[AscendaraDownloader] Could not delete _CommonRedist folder: {dir_path}: {e}")
 
         # Set extraction to false and verifying to true
         self.game_info["downloadingData"]["extracting"] = False
         self.game_info["downloadingData"]["verifying"] = True
         safe_write_json(self.game_info_path, self.game_info)
+        self._report_phase("verifying")
         # Notify extraction complete if notification theme is available
         if hasattr(self, 'withNotification') and self.withNotification:
             _launch_notification(
@@ -689,17 +863,18 @@ class SmartDLDownloader:
         try:
             with open(watching_path, 'r') as f:
                 watching_data = json.load(f)
-            verify_errors = []
-            for file_path, file_info in watching_data.items():
-                # Skip filemap.ascendara.json from verification
-                if os.path.basename(file_path) == 'filemap.ascendara.json':
-                    continue
-                full_path = os.path.join(self.download_dir, file_path)
-                if not os.path.exists(full_path) or os.path.getsize(full_path) != file_info['size']:
-                    verify_errors.append({"file": file_path, "error": "File missing or size mismatch"})
+            # Skip filemap.ascendara.json from verification
+            watching_data = {k: v for k, v in watching_data.items() if os.path.basename(k) != 'filemap.ascendara.json'}
+            with self.telemetry.phase("verify"):
+                verify_errors = verify_files(self.download_dir, watching_data, check_hashes=self.verify_hashes,
+                                             on_progress=self._report_verify_progress)
+            self.telemetry.add_bytes("verify", sum(info.get("size", 0) for info in watching_data.values()))
+            # Keep the stat stamps so the next verification skips files that haven't changed
+            safe_write_json(watching_path, watching_data)
             self.game_info["downloadingData"]["verifying"] = False
             self.game_info["downloadingData"]["verifyError"] = verify_errors
             safe_write_json(self.game_info_path, self.game_info)
+            self._report_phase("done", verifyErrors=len(verify_errors))
             # Remove downloadingData from JSON after verification completes
             if "downloadingData" in self.game_info:
                 del self.game_info["downloadingData"]
@@ -710,6 +885,7 @@ class SmartDLDownloader:
                 self._handle_post_download_behavior()
         except Exception as e:
             handleerror(self.game_info, self.game_info_path, e)
+            self._report_phase("error", message=str(e))
 
 # CLI entrypoint for running the downloader as a script
 def parse_boolean(value):
@@ -734,10 +910,13 @@ def main():
     parser.add_argument("size", help="Size of the file (ex: 12 GB, 439 MB)")
     parser.add_argument("download_dir", help="Directory to save the downloaded files")
     parser.add_argument("--withNotification", help="Theme name for notifications (e.g. light, dark, blue)", default=None)
+    parser.add_argument("--progressStream", help="Stream progress events as JSON lines to 'stdout' or a local 'HOST:PORT' socket", default=None)
+    parser.add_argument("--verifyHashes", action="store_true", help="Verify extracted files against archive checksums, not just sizes")
     args = parser.parse_args()
     try:
         downloader = SmartDLDownloader(
-            args.game, args.online, args.dlc, args.isVr, args.updateFlow, args.version, args.size, args.download_dir
+            args.game, args.online, args.dlc, args.isVr, args.updateFlow, args.version, args.size, args.download_dir,
+            progress_stream=args.progressStream, verify_hashes=args.verifyHashes
         )
         # Store notification theme on downloader for extraction notification
         if args.withNotification:
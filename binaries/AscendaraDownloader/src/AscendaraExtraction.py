@@ -0,0 +1,530 @@
+# ==============================================================================
+# Ascendara Extraction
+# ==============================================================================
+# Archive extraction helpers shared by the downloader binaries. Lets a
+# multi-archive release start extracting each finished archive in the
+# background while the remaining parts are still downloading, and spreads
+# the members of a zip across worker threads so inflating large releases
+# uses every core. Unwanted members are filtered before anything is written
+# and a release's root folder is stripped from member paths, so files land
+# at their final location and the filemap comes straight out of extraction.
+# When updating, members matching the installed filemap by size and CRC32 are
+# left alone and files the new release no longer ships are removed. Volumes
+# of split releases are grouped into sets so each set is extracted once.
+
+
+
+
+
+
+
+
+
+import io
+import os
+import re
+import sys
+import json
+import bisect
+import shutil
+import zipfile
+import tempfile
+import logging
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+ZIP_WORKERS = min(8, os.cpu_count() or 1)
+COPY_BUFFER_SIZE = 1024 * 1024
+_WINDOWS_ILLEGAL = re.compile(r'[:<>|"?*]')
+STAGING_PREFIX = ".ascendara-extract-"
+FILEMAP_NAME = "filemap.ascendara.json"
+STAGING_POLL_INTERVAL = 1.0  # Seconds between two looks at how much a staged extractor has written
+
+# Volume names of split archive sets: group 1 names the set, group 2 numbers the volume
+_VOLUME_NAMES = (
+    (re.compile(r'^(.+)\.part(\d+)\.rar$', re.IGNORECASE), 'rar'),
+    (re.compile(r'^(.+)\.r(\d{2,3})$', re.IGNORECASE), 'rar'),
+    (re.compile(r'^(.+)\.z(\d{2,3})$', re.IGNORECASE), 'zip'),
+    (re.compile(r'^(.+)\.7z\.(\d{3})$', re.IGNORECASE), '7z'),
+    (re.compile(r'^(.+)\.zip\.(\d{3})$', re.IGNORECASE), 'zip'),
+)
+_TAR_SUFFIXES = ('.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tbz2', '.tar.xz', '.txz')
+
+
+def _volume_of(name):
+    """(set name, kind, volume number) for an archive file name, or None for any other file."""
+    for pattern, kind in _VOLUME_NAMES:
+        match = pattern.match(name)
+        if match:
+            return match.group(1).lower(), kind, int(match.group(2))
+    for suffix in _TAR_SUFFIXES:
+        if name.lower().endswith(suffix):
+            return name[:-len(suffix)].lower(), 'tar', -1
+    stem, ext = os.path.splitext(name)
+    if ext.lower() in ('.rar', '.zip', '.7z'):
+        # Tools open an old-style set through its .rar and a split zip through its .zip, so that volume goes first
+        return stem.lower(), ext[1:].lower(), -1
+    return None
+
+
+def archive_kind(filename):
+    """'zip', 'rar', '7z' or 'tar' for an archive or archive volume name, otherwise None."""
+    volume = _volume_of(os.path.basename(filename))
+    return volume[1] if volume else None
+
+
+class ArchiveSet:
+    """One archive and all of its volumes; a set is extracted once, starting from head."""
+    def __init__(self, kind, volumes):
+        self.kind = kind  # 'zip', 'rar', '7z' or 'tar'
+        self.volumes = volumes  # Paths in volume order
+        self.size = sum(os.path.getsize(path) for path in volumes if os.path.isfile(path))
+
+    @property
+    def head(self):
+        return self.volumes[0]
+
+    @property
+    def name(self):
+        return os.path.basename(self.head)
+
+    @property
+    def is_split(self):
+        return len(self.volumes) > 1
+
+
+def find_archive_sets(paths):
+    """Group the archive files among paths into ArchiveSets, ordered by head; other files are ignored."""
+    groups = {}
+    for path in set(paths):
+        volume = _volume_of(os.path.basename(path))
+        if volume:
+            set_name, kind, number = volume
+            groups.setdefault((os.path.dirname(path), set_name, kind), []).append((number, path))
+    archive_sets = [ArchiveSet(kind, [path for _, path in sorted(volumes)])
+                    for (_, _, kind), volumes in groups.items()]
+    return sorted(archive_sets, key=lambda archive_set: archive_set.head)
+
+
+def is_independent_archive(filename, sibling_names):
+    """True if filename is an archive that can be extracted without any other file.
+
+    sibling_names are the other file names of the release in the same folder; a
+    .rar with .r00 siblings or a .zip with .z01 siblings is the head of a split set.
+    """
+    for archive_set in find_archive_sets([filename, *sibling_names]):
+        if filename in archive_set.volumes:
+            return not archive_set.is_split
+    return False
+
+
+class VolumeReader(io.RawIOBase):
+    """The volumes of a raw split set (.7z.001, .zip.001) read back to back as one seekable file."""
+    def __init__(self, paths):
+        super().__init__()
+        self._files = []
+        self._starts = []
+        self.size = 0
+        try:
+            for path in paths:
+                f = open(path, 'rb')
+                self._files.append(f)
+                self._starts.append(self.size)
+                self.size += os.fstat(f.fileno()).st_size
+        except OSError:
+            self.close()
+            raise
+        self._pos = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._pos
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self._pos
+        elif whence == io.SEEK_END:
+            offset += self.size
+        self._pos = max(0, offset)
+        return self._pos
+
+    def readinto(self, buffer):
+        if self._pos >= self.size:
+            return 0
+        index = bisect.bisect_right(self._starts, self._pos) - 1
+        volume_end = self._starts[index + 1] if index + 1 < len(self._starts) else self.size
+        f = self._files[index]
+        f.seek(self._pos - self._starts[index])
+        with memoryview(buffer) as view:
+            count = f.readinto(view[:min(len(view), volume_end - self._pos)])
+        self._pos += count
+        return count
+
+    def close(self):
+        for f in self._files:
+            f.close()
+        super().close()
+
+
+def open_volumes(paths):
+    """Buffered reader over the volumes of a raw split set."""
+    return io.BufferedReader(VolumeReader(paths), COPY_BUFFER_SIZE)
+
+
+def copy_stream(source, target, on_data=None):
+    """Copy source to target through one bounded buffer, calling on_data with the size of every chunk."""
+    buffer = bytearray(COPY_BUFFER_SIZE)
+    with memoryview(buffer) as view:
+        while True:
+            count = source.readinto(buffer)
+            if not count:
+                return
+            target.write(view[:count])
+            if on_data:
+                on_data(count)
+
+
+def is_wanted_member(name):
+    """False for members Ascendara never installs: shortcut .url files and _CommonRedist installers."""
+    return not name.endswith('.url') and '_CommonRedist' not in name
+
+
+def _member_parts(name):
+    return [part for part in name.replace('\\', '/').split('/') if part not in ('', '.', '..')]
+
+
+def filemap_key(rel_path):
+    """The filemap key of a path relative to the game folder, '/'-separated on every platform like the app writes them."""
+    return '/'.join(_member_parts(rel_path))
+
+
+def top_level_folders(names):
+    """Top-level folders of an archive index."""
+    return {parts[0] for parts in map(_member_parts, names) if len(parts) > 1}
+
+
+def find_root_folder(tops, game_folder=None, first_word=None):
+    """Which of the top-level folders tops holds content belonging directly in the game directory.
+
+    Decided from the archive index before anything is written: a SteamRIP
+    folder, a folder named after the game or, when first_word is given, a
+    folder starting with the first word of the game name.
+    """
+    checks = [lambda top: 'steamrip' in top.lower(), lambda top: top == game_folder]
+    if first_word:
+        checks.append(lambda top: top.lower().startswith(first_word))
+    for check in checks:
+        for top in sorted(tops):
+            if check(top):
+                return top
+    return None
+
+
+def member_path(dest_dir, name, root=None):
+    """Safe destination for an archive member, dropping absolute and parent components like zipfile does.
+
+    Members inside root are placed as if root were the game directory itself.
+    """
+    parts = _member_parts(name)
+    if root and parts and parts[0] == root:
+        parts = parts[1:]
+    if sys.platform == "win32":
+        parts = [_WINDOWS_ILLEGAL.sub('_', part).rstrip('.') for part in parts]
+    return os.path.join(dest_dir, *parts)
+
+
+def read_installed_filemap(dest_dir):
+    """The filemap of the current install, or {} when there is none to update from."""
+    try:
+        with open(os.path.join(dest_dir, FILEMAP_NAME), 'r') as f:
+            filemap = json.load(f)
+        # Filemaps written on Windows by earlier builds may use backslashes
+        return {filemap_key(rel_path): entry for rel_path, entry in filemap.items()} if isinstance(filemap, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def _installed_entry(installed, dest_dir, rel_path, size, crc):
+    # Unchanged only when the archive index and the filemap agree on size and
+    # CRC32 and the installed file still has that size; without a CRC the member is always extracted
+    old = installed.get(filemap_key(rel_path)) if installed else None
+    if not old or crc is None or old.get("crc32") != crc or old.get("size") != size:
+        return None
+    try:
+        if os.path.getsize(os.path.join(dest_dir, rel_path)) != size:
+            return None
+    except OSError:
+        return None
+    return dict(old)  # Keeps its verification stamps
+
+
+def remove_stale_files(dest_dir, installed, watching_data):
+    """Delete files of the previous install that the new release no longer contains.
+
+    Only entries of the old filemap are touched, so saves and settings the game
+    wrote next to its files survive; folders left empty are removed too.
+    """
+    removed = 0
+    folders = set()
+    kept = {filemap_key(rel_path) for rel_path in watching_data}
+    for rel_path in installed:
+        parts = _member_parts(rel_path)
+        if not parts or '/'.join(parts) in kept or parts[-1] == FILEMAP_NAME or parts[-1].endswith('.ascendara.json'):
+            continue
+        path = os.path.join(dest_dir, *parts)
+        folders.update(os.path.join(dest_dir, *parts[:depth]) for depth in range(1, len(parts)))
+        if os.path.isdir(path):
+            folders.add(path)
+            continue
+        try:
+            os.remove(path)
+            removed += 1
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logging.warning(f"[AscendaraExtraction] Could not remove {path}, it is no longer part of the game: {e}")
+    # Deepest first so emptied parents go too; folders with anything left in them stay
+    for folder in sorted(folders, key=len, reverse=True):
+        try:
+            os.rmdir(folder)
+        except OSError:
+            pass
+    if removed:
+        logging.info(f"[AscendaraExtraction] Removed {removed} file(s) the new version no longer ships")
+    return removed
+
+
+def plan_zip_members(infos, dest_dir, root=None, installed=None):
+    """Return (filemap entries of the release, members that need writing) for a zip index.
+
+    Members unchanged in the installed filemap keep their old entry and are
+    left out of the members to write.
+    """
+    watching_data = {}
+    members = []
+    for info in infos:
+        target = member_path(dest_dir, info.filename, root)
+        if not is_wanted_member(info.filename) or target == dest_dir:
+            continue
+        rel_path = filemap_key(os.path.relpath(target, dest_dir))
+        if info.is_dir():
+            watching_data[rel_path] = {"size": info.file_size}
+            members.append(info)
+            continue
+        # Recorded for hash verification, straight from the archive index
+        crc = f"{info.CRC:08x}"
+        unchanged = _installed_entry(installed, dest_dir, rel_path, info.file_size, crc)
+        watching_data[rel_path] = unchanged or {"size": info.file_size, "crc32": crc}
+        if unchanged is None:
+            members.append(info)
+    return watching_data, members
+
+
+@contextmanager
+def _open_zip(archive_path, volumes=None):
+    if not volumes:
+        with zipfile.ZipFile(archive_path, 'r') as zip_ref:
+            yield zip_ref
+        return
+    # zipfile leaves file objects it was given open
+    with open_volumes(volumes) as source, zipfile.ZipFile(source, 'r') as zip_ref:
+        yield zip_ref
+
+
+def _extract_zip_members(archive_path, dest_dir, members, root, volumes=None, on_data=None):
+    # Each worker gets its own handle; a ZipFile's file position can't be shared between threads
+    with _open_zip(archive_path, volumes) as zip_ref:
+        for info in members:
+            if info.is_dir():
+                continue
+            with zip_ref.open(info) as source, open(member_path(dest_dir, info.filename, root), 'wb') as target:
+                copy_stream(source, target, on_data)
+
+
+def extract_zip_parallel(archive_path, dest_dir, workers=ZIP_WORKERS, game_folder=None, first_word=None, installed=None,
+                         on_progress=None, volumes=None):
+    """Extract a zip with its members split across worker threads; returns its filemap entries.
+
+    zlib releases the GIL while inflating, so threads scale with cores without
+    the start-up cost of worker processes in the frozen binaries. Members found
+    unchanged in the installed filemap are not written at all. volumes are the
+    parts of a raw split zip, read back to back instead of archive_path.
+    on_progress is called with (bytes written, bytes to write).
+    """
+    with _open_zip(archive_path, volumes) as zip_ref:
+        infos = zip_ref.infolist()
+    root = find_root_folder(top_level_folders(info.filename for info in infos), game_folder, first_word)
+    if root:
+        logging.info(f"[AscendaraExtraction] Placing the contents of '{root}' directly in {dest_dir}")
+    watching_data, members = plan_zip_members(infos, dest_dir, root, installed)
+    if installed:
+        logging.info(f"[AscendaraExtraction] {len(watching_data) - len(members)} member(s) of {os.path.basename(archive_path)} "
+                     f"are unchanged, writing {len(members)}")
+
+    directories = {dest_dir}
+    for info in members:
+        target = member_path(dest_dir, info.filename, root)
+        directories.add(target if info.is_dir() else os.path.dirname(target))
+    # Create the tree up front so workers never race on makedirs
+    for directory in sorted(directories):
+        os.makedirs(directory, exist_ok=True)
+
+    # Largest members first onto the least loaded worker keeps the threads finishing together
+    workers = max(1, min(workers, len(members)))
+    buckets = [[] for _ in range(workers)]
+    loads = [0] * workers
+    for info in sorted(members, key=lambda member: member.compress_size, reverse=True):
+        slot = loads.index(min(loads))
+        buckets[slot].append(info)
+        loads[slot] += info.compress_size
+    logging.info(f"[AscendaraExtraction] Extracting {len(members)} member(s) of {os.path.basename(archive_path)} on {workers} thread(s)")
+
+    on_data = None
+    if on_progress:
+        total = sum(info.file_size for info in members)
+        written = 0
+        lock = threading.Lock()
+        def on_data(count):
+            nonlocal written
+            with lock:
+                written += count
+                done = written
+            on_progress(done, total)
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="AscendaraUnzip") as pool:
+        for future in as_completed([pool.submit(_extract_zip_members, archive_path, dest_dir, bucket, root, volumes, on_data)
+                                    for bucket in buckets]):
+            future.result()
+    return watching_data
+
+
+def _merge_move(src, dst):
+    # Renames only; a directory is descended into only when the destination already has one
+    if os.path.isdir(src) and os.path.isdir(dst):
+        for entry in os.listdir(src):
+            _merge_move(os.path.join(src, entry), os.path.join(dst, entry))
+        return
+    if os.path.isdir(dst):
+        shutil.rmtree(dst)
+    elif os.path.exists(dst) and os.path.isdir(src):
+        os.remove(dst)
+    os.replace(src, dst)
+
+
+def _tree_size(path):
+    size = 0
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    size += _tree_size(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    size += entry.stat(follow_symlinks=False).st_size
+    except OSError:
+        pass  # The extractor may be creating or renaming it right now
+    return size
+
+
+def _watch_staging(staging, total, on_progress, stop):
+    while not stop.wait(STAGING_POLL_INTERVAL):
+        on_progress(min(_tree_size(staging), total), total)
+
+
+def extract_staged(extract, dest_dir, game_folder=None, first_word=None, installed=None, on_progress=None, total=None):
+    """Run extract(staging_dir) next to dest_dir, then rename the result into place.
+
+    For extractors that can't remap member paths themselves (unrar, unar). The
+    staging folder lives inside dest_dir, so moving a finished tree is a rename
+    on the same volume rather than a copy out of the system temp folder.
+    extract may return {member name: CRC32} from the archive index to record
+    checksums; with those, files unchanged in the installed filemap are
+    discarded from staging instead of replacing the installed copy. Returns
+    the filemap entries of what was placed. With on_progress and total, the
+    bytes written to staging are reported every STAGING_POLL_INTERVAL seconds
+    for extractors that can't report progress themselves.
+    """
+    staging = tempfile.mkdtemp(prefix=STAGING_PREFIX, dir=dest_dir)
+    stop = threading.Event()
+    if on_progress and total:
+        threading.Thread(target=_watch_staging, args=(staging, total, on_progress, stop),
+                         name="AscendaraStagingProgress", daemon=True).start()
+    try:
+        try:
+            extracted = extract(staging) or {}
+        finally:
+            stop.set()
+        checksums = {os.path.join(*_member_parts(name)): crc for name, crc in extracted.items() if _member_parts(name)}
+        top_level = os.listdir(staging)
+        root = find_root_folder([top for top in top_level if os.path.isdir(os.path.join(staging, top))], game_folder, first_word)
+        if root:
+            logging.info(f"[AscendaraExtraction] Placing the contents of '{root}' directly in {dest_dir}")
+
+        watching_data = {}
+        for dirpath, dirnames, filenames in os.walk(staging):
+            rel_dir = os.path.relpath(dirpath, staging)
+            for dirname in list(dirnames):
+                if not is_wanted_member(os.path.join(rel_dir, dirname)):
+                    dirnames.remove(dirname)
+                    shutil.rmtree(os.path.join(dirpath, dirname), ignore_errors=True)
+            for fname in filenames:
+                path = os.path.join(dirpath, fname)
+                rel_path = os.path.normpath(os.path.join(rel_dir, fname))
+                if not is_wanted_member(rel_path):
+                    os.remove(path)
+                    continue
+                final_rel_path = filemap_key(os.path.relpath(member_path(dest_dir, rel_path, root), dest_dir))
+                size = os.path.getsize(path)
+                crc = f"{checksums[rel_path] & 0xFFFFFFFF:08x}" if rel_path in checksums else None
+                unchanged = _installed_entry(installed, dest_dir, final_rel_path, size, crc)
+                if unchanged is not None:
+                    watching_data[final_rel_path] = unchanged
+                    os.remove(path)
+                    continue
+                watching_data[final_rel_path] = {"size": size}
+                if crc is not None:
+                    watching_data[final_rel_path]["crc32"] = crc
+
+        for top in top_level:
+            source = os.path.join(staging, top)
+            if top == root:
+                _merge_move(source, dest_dir)
+            elif os.path.exists(source):
+                _merge_move(source, os.path.join(dest_dir, top))
+        return watching_data
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+
+
+class ExtractionPipeline:
+    def __init__(self, extract, workers=1):
+        self._extract = extract  # callable(archive_path) -> {relative path: {"size": n}}
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="AscendaraExtract")
+        self._futures = {}
+
+    def submit(self, archive_path):
+        if archive_path in self._futures:
+            return
+        logging.info(f"[AscendaraExtraction] Extracting {os.path.basename(archive_path)} while the download continues")
+        self._futures[archive_path] = self._pool.submit(self._extract, archive_path)
+
+    def finish(self):
+        """Wait for every queued archive and return (filemap entries, extracted archive paths).
+
+        Archives whose extraction failed are left out so the caller can retry them.
+        """
+        entries = {}
+        extracted = []
+        for archive_path, future in self._futures.items():
+            try:
+                entries.update(future.result())
+                extracted.append(archive_path)
+            except Exception as e:
+                logging.error(f"[AscendaraExtraction] Background extraction of {archive_path} failed, will retry: {e}")
+        self._pool.shutdown(wait=True)
+        return entries, extracted
@@ -0,0 +1,302 @@
+# ==============================================================================
+# Ascendara Extractors
+# ==============================================================================
+# Registry of the archive backends the downloader binaries extract with: zip,
+# rar, 7z and the tar family. Every backend takes an archive set, extracts it
+# in-process where a library is available, copies through a bounded buffer,
+# reports bytes-extracted progress and returns the filemap entries of what it
+# placed. Other formats plug in through register_extractor. ExtractionProgress
+# turns those reports into bytes written, throughput and ETA for a release.
+
+
+
+
+
+
+
+
+
+import os
+import sys
+import time
+import shutil
+import zipfile
+import tarfile
+import logging
+import threading
+import subprocess
+from AscendaraExtraction import (COPY_BUFFER_SIZE, copy_stream, open_volumes, is_wanted_member, member_path,
+                                 extract_zip_parallel, extract_staged, archive_kind)
+from AscendaraTelemetry import cpu_time
+
+PROGRESS_INTERVAL = 0.5  # Seconds between two on_progress calls
+
+EXTRACTORS = {}
+_MEASURES = {}
+
+
+def register_extractor(kind, extract, measure=None):
+    """Make extract the backend for archive sets of kind.
+
+    extract is called as extract(archive_set, dest_dir, game_folder=..., first_word=...,
+    installed=..., on_progress=...) and returns the filemap entries of what it placed.
+    measure(archive_set), if given, returns the bytes the set extracts to from
+    its index, or None when the index can't be read up front.
+    """
+    EXTRACTORS[kind] = extract
+    if measure:
+        _MEASURES[kind] = measure
+
+
+def can_extract(archive_set):
+    return archive_set.kind in EXTRACTORS
+
+
+def is_archive(filename):
+    """True for an archive or archive volume name some registered backend extracts."""
+    return archive_kind(filename) in EXTRACTORS
+
+
+def measure_archive_set(archive_set):
+    """Bytes archive_set extracts to according to its index, or its archive size when that can't be read."""
+    measure = _MEASURES.get(archive_set.kind)
+    try:
+        size = measure(archive_set) if measure else None
+    except Exception as e:
+        logging.debug(f"[AscendaraExtractors] Could not read the index of {archive_set.name}: {e}")
+        size = None
+    return archive_set.size if size is None else size
+
+
+class ExtractionProgress:
+    """Bytes written, throughput and ETA across every archive set of a release.
+
+    Totals start out from the archive indexes and are corrected by what each
+    backend reports once it runs. on_update is called with (bytes written,
+    total bytes, bytes per second, seconds left) whenever a set reports.
+    """
+    def __init__(self, archive_sets, on_update=None):
+        self._totals = {archive_set.head: measure_archive_set(archive_set) for archive_set in archive_sets}
+        self._done = dict.fromkeys(self._totals, 0)
+        self._skipped = 0  # Bytes extracted before this run, kept out of the throughput
+        self._on_update = on_update
+        self._lock = threading.Lock()
+        self._started = time.monotonic()
+        self._cpu_started = cpu_time()
+
+    def tracker(self, archive_set):
+        """on_progress callback for extracting archive_set."""
+        def on_progress(done, total):
+            with self._lock:
+                self._totals[archive_set.head] = total
+                self._done[archive_set.head] = done
+            self._update()
+        return on_progress
+
+    def finish(self, archive_set):
+        with self._lock:
+            self._done[archive_set.head] = self._totals[archive_set.head]
+        self._update()
+
+    def skip(self, archive_set):
+        """Count archive_set as complete without it having been extracted by this run."""
+        with self._lock:
+            self._done[archive_set.head] = self._totals[archive_set.head]
+            self._skipped += self._totals[archive_set.head]
+        self._update()
+
+    def stats(self):
+        """(bytes written, total bytes, bytes per second, seconds left)."""
+        with self._lock:
+            done = sum(self._done.values())
+            total = max(sum(self._totals.values()), done)
+            written = done - self._skipped
+        elapsed = time.monotonic() - self._started
+        rate = written / elapsed if elapsed > 0 else 0
+        eta = (total - done) / rate if rate > 0 else 0
+        return done, total, rate, eta
+
+    def summary(self):
+        """One line on how the extraction went; CPU cores busy well below the worker count means the disk held it back."""
+        done, total, rate, _ = self.stats()
+        elapsed = time.monotonic() - self._started
+        cores = (cpu_time() - self._cpu_started) / elapsed if elapsed > 0 else 0
+        return (f"{(done - self._skipped) / 1024 ** 2:.1f} MB written in {elapsed:.1f}s "
+                f"({rate / 1024 ** 2:.1f} MB/s), {cores:.2f} CPU core(s) busy")
+
+    def _update(self):
+        if self._on_update:
+            self._on_update(*self.stats())
+
+
+def _throttled(on_progress):
+    # Backends report every chunk, from several threads for zip; pass on a few a second and the last one
+    lock = threading.Lock()
+    last_report = 0
+
+    def report(done, total):
+        nonlocal last_report
+        now = time.monotonic()
+        with lock:
+            if now - last_report < PROGRESS_INTERVAL and done < total:
+                return
+            last_report = now
+            on_progress(done, total)
+    return report
+
+
+def extract_archive_set(archive_set, dest_dir, game_folder=None, first_word=None, installed=None, on_progress=None):
+    """Extract archive_set into dest_dir with its registered backend; returns its filemap entries.
+
+    on_progress is called with (bytes extracted, bytes to extract) at most
+    every PROGRESS_INTERVAL seconds.
+    """
+    extract = EXTRACTORS.get(archive_set.kind)
+    if extract is None:
+        raise ValueError(f"No extractor for {archive_set.kind} archives: {archive_set.name}")
+    return extract(archive_set, dest_dir, game_folder=game_folder, first_word=first_word, installed=installed,
+                   on_progress=_throttled(on_progress) if on_progress else None)
+
+
+def _extract_zip(archive_set, dest_dir, game_folder=None, first_word=None, installed=None, on_progress=None):
+    volumes = None
+    if archive_set.is_split:
+        if not archive_set.head.lower().endswith('.001'):
+            # .z01 volumes store offsets per disk, which zipfile can't follow
+            raise ValueError(f"Spanned zip sets aren't supported, join the volumes of {archive_set.name} first")
+        volumes = archive_set.volumes
+    # Skips .url files and _CommonRedist, inflating members on several threads
+    return extract_zip_parallel(archive_set.head, dest_dir, game_folder=game_folder, first_word=first_word,
+                                installed=installed, on_progress=on_progress, volumes=volumes)
+
+
+def _measure_zip(archive_set):
+    source = open_volumes(archive_set.volumes) if archive_set.is_split else open(archive_set.head, 'rb')
+    with source, zipfile.ZipFile(source) as zip_ref:
+        return sum(info.file_size for info in zip_ref.infolist() if is_wanted_member(info.filename))
+
+
+def _rar_command(archive_path, staging_dir):
+    if sys.platform == "darwin" and shutil.which('unar'):
+        return ['unar', '-force-overwrite', '-o', staging_dir, archive_path]
+    if shutil.which('unrar'):
+        # The trailing separator marks the destination folder
+        return ['unrar', 'x', '-y', archive_path, staging_dir + os.sep]
+    return None
+
+
+def _extract_rar(archive_set, dest_dir, game_folder=None, first_word=None, installed=None, on_progress=None):
+    # RAR tools can't rename members, so they extract into a staging folder on the same volume.
+    # unrar follows the set from its first volume to the last
+    archive_path = archive_set.head
+    try:
+        from unrar import rarfile
+    except ImportError:
+        rarfile = None
+    if rarfile is not None:
+        with rarfile.RarFile(archive_path) as rar_ref:
+            # Never write .url files or _CommonRedist in the first place
+            members = [rar_info for rar_info in rar_ref.infolist() if is_wanted_member(rar_info.filename)]
+
+            def extract(staging_dir):
+                rar_ref.extractall(staging_dir, members=members)
+                return {rar_info.filename: rar_info.CRC for rar_info in members}
+            return extract_staged(extract, dest_dir, game_folder=game_folder, first_word=first_word, installed=installed,
+                                  on_progress=on_progress, total=sum(rar_info.file_size for rar_info in members))
+
+    if _rar_command(archive_path, dest_dir) is None:
+        raise RuntimeError("Python module 'unrar' is not installed and no unrar or unar tool was found. "
+                           "Please install 'unrar' to extract .rar files.")
+
+    def extract(staging_dir):
+        cmd = _rar_command(archive_path, staging_dir)
+        try:
+            result = subprocess.run(cmd, check=True, capture_output=True, text=True)
+            logging.info(f"[AscendaraExtractors] {cmd[0]} extraction output: {result.stdout}")
+        except subprocess.CalledProcessError as e:
+            logging.error(f"[AscendaraExtractors] {cmd[0]} extraction failed: {e.stderr}")
+            raise
+    # The tools don't list sizes up front; the archive size is close enough for little-compressed game data
+    return extract_staged(extract, dest_dir, game_folder=game_folder, first_word=first_word, installed=installed,
+                          on_progress=on_progress, total=archive_set.size)
+
+
+def _measure_rar(archive_set):
+    try:
+        from unrar import rarfile
+    except ImportError:
+        return None
+    with rarfile.RarFile(archive_set.head) as rar_ref:
+        return sum(rar_info.file_size for rar_info in rar_ref.infolist() if is_wanted_member(rar_info.filename))
+
+
+def _measure_7z(archive_set):
+    try:
+        import py7zr
+    except ImportError:
+        return None
+    source = open_volumes(archive_set.volumes) if archive_set.is_split else open(archive_set.head, 'rb')
+    with source, py7zr.SevenZipFile(source, 'r') as archive:
+        return sum(info.uncompressed or 0 for info in archive.list()
+                   if not info.is_directory and is_wanted_member(info.filename))
+
+
+def _extract_7z(archive_set, dest_dir, game_folder=None, first_word=None, installed=None, on_progress=None):
+    try:
+        import py7zr
+    except ImportError:
+        raise RuntimeError("Python module 'py7zr' is not installed. Please install it with 'pip install py7zr' to extract .7z files.")
+    # .7z.001 volumes are plain byte ranges of one archive, read back to back
+    source = open_volumes(archive_set.volumes) if archive_set.is_split else open(archive_set.head, 'rb')
+    try:
+        with py7zr.SevenZipFile(source, 'r') as archive:
+            infos = archive.list()
+            members = [info for info in infos if is_wanted_member(info.filename)]
+
+            def extract(staging_dir):
+                if len(members) == len(infos):
+                    archive.extractall(path=staging_dir)
+                else:
+                    archive.extract(path=staging_dir, targets=[info.filename for info in members])
+                return {info.filename: info.crc32 for info in members if not info.is_directory and info.crc32 is not None}
+            return extract_staged(extract, dest_dir, game_folder=game_folder, first_word=first_word, installed=installed,
+                                  on_progress=on_progress,
+                                  total=sum(info.uncompressed or 0 for info in members if not info.is_directory))
+    finally:
+        source.close()
+
+
+def _extract_tar(archive_set, dest_dir, game_folder=None, first_word=None, installed=None, on_progress=None):
+    archive_path = archive_set.head
+    total = archive_set.size
+
+    def extract(staging_dir):
+        written = 0
+
+        def on_data(count):
+            nonlocal written
+            written += count
+            # Streamed in one pass whatever the compression, so the total is projected from how far into the archive we are
+            on_progress(written, max(written, int(written * total / max(raw.tell(), 1))))
+
+        with open(archive_path, 'rb') as raw, tarfile.open(fileobj=raw, mode='r|*', bufsize=COPY_BUFFER_SIZE) as tar_ref:
+            for member in tar_ref:
+                target = member_path(staging_dir, member.name)
+                if not is_wanted_member(member.name) or target == staging_dir:
+                    continue
+                if member.isdir():
+                    os.makedirs(target, exist_ok=True)
+                elif member.isfile():
+                    os.makedirs(os.path.dirname(target), exist_ok=True)
+                    with tar_ref.extractfile(member) as source, open(target, 'wb') as f:
+                        copy_stream(source, f, on_data if on_progress else None)
+                else:
+                    # Links and device files never belong in a game folder
+                    logging.debug(f"[AscendaraExtractors] Skipping {member.name}, not a regular file")
+    return extract_staged(extract, dest_dir, game_folder=game_folder, first_word=first_word, installed=installed)
+
+
+register_extractor('zip', _extract_zip, _measure_zip)
+register_extractor('rar', _extract_rar, _measure_rar)
+register_extractor('7z', _extract_7z, _measure_7z)
+register_extractor('tar', _extract_tar)
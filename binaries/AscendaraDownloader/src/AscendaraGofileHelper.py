@@ -23,14 +23,27 @@ import string
 from tempfile import NamedTemporaryFile, gettempdir
 import requests
 import atexit
-from threading import Lock
+from threading import Lock, Event
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
 from hashlib import sha256
 from argparse import ArgumentParser, ArgumentTypeError, ArgumentError
-import patoolib
 import subprocess
 import logging
 from datetime import datetime
-import zipfile
+from urllib.parse import urlparse
+from AscendaraHttpClient import get_session
+from AscendaraBandwidth import BandwidthLimiter
+from AscendaraProgress import ProgressWriter, settle_progress_writes, open_progress_channel
+from AscendaraSegmentedDownload import SegmentedDownload, SEGMENT_JOURNAL_SUFFIX, probe_remote_file
+from AscendaraVerification import verify_files
+from AscendaraRemoteZip import peek_remote_zip, DELTA_MAX_RATIO
+from AscendaraDiskSpace import InsufficientSpaceError, SAFETY_MARGIN, free_space, extraction_estimate, check_free_space
+from AscendaraExtraction import (ExtractionPipeline, ArchiveSet, is_independent_archive, is_wanted_member, read_installed_filemap,
+                                 remove_stale_files, find_archive_sets, archive_kind)
+from AscendaraExtractors import ExtractionProgress, extract_archive_set, can_extract, is_archive
+from AscendaraTelemetry import DownloadTelemetry
+
+SEGMENTED_MIN_FILE_SIZE = 256 * 1024 * 1024  # Files at least this large are fetched over several ranges
 
 def get_ascendara_log_path():
     if sys.platform == "win32":
@@ -52,6 +65,27 @@ logging.basicConfig(
 )
 logging.info("[AscendaraGofileHelper] Logging to %s", LOG_PATH)
 
+# Guest account token reused across runs until it expires or GoFile rejects it
+TOKEN_CACHE_PATH = os.path.join(os.path.dirname(LOG_PATH), "gofiletoken.json")
+TOKEN_CACHE_MAX_AGE = 7 * 24 * 60 * 60  # seconds
+TOKEN_REJECTED_STATUSES = {"error-token", "error-auth", "error-unauthorized"}
+
+
+def _gofile_api_url():
+    # Test-only: GF_API_URL points the helper at the download benchmark's mock host. Only loopback
+    # addresses are accepted, so it can never send the account token to another server
+    override = os.getenv("GF_API_URL")
+    if not override:
+        return "https://api.gofile.io"
+    if urlparse(override).hostname not in ("127.0.0.1", "localhost", "::1"):
+        logging.warning(f"[AscendaraGofileHelper] Ignoring GF_API_URL={override}, only local test hosts are allowed")
+        return "https://api.gofile.io"
+    return override.rstrip("/")
+
+
+GOFILE_API_URL = _gofile_api_url()
+
+
 def read_size(size, decimal_places=2):
     if size == 0:
         return "0 B"
@@ -66,6 +100,38 @@ def read_size(size, decimal_places=2):
 NEW_LINE = "\n" if sys.platform != "Windows" else "\r\n"
 IS_DEV = False  # Development mode flag
 
+def format_speed(rate):
+    # Format speed with consistent decimal places and thresholds
+    if rate < 0.1:  # Very slow speeds
+        return "0.00 B/s"
+    elif rate < 1024:
+        return f"{rate:.2f} B/s"
+    elif rate < 1024 * 1024:
+        return f"{(rate / 1024):.2f} KB/s"
+    elif rate < 1024 * 1024 * 1024:
+        return f"{(rate / (1024 * 1024)):.2f} MB/s"
+    else:
+        return f"{(rate / (1024 * 1024 * 1024)):.2f} GB/s"
+
+def format_eta(eta_seconds):
+    # Format ETA with improved granularity
+    if eta_seconds <= 0:
+        return "calculating..."
+    elif eta_seconds < 60:
+        return f"{int(eta_seconds)}s"
+    elif eta_seconds < 3600:
+        minutes = int(eta_seconds / 60)
+        seconds = int(eta_seconds % 60)
+        return f"{minutes}m, {seconds}s"
+    elif eta_seconds < 86400:
+        hours = int(eta_seconds / 3600)
+        minutes = int((eta_seconds % 3600) / 60)
+        return f"{hours}h, {minutes}m"
+    else:
+        days = int(eta_seconds / 86400)
+        hours = int((eta_seconds % 86400) / 3600)
+        return f"{days}d, {hours}h"
+
 def _launch_crash_reporter_on_exit(error_code, error_message):
     try:
         crash_reporter_path = os.path.join('./AscendaraCrashReporter.exe')
@@ -107,6 +173,7 @@ def _launch_notification(theme, title, message):
         logging.error(f"Failed to launch notification helper: {e}")
 
 def safe_write_json(filepath, data):
+    settle_progress_writes(filepath)
     temp_dir = os.path.dirname(filepath)
     temp_file_path = None
     try:
@@ -145,17 +212,33 @@ def handleerror(game_info, game_info_path, e):
     safe_write_json(game_info_path, game_info)
 
 class GofileDownloader:
-    def __init__(self, game, online, dlc, isVr, updateFlow, version, size, download_dir, max_workers=5):
+    def __init__(self, game, online, dlc, isVr, updateFlow, version, size, download_dir, max_workers=5, max_segments=4, progress_stream=None, verify_hashes=False):
         self._max_retries = 3
+        self._max_workers = max(1, max_workers)
+        self._max_segments = max(1, max_segments)
         self._download_timeout = 30 
+        # One keep-alive pool for API calls, size probes and every download connection
+        self._session = get_session("gofile", pool_size=self._max_workers * self._max_segments, timeout=(9, self._download_timeout))
         self._token = self._getToken()
         self._lock = Lock()
+        self._token_lock = Lock()
+        self._progress_lock = Lock()  # Guards the shared progress aggregator
         self._rate_window = []  # Store recent rate measurements
         self._rate_window_size = 5  # Number of measurements to average
         self._last_progress = 0  # Track highest progress
         self._current_file_progress = {}  # Track progress per file
         self._total_downloaded = 0  # Track total bytes downloaded
         self._total_size = 0  # Track total bytes to download
+        self._last_report_time = 0  # Last time progress was published
+        self._last_report_bytes = 0  # Total bytes at the last publish
+        self._extraction_pipeline = None  # Extracts finished archives while the rest downloads
+        self._rar_tools = None  # Whether rar sets can be extracted, once checked
+        self._downloaded_paths = []  # Every file of the release, so extraction never has to walk the tree
+        self._remote_entries = {}  # Filemap entries of zips updated member by member from the server
+        self._abort = Event()  # Set when the release can't finish, so running transfers stop early
+        self._space_needed = 0  # Preflight total of download plus extraction bytes
+        self._unsized_files = 0  # Files the contents API gave no size for, reserved once the server reports one
+        self._free_space = 0  # Free bytes on the game drive when the crawl started
         self.updateFlow = updateFlow
         self.game = game
         self.online = online
@@ -166,6 +249,16 @@ class GofileDownloader:
         self.download_dir = os.path.join(download_dir, sanitize_folder_name(game))
         os.makedirs(self.download_dir, exist_ok=True)
         self.game_info_path = os.path.join(self.download_dir, f"{sanitize_folder_name(game)}.ascendara.json")
+        # Progress ticks are written in the background; phase changes still use safe_write_json
+        self._progress_writer = ProgressWriter(self.game_info_path)
+        # Optional live event stream; when present the JSON file only records state changes
+        self._progress_channel = open_progress_channel(progress_stream, game)
+        # Also compare CRC32 checksums from the archive index, not just sizes
+        self._verify_hashes = verify_hashes
+        # Updates only write what changed since the installed version, judged against its filemap
+        self._installed_filemap = read_installed_filemap(self.download_dir) if updateFlow else {}
+        # Zips extract over the installed files, so the new contents only need room beyond what those take
+        self._space_credit = sum(info.get("size", 0) for info in self._installed_filemap.values())
         # Download speed limit (KB/s, 0 means unlimited)
         self._download_speed_limit = 0
         try:
@@ -178,6 +271,9 @@ class GofileDownloader:
                     self._download_speed_limit = settings.get('downloadLimit', 0)  # KB/s
         except Exception:
             self._download_speed_limit = 0
+        # Shares downloadLimit with every other running Ascendara download
+        self._speed_limiter = BandwidthLimiter(self._download_speed_limit, os.path.dirname(LOG_PATH))
+        self._telemetry = DownloadTelemetry(game, "AscendaraGofileHelper", os.path.dirname(LOG_PATH))
         # If updateFlow is True, preserve the JSON file and set updating flag
         if updateFlow and os.path.exists(self.game_info_path):
             with open(self.game_info_path, 'r') as f:
@@ -208,7 +304,13 @@ class GofileDownloader:
         safe_write_json(self.game_info_path, self.game_info)
 
     @staticmethod
-    def _getToken():
+    def _getToken(force_new=False):
+        if not force_new:
+            cached_token = GofileDownloader._load_cached_token()
+            if cached_token:
+                logging.info("[AscendaraGofileHelper] Reusing cached GoFile account token")
+                return cached_token
+
         user_agent = os.getenv("GF_USERAGENT", "Mozilla/5.0")
         headers = {
             "User-Agent": user_agent,
@@ -216,10 +318,44 @@ class GofileDownloader:
             "Accept": "*/*",
             "Connection": "keep-alive",
         }
-        create_account_response = requests.post("https://api.gofile.io/accounts", headers=headers).json()
+        create_account_response = get_session("gofile").post(f"{GOFILE_API_URL}/accounts", headers=headers).json()
         if create_account_response["status"] != "ok":
             raise Exception("Account creation failed!")
-        return create_account_response["data"]["token"]
+        token = create_account_response["data"]["token"]
+        try:
+            safe_write_json(TOKEN_CACHE_PATH, {"token": token, "created": time.time()})
+        except Exception as e:
+            logging.warning(f"[AscendaraGofileHelper] Could not cache GoFile token: {e}")
+        return token
+
+    @staticmethod
+    def _load_cached_token():
+        try:
+            with open(TOKEN_CACHE_PATH, 'r') as f:
+                cache = json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logging.warning(f"[AscendaraGofileHelper] Ignoring unreadable token cache: {e}")
+            return None
+        # Anything but the shape _getToken writes is discarded, and a new account replaces it
+        token = cache.get("token") if isinstance(cache, dict) else None
+        created = cache.get("created") if isinstance(cache, dict) else None
+        if not isinstance(token, str) or not token or not isinstance(created, (int, float)):
+            logging.warning("[AscendaraGofileHelper] Ignoring malformed token cache")
+            return None
+        if time.time() - created > TOKEN_CACHE_MAX_AGE:
+            logging.info("[AscendaraGofileHelper] Cached GoFile token expired")
+            return None
+        return token
+
+    def _refresh_token(self, rejected_token):
+        """Replace a token GoFile rejected. Threads that hit the same rejection share one new account."""
+        with self._token_lock:
+            if self._token == rejected_token:
+                logging.warning("[AscendaraGofileHelper] GoFile rejected the account token, creating a new guest account")
+                self._token = self._getToken(force_new=True)
+            return self._token
 
     def download_from_gofile(self, url, password=None, withNotification=None):
         # Fix URL if it starts with //
@@ -229,42 +365,18 @@ class GofileDownloader:
         content_id = url.split("/")[-1]
         _password = sha256(password.encode()).hexdigest() if password else None
 
-        files_info = self._parseLinksRecursively(content_id, _password)
-        
-        if not files_info:
-            logging.error(f"[AscendaraGofileHelper] No files found for download from {url}. Skipping...")
-            handleerror(self.game_info, self.game_info_path, "no_files_error")
-            return
-
-        # Calculate total size first
         self._total_size = 0
-        for file_info in files_info.values():
-            try:
-                response = requests.head(
-                    file_info["link"],
-                    headers={"Cookie": f"accountToken={self._token}"},
-                    timeout=self._download_timeout
-                )
-                if response.status_code == 200:
-                    file_size = int(response.headers.get('content-length', 0))
-                    self._total_size += file_size
-            except:
-                continue
-
-        total_files = len(files_info)
-        current_file = 0
-        
+        self._telemetry.set_provider("gofile", url.split("/")[2] if "://" in url else None)
+        self._report_phase("downloading")
         try:
-            for item in files_info.values():
-                current_file += 1
-                try:
-                    logging.info(f"[AscendaraGofileHelper] Downloading file {current_file}/{total_files}: {item.get('name', 'Unknown')}")
-                    self._downloadContent(item)
-                except Exception as e:
-                    logging.error(f"[AscendaraGofileHelper] Error downloading {item.get('name', 'Unknown')}: {str(e)}")
-                    # Wait a bit before trying the next file
-                    time.sleep(2)
-                    continue
+            # Files start downloading as soon as the crawler finds them
+            files_info = self._download_files(content_id, _password)
+
+            if not files_info:
+                logging.error(f"[AscendaraGofileHelper] No files found for download from {url}. Skipping...")
+                handleerror(self.game_info, self.game_info_path, "no_files_error")
+                self._report_phase("error", message="no_files_error")
+                return
 
             logging.info("[AscendaraGofileHelper] All files downloaded successfully, starting extraction...")
             self._extract_files()
@@ -288,6 +400,7 @@ class GofileDownloader:
             self.game_info["size"] = read_size(self._total_size)
 
             safe_write_json(self.game_info_path, self.game_info)
+            self._report_phase("done", bytes=self._total_size, verifyErrors=len(self.game_info["downloadingData"].get("verifyError", [])))
             logging.info("[AscendaraGofileHelper] Process completed successfully")
             
             if withNotification:
@@ -301,6 +414,7 @@ class GofileDownloader:
             logging.error(f"[AscendaraGofileHelper] Error during download process: {str(e)}")
             logging.error(f"Error during download process: {str(e)}")
             handleerror(self.game_info, self.game_info_path, str(e))
+            self._report_phase("error", message=str(e))
             if withNotification:
                 _launch_notification(
                     withNotification,
@@ -308,177 +422,339 @@ class GofileDownloader:
                     f"Error {'updating' if self.updateFlow else 'downloading'} {self.game_info['game']}: {str(e)}"
                 )
             raise
+        finally:
+            self._telemetry.finish()
+
+    def _head_size(self, url):
+        response = self._session.head(
+            url,
+            headers={"Cookie": f"accountToken={self._token}"},
+            allow_redirects=True,
+            timeout=self._download_timeout
+        )
+        if response.status_code != 200:
+            raise Exception(f"HEAD returned status {response.status_code}")
+        return int(response.headers.get('content-length', 0))
+
+    def _download_item(self, item):
+        if not item.get("size"):
+            # The contents API didn't size this file, so ask the server before choosing a download mode
+            try:
+                with self._telemetry.phase("probe"):
+                    item["size"] = self._head_size(item["link"])
+            except Exception as e:
+                logging.warning(f"[AscendaraGofileHelper] Could not determine size of {item.get('filename', 'Unknown')}: {e}")
+            with self._progress_lock:
+                self._total_size += item.get("size") or 0
+            if item.get("size"):
+                # Left out of the preflight while its size was unknown
+                self._reserve_space(item)
+        # An update of a zip can fetch just the changed members instead of the whole archive
+        if self._installed_filemap and item["filename"].lower().endswith('.zip') and self._update_from_remote_zip(item):
+            return True
+        self._downloadContent(item)
+        return False
+
+    def _update_from_remote_zip(self, item):
+        """Write the changed members of a zip straight from the server; False when a full download is the better choice."""
+        url = item["link"]
+        remote_zip = peek_remote_zip(url, headers=self._download_headers(url), session=self._session, limiter=self._speed_limiter)
+        if not remote_zip:
+            return False
+        try:
+            first_word = self.game.strip().split()[0].lower() if self.game.strip() else None
+            root, watching_data, members = remote_zip.plan(self.download_dir, game_folder=sanitize_folder_name(self.game),
+                                                           first_word=first_word, installed=self._installed_filemap)
+            fetch_size = remote_zip.fetch_size(members)
+            if fetch_size > remote_zip.size * DELTA_MAX_RATIO:
+                logging.info(f"[AscendaraGofileHelper] {read_size(fetch_size)} of {item['filename']} changed, downloading the whole archive")
+                return False
+            logging.info(f"[AscendaraGofileHelper] Updating {len(members)} changed member(s) of {item['filename']}: "
+                         f"fetching {read_size(fetch_size)} instead of {read_size(remote_zip.size)}")
+            # Changed members are written next to the files they replace before the old ones go
+            check_free_space(self.download_dir, sum(info.file_size for info in members))
+            with self._progress_lock:
+                self._total_size += fetch_size - (item.get("size") or 0)
+            file_key = f"{item['path']}/{item['filename']}"
+            baseline = remote_zip.reader.fetched
+            remote_zip.extract(self.download_dir, members, root,
+                               on_progress=lambda fetched: self._record_progress(file_key, fetched - baseline))
+            self._record_progress(file_key, fetch_size, force=True)
+        finally:
+            self._telemetry.retry("transfer", remote_zip.reader.retries)
+            remote_zip.close()
+        with self._lock:
+            self._remote_entries.update(watching_data)
+        return True
+
+    def _download_files(self, content_id, password):
+        """Crawl the content tree and download every file it yields on a shared worker pool."""
+        self._last_report_time = time.monotonic()
+        self._last_report_bytes = 0
+
+        futures = {}
+        failed = []
+        space_error = None
+        self._free_space = free_space(self.download_dir)
+        # Crawling and downloading overlap, so the resolve phase runs inside the transfer phase
+        with self._telemetry.phase("transfer", counter=lambda: self._speed_limiter.transferred), \
+                ThreadPoolExecutor(max_workers=self._max_workers) as pool:
+            def queue_file(item):
+                # Fails the crawl before a file that can't fit is ever queued
+                self._reserve_space(item)
+                with self._progress_lock:
+                    self._total_size += item.get("size") or 0
+                futures[pool.submit(self._download_item, item)] = item
+                logging.info(f"[AscendaraGofileHelper] Queued file {len(futures)}: {item.get('filename', 'Unknown')}")
+
+            try:
+                with self._telemetry.phase("resolve"):
+                    files_info = self._parseLinksRecursively(content_id, password, on_file=queue_file)
+            except Exception:
+                self._abort.set()
+                pool.shutdown(wait=True, cancel_futures=True)
+                raise
+            logging.info(f"[AscendaraGofileHelper] Found {len(files_info)} file(s), downloading with {self._max_workers} worker(s); "
+                         f"{read_size(self._space_needed)} needed with extraction, {read_size(self._free_space)} free"
+                         + (f", {self._unsized_files} file(s) of unknown size" if self._unsized_files else ""))
+
+            # The crawl is finished, so split archive sets can be told apart from standalone archives
+            folder_names = {}
+            for entry in files_info.values():
+                folder_names.setdefault(entry["path"], []).append(entry["filename"])
+
+            for future in as_completed(futures):
+                item = futures[future]
+                try:
+                    updated_in_place = future.result()
+                except InsufficientSpaceError as e:
+                    # A file sized only once its download started didn't fit; the rest can't finish either
+                    logging.error(f"[AscendaraGofileHelper] {e}")
+                    self._abort.set()
+                    space_error = space_error or e
+                    failed.append(item.get('filename', 'Unknown'))
+                    continue
+                except Exception as e:
+                    logging.error(f"[AscendaraGofileHelper] Error downloading {item.get('filename', 'Unknown')}: {str(e)}")
+                    failed.append(item.get('filename', 'Unknown'))
+                    continue
+                if not failed and not updated_in_place and is_independent_archive(item["filename"], folder_names.get(item["path"], [])):
+                    self._pipeline_extract(os.path.join(self.download_dir, item["path"], item["filename"]))
+
+        if failed:
+            if self._extraction_pipeline:
+                self._extraction_pipeline.finish()
+                self._extraction_pipeline = None
+            if space_error:
+                raise space_error
+            raise Exception(f"Failed to download {len(failed)} file(s): {', '.join(failed)}")
+        self._downloaded_paths = [os.path.join(self.download_dir, entry["path"], entry["filename"]) for entry in files_info.values()]
+        if files_info:
+            self._update_progress(f"{len(files_info)} file(s)", 100, 0, 0, done=True)
+        return files_info
 
-    def _parseLinksRecursively(self, content_id, password, current_path=""):
-        url = f"https://api.gofile.io/contents/{content_id}?wt=4fd6sg89d7s6&cache=true"
+    def _reserve_space(self, item):
+        """Add a file and its extracted contents to the preflight total, raising once the drive can't hold them."""
+        size = item.get("size")
+        if not size:
+            # Unknown rather than empty; _download_item reserves it once the server reports a size
+            with self._lock:
+                self._unsized_files += 1
+            return
+        filepath = os.path.join(self.download_dir, item["path"], item["filename"])
+        # Bytes of a finished or resumable earlier attempt are already on disk
+        on_disk = max((os.path.getsize(path) for path in (filepath, f"{filepath}.part") if os.path.isfile(path)), default=0)
+        extract_bytes = extraction_estimate(item["filename"], size)
+        # Workers reserve files sized late while the crawl is still reserving the rest
+        with self._lock:
+            if item["filename"].lower().endswith('.zip'):
+                credit = min(self._space_credit, extract_bytes)
+                self._space_credit -= credit
+                extract_bytes -= credit
+            self._space_needed += max(0, size - on_disk) + extract_bytes
+            if self._space_needed + SAFETY_MARGIN > self._free_space:
+                raise InsufficientSpaceError(self.download_dir, self._space_needed + SAFETY_MARGIN, self._free_space)
+
+    def _check_abort(self):
+        if self._abort.is_set():
+            raise Exception("Download aborted")
+
+    def _pipeline_extract(self, archive_path):
+        if not self._check_extraction_tools([archive_kind(archive_path)]):
+            return  # Left for _extract_files, which reports the missing tool once the download is done
+        if self._extraction_pipeline is None:
+            self._extraction_pipeline = ExtractionPipeline(
+                lambda path: self._extract_archive(ArchiveSet(archive_kind(path), [path])))
+        self._extraction_pipeline.submit(os.path.normpath(archive_path))
+
+    def _record_progress(self, file_key, downloaded, force=False):
+        """Update the shared aggregator and publish combined progress at most every 0.5 seconds."""
+        with self._progress_lock:
+            self._current_file_progress[file_key] = downloaded
+            now = time.monotonic()
+            elapsed = now - self._last_report_time
+            if not force and elapsed < 0.5:
+                return
+            self._total_downloaded = sum(self._current_file_progress.values())
+
+            # Calculate overall progress percentage
+            if self._total_size > 0:
+                progress = min((self._total_downloaded / self._total_size) * 100, 100)
+                # Ensure progress never decreases
+                progress = max(progress, self._last_progress)
+                self._last_progress = progress
+            else:
+                progress = 0
+
+            # Combined rate of every active worker
+            if elapsed > 0:
+                current_rate = max(self._total_downloaded - self._last_report_bytes, 0) / elapsed
+                self._rate_window.append(current_rate)
+                if len(self._rate_window) > self._rate_window_size:
+                    self._rate_window.pop(0)
+
+            # Use average rate for smoother updates
+            avg_rate = sum(self._rate_window) / len(self._rate_window) if self._rate_window else 0
+            remaining_bytes = max(self._total_size - self._total_downloaded, 0)
+            eta = int(remaining_bytes / avg_rate) if avg_rate > 0 else 0
+
+            self._last_report_time = now
+            self._last_report_bytes = self._total_downloaded
+        self._update_progress(os.path.basename(file_key), progress, avg_rate, eta)
+
+    def _fetchContents(self, content_id, password):
+        url = f"{GOFILE_API_URL}/contents/{content_id}?wt=4fd6sg89d7s6&cache=true"
         if password:
             url = f"{url}&password={password}"
 
-        headers = {
-            "User-Agent": os.getenv("GF_USERAGENT", "Mozilla/5.0"),
-            "Accept-Encoding": "gzip, deflate, br",
-            "Accept": "*/*",
-            "Connection": "keep-alive",
-            "Authorization": f"Bearer {self._token}",
-        }
+        for attempt in range(2):
+            token = self._token
+            headers = {
+                "User-Agent": os.getenv("GF_USERAGENT", "Mozilla/5.0"),
+                "Accept-Encoding": "gzip, deflate, br",
+                "Accept": "*/*",
+                "Connection": "keep-alive",
+                "Authorization": f"Bearer {token}",
+            }
 
-        response = requests.get(url, headers=headers).json()
+            http_response = self._session.get(url, headers=headers)
+            try:
+                response = http_response.json()
+            except ValueError:
+                response = {"status": f"http-{http_response.status_code}"}
+
+            # A cached token may have been revoked since it was saved
+            rejected = http_response.status_code == 401 or response.get("status") in TOKEN_REJECTED_STATUSES
+            if rejected and attempt == 0:
+                self._refresh_token(token)
+                continue
+            break
 
         if response["status"] != "ok":
             logging.error(f"[AscendaraGofileHelper] Failed to get a link as response from the {url}.")
-            return {}
+            return None
+        return response["data"]
 
-        data = response["data"]
-        files_info = {}
+    def _parseLinksRecursively(self, content_id, password, current_path="", on_file=None):
+        """Breadth-first walk of a content tree with up to max_workers folder listings in flight.
 
-        if data["type"] == "folder":
-            # Don't add the folder name to the path, keep files at the game root level
-            folder_path = current_path
-            os.makedirs(os.path.join(self.download_dir, folder_path), exist_ok=True)
+        on_file is called with each file entry as soon as its folder has been listed.
+        """
+        files_info = {}
 
-            for child_id in data["children"]:
-                child = data["children"][child_id]
-                if child["type"] == "folder":
-                    files_info.update(self._parseLinksRecursively(child["id"], password, folder_path))
-                else:
-                    files_info[child["id"]] = {
-                        "path": folder_path,
-                        "filename": child["name"],
-                        "link": child["link"]
-                    }
-        else:
-            files_info[data["id"]] = {
-                "path": current_path,
-                "filename": data["name"],
-                "link": data["link"]
+        def add_file(entry, path):
+            if not is_wanted_member(f"{path}/{entry['name']}"):
+                logging.info(f"[AscendaraGofileHelper] Skipping {entry['name']}, it would be removed after extraction")
+                return
+            files_info[entry["id"]] = {
+                "path": path,
+                "filename": entry["name"],
+                "link": entry["link"],
+                "size": entry.get("size", 0)
             }
+            if on_file:
+                on_file(files_info[entry["id"]])
+
+        with ThreadPoolExecutor(max_workers=self._max_workers) as pool:
+            pending = {pool.submit(self._fetchContents, content_id, password): current_path}
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    path = pending.pop(future)
+                    data = future.result()
+                    if data is None:
+                        continue
+
+                    if data["type"] != "folder":
+                        add_file(data, path)
+                        continue
+
+                    # Don't add the folder name to the path, keep files at the game root level
+                    os.makedirs(os.path.join(self.download_dir, path), exist_ok=True)
+                    for child in data["children"].values():
+                        if child["type"] == "folder":
+                            pending[pool.submit(self._fetchContents, child["id"], password)] = path
+                        else:
+                            add_file(child, path)
 
         return files_info
 
-    def _downloadContent(self, file_info, chunk_size=None):  # chunk_size determined by limit
+    def _downloadContent(self, file_info, chunk_size=262144):
 
         filepath = os.path.join(self.download_dir, file_info["path"], file_info["filename"])
+        file_key = f"{file_info['path']}/{file_info['filename']}"
         if os.path.exists(filepath) and os.path.getsize(filepath) > 0:
             logging.info(f"{filepath} already exists, skipping.")
+            self._record_progress(file_key, os.path.getsize(filepath), force=True)
             return
 
         tmp_file = f"{filepath}.part"
         url = file_info["link"]
         os.makedirs(os.path.dirname(filepath), exist_ok=True)
         
+        if self._should_segment(file_info, tmp_file):
+            if self._downloadSegmented(file_info, filepath, file_key):
+                return
+
         for retry in range(self._max_retries):
             try:
-                headers = {
-                    "Cookie": f"accountToken={self._token}",
-                    "Accept-Encoding": "gzip, deflate, br",
-                    "User-Agent": os.getenv("GF_USERAGENT", "Mozilla/5.0"),
-                    "Accept": "*/*",
-                    "Referer": f"{url}{('/' if not url.endswith('/') else '')}",
-                    "Origin": url,
-                    "Connection": "keep-alive",
-                    "Sec-Fetch-Dest": "empty",
-                    "Sec-Fetch-Mode": "cors",
-                    "Sec-Fetch-Site": "same-site",
-                    "Pragma": "no-cache",
-                    "Cache-Control": "no-cache"
-                }
+                headers = self._download_headers(url)
 
                 part_size = 0
                 if os.path.isfile(tmp_file):
                     part_size = int(os.path.getsize(tmp_file))
                     headers["Range"] = f"bytes={part_size}-"
 
-                with requests.get(url, headers=headers, stream=True, timeout=(9, self._download_timeout)) as response:
+                with self._session.get(url, headers=headers, stream=True, timeout=(9, self._download_timeout)) as response:
                     if ((response.status_code in (403, 404, 405, 500)) or
                         (part_size == 0 and response.status_code != 200) or
                         (part_size > 0 and response.status_code != 206)):
                         logging.warning(f"[AscendaraGofileHelper] Couldn't download the file from {url}. Status code: {response.status_code}")
                         if retry < self._max_retries - 1:
                             logging.info(f"[AscendaraGofileHelper] Retrying download ({retry + 2}/{self._max_retries})...")
+                            self._telemetry.retry("transfer")
                             time.sleep(2 ** retry)  # Exponential backoff
                             continue
-                        return
+                        raise Exception(f"Server returned status {response.status_code} for {file_info['filename']}")
 
                     total_size = int(response.headers.get("Content-Length", 0)) + part_size
                     if not total_size:
-                        logging.warning(f"[AscendaraGofileHelper] Couldn't find the file size from {url}.")
-                        return
+                        raise Exception(f"Couldn't find the file size from {url}")
 
                     mode = 'ab' if part_size > 0 else 'wb'
                     with open(tmp_file, mode) as f:
                         downloaded = part_size
-                        start_time = time.time()
-                        last_update = start_time
-                        bytes_since_last_update = 0
-                        self._rate_window = []  # Reset rate window for new download
-                        file_key = f"{file_info['path']}/{file_info['filename']}"
-                        self._current_file_progress[file_key] = part_size
-
-                        # Use small chunk size and strict limiter if limiting, otherwise large chunk size and no limiter
-                        if self._download_speed_limit and self._download_speed_limit > 0:
-                            chunk_size = 4096
-                        else:
-                            chunk_size = 32768
-                        start_time = time.time()
-                        bytes_downloaded = 0
+                        self._record_progress(file_key, downloaded)
+
+                        # The shared token bucket paces every worker and process, so large chunks are fine even when limiting
                         for chunk in response.iter_content(chunk_size=chunk_size):
                             if not chunk:
                                 continue
-                            
+                            self._check_abort()
                             f.write(chunk)
                             downloaded += len(chunk)
-                            bytes_since_last_update += len(chunk)
-                            bytes_downloaded += len(chunk)
-                            current_time = time.time()
-                            
-                            # Only run limiter if limiting
-                            if self._download_speed_limit and self._download_speed_limit > 0:
-                                elapsed = current_time - start_time
-                                if elapsed > 0:
-                                    allowed_bytes = self._download_speed_limit * 1024 * elapsed
-                                    if bytes_downloaded > allowed_bytes:
-                                        sleep_time = (bytes_downloaded - allowed_bytes) / (self._download_speed_limit * 1024)
-                                        if sleep_time > 0:
-                                            time.sleep(sleep_time)
-                            # If no limit is set, run at full speed (do nothing)
-                            
-                            # Update progress every 0.5 seconds
-                            if current_time - last_update >= 0.5:
-                                # Update both file and total progress
-                                self._current_file_progress[file_key] = downloaded
-                                self._total_downloaded = sum(self._current_file_progress.values())
-                                
-                                # Calculate overall progress percentage
-                                if self._total_size > 0:
-                                    progress = (self._total_downloaded / self._total_size) * 100
-                                    # Ensure progress never decreases
-                                    progress = max(progress, self._last_progress)
-                                    self._last_progress = progress
-                                else:
-                                    progress = 0
-                                
-                                # Calculate current rate
-                                current_rate = bytes_since_last_update / (current_time - last_update)
-                                
-                                # Update rate window
-                                self._rate_window.append(current_rate)
-                                if len(self._rate_window) > self._rate_window_size:
-                                    self._rate_window.pop(0)
-                                
-                                # Use average rate for smoother updates
-                                avg_rate = sum(self._rate_window) / len(self._rate_window)
-                                remaining_bytes = self._total_size - self._total_downloaded
-                                eta = int(remaining_bytes / avg_rate) if avg_rate > 0 else 0
-                                
-                                self._update_progress(
-                                    file_info["filename"], 
-                                    progress,
-                                    avg_rate,
-                                    eta
-                                )
-                                
-                                last_update = current_time
-                                bytes_since_last_update = 0
+                            self._speed_limiter.consume(len(chunk))
+                            self._record_progress(file_key, downloaded)
 
                     # Download completed successfully
                     try:
@@ -496,7 +772,6 @@ class GofileDownloader:
                             os.replace(tmp_file, filepath)
                         except (PermissionError, OSError):
                             # If replace fails, try a copy+delete approach
-                            import shutil
                             shutil.copy2(tmp_file, filepath)
                             os.remove(tmp_file)
                     except Exception as e:
@@ -505,18 +780,14 @@ class GofileDownloader:
                         raise Exception(f"Failed to move file to destination: {str(e)}")
                         
                     # Update final progress
-                    self._current_file_progress[file_key] = total_size
-                    self._total_downloaded = sum(self._current_file_progress.values())
-                    if self._total_size > 0:
-                        final_progress = (self._total_downloaded / self._total_size) * 100
-                    else:
-                        final_progress = 100
-                    self._update_progress(file_info["filename"], final_progress, 0, 0, done=True)
+                    self._record_progress(file_key, total_size, force=True)
+                    logging.info(f"[AscendaraGofileHelper] Finished downloading {file_info['filename']}")
                     return
             except (requests.exceptions.RequestException, IOError) as e:
                 logging.error(f"[AscendaraGofileHelper] Error downloading {url}: {str(e)}")
                 if retry < self._max_retries - 1:
                     logging.info(f"[AscendaraGofileHelper] Retrying download ({retry + 2}/{self._max_retries})...")
+                    self._telemetry.retry("transfer")
                     time.sleep(2 ** retry)  # Exponential backoff
                     continue
                 if os.path.exists(tmp_file):
@@ -525,60 +796,136 @@ class GofileDownloader:
 
         raise Exception(f"Failed to download {url} after {self._max_retries} retries")
 
+    def _download_headers(self, url):
+        return {
+            "Cookie": f"accountToken={self._token}",
+            "Accept-Encoding": "gzip, deflate, br",
+            "User-Agent": os.getenv("GF_USERAGENT", "Mozilla/5.0"),
+            "Accept": "*/*",
+            "Referer": f"{url}{('/' if not url.endswith('/') else '')}",
+            "Origin": url,
+            "Connection": "keep-alive",
+            "Sec-Fetch-Dest": "empty",
+            "Sec-Fetch-Mode": "cors",
+            "Sec-Fetch-Site": "same-site",
+            "Pragma": "no-cache",
+            "Cache-Control": "no-cache"
+        }
+
+    def _should_segment(self, file_info, tmp_file):
+        if self._max_segments < 2:
+            return False
+        # A segment journal means a previous run already chose segmented mode for this file
+        if os.path.exists(f"{tmp_file}{SEGMENT_JOURNAL_SUFFIX}"):
+            return True
+        # A plain .part file is resumed by appending to it, as before
+        if os.path.isfile(tmp_file):
+            return False
+        return file_info.get("size", 0) >= SEGMENTED_MIN_FILE_SIZE
+
+    def _downloadSegmented(self, file_info, filepath, file_key):
+        """Fetch one large file over several ranged connections. Returns False if the server can't do ranges."""
+        url = file_info["link"]
+        headers = self._download_headers(url)
+        try:
+            with self._telemetry.phase("probe"):
+                remote = probe_remote_file(url, headers, session=self._session, timeout=self._download_timeout)
+        except requests.exceptions.RequestException as e:
+            logging.warning(f"[AscendaraGofileHelper] Range probe failed for {file_info['filename']}: {e}")
+            return False
+        total_size = remote["size"]
+        if not remote["ranges"] or not total_size:
+            logging.info(f"[AscendaraGofileHelper] Server does not support ranges for {file_info['filename']}, using a single connection")
+            return False
+
+        logging.info(f"[AscendaraGofileHelper] Downloading {file_info['filename']} in up to {self._max_segments} segments")
+        def on_progress(downloaded):
+            self._check_abort()
+            self._record_progress(file_key, downloaded)
+        segmented = SegmentedDownload(
+            url,
+            filepath,
+            total_size,
+            headers=headers,
+            segments=self._max_segments,
+            session=self._session,
+            timeout=self._download_timeout,
+            max_retries=self._max_retries,
+            on_progress=on_progress,
+            limiter=self._speed_limiter,
+            etag=remote["etag"],
+        )
+        try:
+            segmented.run()
+        finally:
+            self._telemetry.retry("transfer", segmented.retries)
+        self._record_progress(file_key, total_size, force=True)
+        logging.info(f"[AscendaraGofileHelper] Finished downloading {file_info['filename']}")
+        return True
+
+    def _report_extract_progress(self, written_bytes, total_bytes, rate, eta):
+        percent = written_bytes / total_bytes * 100 if total_bytes else 100
+        with self._lock:
+            self.game_info["downloadingData"]["progressCompleted"] = f"{percent:.2f}"
+            self.game_info["downloadingData"]["progressDownloadSpeeds"] = format_speed(rate)
+            self.game_info["downloadingData"]["timeUntilComplete"] = format_eta(eta)
+            if self._progress_channel:
+                self._progress_channel.progress("extracting", written_bytes, total_bytes, rate, eta)
+            else:
+                self._progress_writer.submit(self.game_info)
+
+    def _report_verify_progress(self, checked_bytes, total_bytes):
+        percent = checked_bytes / total_bytes * 100 if total_bytes else 100
+        with self._lock:
+            self.game_info["downloadingData"]["progressCompleted"] = f"{percent:.2f}"
+            if self._progress_channel:
+                self._progress_channel.progress("verifying", checked_bytes, total_bytes)
+            else:
+                self._progress_writer.submit(self.game_info)
+
+    def _report_phase(self, phase, **fields):
+        if phase == "error":
+            self._telemetry.fail(fields.get("message"))
+        if self._progress_channel:
+            self._progress_channel.phase(phase, **fields)
+
     def _update_progress(self, filename, progress, rate, eta_seconds=0, done=False):
         with self._lock:
             self.game_info["downloadingData"]["downloading"] = not done
             self.game_info["downloadingData"]["progressCompleted"] = f"{progress:.2f}"
-            
-            # Format speed with consistent decimal places and thresholds
-            def format_speed(rate):
-                if rate < 0.1:  # Very slow speeds
-                    return "0.00 B/s"
-                elif rate < 1024:
-                    return f"{rate:.2f} B/s"
-                elif rate < 1024 * 1024:
-                    return f"{(rate / 1024):.2f} KB/s"
-                elif rate < 1024 * 1024 * 1024:
-                    return f"{(rate / (1024 * 1024)):.2f} MB/s"
-                else:
-                    return f"{(rate / (1024 * 1024 * 1024)):.2f} GB/s"
-            
             self.game_info["downloadingData"]["progressDownloadSpeeds"] = format_speed(rate)
-            
-            # Format ETA with improved granularity
-            if done:
-                eta = "0s"
-            elif eta_seconds <= 0:
-                eta = "calculating..."
-            elif eta_seconds < 60:
-                eta = f"{int(eta_seconds)}s"
-            elif eta_seconds < 3600:
-                minutes = int(eta_seconds / 60)
-                seconds = int(eta_seconds % 60)
-                eta = f"{minutes}m, {seconds}s"
-            elif eta_seconds < 86400:
-                hours = int(eta_seconds / 3600)
-                minutes = int((eta_seconds % 3600) / 60)
-                eta = f"{hours}h, {minutes}m"
-            else:
-                days = int(eta_seconds / 86400)
-                hours = int((eta_seconds % 86400) / 3600)
-                eta = f"{days}d, {hours}h"
-            
+            eta = "0s" if done else format_eta(eta_seconds)
             self.game_info["downloadingData"]["timeUntilComplete"] = eta
             
             if done:
                 print(f"\rDownloading {filename}: 100% Complete!{NEW_LINE}")
             else:
                 print(f"\rDownloading {filename}: {progress:.1f}% {format_speed(rate)} ETA: {eta}", end="")
-            
-            safe_write_json(self.game_info_path, self.game_info)
 
-    def _check_extraction_tools(self):
-        """Check if required extraction tools are available and try to install if missing."""
+            if self._progress_channel:
+                self._progress_channel.progress("downloading", self._total_downloaded, self._total_size, rate, eta_seconds)
+            if done:
+                safe_write_json(self.game_info_path, self.game_info)
+            elif not self._progress_channel:
+                self._progress_writer.submit(self.game_info)
+
+    def _check_extraction_tools(self, kinds):
+        """Check the tools the given archive kinds need are available and try to install them if missing."""
+        # zip, 7z and tar are read in Python; rar needs unrar or unar only without the unrar module
+        if 'rar' not in kinds:
+            return True
+        if self._rar_tools is None:
+            self._rar_tools = self._find_rar_tools()
+        return self._rar_tools
+
+    def _find_rar_tools(self):
+        try:
+            from unrar import rarfile
+            return True
+        except ImportError:
+            pass
         if sys.platform != "win32":
             try:
-                import shutil
                 if sys.platform == "darwin":  # macOS
                     # Check for unar first
                     unar_path = shutil.which('unar')
@@ -622,206 +969,83 @@ class GofileDownloader:
                 return False
         return True  # Windows doesn't need additional tools
 
+    def _extract_archive(self, archive_set, on_progress=None):
+        """Extract one archive set straight into the game directory and return its filemap entries."""
+        # A SteamRIP or game-named root folder is stripped while extracting, not moved afterwards
+        game_folder = sanitize_folder_name(self.game)
+        first_word = self.game.strip().split()[0].lower() if self.game.strip() else None
+        # Pipelined sets extract during the transfer, so the extract phase can overlap it
+        with self._telemetry.phase("extract"):
+            # Always extract to the game directory instead of the archive's directory
+            entries = extract_archive_set(archive_set, self.download_dir, game_folder=game_folder, first_word=first_word,
+                                          installed=self._installed_filemap, on_progress=on_progress)
+        self._telemetry.add_bytes("extract", sum(entry.get("size", 0) for entry in entries.values()))
+        return entries
+
     def _extract_files(self):
         self.game_info["downloadingData"]["extracting"] = True
         safe_write_json(self.game_info_path, self.game_info)
-
-        # Check if extraction tools are available
-        if not self._check_extraction_tools():
-            error_msg = "Required extraction tools are not available. Please install 'unrar' manually."
-            logging.error(error_msg)
-            self.game_info["downloadingData"]["extracting"] = False
-            self.game_info["downloadingData"]["verifyError"] = [{
-                "file": "extraction_process",
-                "error": error_msg
-            }]
-            safe_write_json(self.game_info_path, self.game_info)
-            return
+        self._report_phase("extracting")
 
         # Create watching file for tracking extracted files
         watching_path = os.path.join(self.download_dir, "filemap.ascendara.json")
         watching_data = {}
+        pre_extracted = []
+        if self._extraction_pipeline:
+            # Archives that finished early were extracted while the rest of the release downloaded
+            watching_data, pre_extracted = self._extraction_pipeline.finish()
+            self._extraction_pipeline = None
+        # Zips updated from the server already wrote their changed members
+        watching_data.update(self._remote_entries)
         self.archive_paths = []  # Store archive paths as instance variable
-        # First extract all archives
-        for root, _, files in os.walk(self.download_dir):
-            for file in files:
-                if file.endswith(('.zip', '.rar')):
-                    archive_path = os.path.join(root, file)
-                    # Store the archive path for later cleanup
-                    self.archive_paths.append(archive_path)
-                    # Always extract to the game directory instead of the archive's directory
-                    extract_dir = self.download_dir
-                    logging.info(f"[AscendaraGofileHelper] Extracting {archive_path}")
-                    
-                    try:
-                        # check os
-                        if sys.platform == "win32":
-                            if file.endswith('.zip'):
-                                with zipfile.ZipFile(archive_path, 'r') as zip_ref:
-                                    for zip_info in zip_ref.infolist():
-                                        if not zip_info.filename.endswith('.url') and '_CommonRedist' not in zip_info.filename:  # Skip .url files and _CommonRedist
-                                            extracted_path = os.path.join(extract_dir, zip_info.filename)
-                                            zip_ref.extract(zip_info, extract_dir)
-                                            # Add to watching data
-                                            key = f"{os.path.relpath(extracted_path, self.download_dir)}"
-                                            watching_data[key] = {"size": zip_info.file_size}
-                            elif file.endswith('.rar'):
-                                from unrar import rarfile
-                                with rarfile.RarFile(archive_path, 'r') as rar_ref:
-                                    # Get file list before extraction
-                                    for rar_info in rar_ref.infolist():
-                                        if not rar_info.filename.endswith('.url') and '_CommonRedist' not in rar_info.filename:  # Skip .url files and _CommonRedist
-                                            extracted_path = os.path.join(extract_dir, rar_info.filename)
-                                            key = f"{os.path.relpath(extracted_path, self.download_dir)}"
-                                            watching_data[key] = {"size": rar_info.file_size}
-                                    # Extract all files
-                                    rar_ref.extractall(extract_dir)
-                        else:
-                            # For non-Windows, use appropriate extraction tool
-                            try:
-                                # Create a temporary directory for extraction
-                                import tempfile
-                                with tempfile.TemporaryDirectory() as temp_dir:
-                                    if file.endswith('.rar'):
-                                        if sys.platform == "darwin":
-                                            # Use unar on macOS
-                                            unar_cmd = ['unar', '-force-overwrite', '-o', temp_dir, archive_path]
-                                            try:
-                                                result = subprocess.run(unar_cmd, check=True, capture_output=True, text=True)
-                                                logging.info(f"unar extraction output: {result.stdout}")
-                                            except subprocess.CalledProcessError as e:
-                                                logging.error(f"unar extraction failed: {e.stderr}")
-                                                raise
-                                        else:
-                                            # Use unrar on Linux
-                                            unrar_cmd = ['unrar', 'x', '-y', archive_path, temp_dir]
-                                            try:
-                                                result = subprocess.run(unrar_cmd, check=True, capture_output=True, text=True)
-                                                logging.info(f"unrar extraction output: {result.stdout}")
-                                            except subprocess.CalledProcessError as e:
-                                                logging.error(f"unrar extraction failed: {e.stderr}")
-                                                raise
-                                    else:
-                                        # Use patoolib for other formats
-                                        patoolib.extract_archive(archive_path, outdir=temp_dir)
-                                    
-                                    # Find the SteamRIP folder if it exists
-                                    steamrip_folder = None
-                                    for item in os.listdir(temp_dir):
-                                        if 'steamrip' in item.lower() and os.path.isdir(os.path.join(temp_dir, item)):
-                                            steamrip_folder = os.path.join(temp_dir, item)
-                                            break
-                                    
-                                    # Set the source directory to either SteamRIP folder or temp_dir
-                                    src_root = steamrip_folder if steamrip_folder else temp_dir
-                                    
-                                    # Move files from source to final location and track them
-                                    for dirpath, _, filenames in os.walk(src_root):
-                                        for fname in filenames:
-                                            if not fname.endswith('.url') and '_CommonRedist' not in fname:
-                                                src_path = os.path.join(dirpath, fname)
-                                                # Calculate relative path from source root
-                                                rel_path = os.path.relpath(src_path, src_root)
-                                                dst_path = os.path.join(extract_dir, rel_path)
-                                                
-                                                # Create destination directory if needed
-                                                os.makedirs(os.path.dirname(dst_path), exist_ok=True)
-                                                
-                                                # Move file and track it
-                                                try:
-                                                    shutil.move(src_path, dst_path)
-                                                    key = os.path.relpath(dst_path, self.download_dir)
-                                                    watching_data[key] = {"size": os.path.getsize(dst_path)}
-                                                    logging.info(f"[AscendaraGofileHelper] Extracted: {key}")
-                                                except (OSError, IOError) as e:
-                                                    logging.error(f"Error moving file {src_path}: {str(e)}")
-                            except Exception as e:
-                                logging.error(f"Error during extraction on non-Windows system: {str(e)}")
-                                raise
-                    except Exception as e:
-                        logging.error(f"[AscendaraGofileHelper] Error extracting {archive_path}: {str(e)}")
-                        continue
-
-        nested_dir = os.path.join(self.download_dir, sanitize_folder_name(self.game))
-        moved = False
-        if os.path.isdir(nested_dir):
-            for item in os.listdir(nested_dir):
-                src = os.path.join(nested_dir, item)
-                dst = os.path.join(self.download_dir, item)
-                if os.path.exists(dst):
-                    if os.path.isdir(dst):
-                        shutil.rmtree(dst, ignore_errors=True)
-                    else:
-                        os.remove(dst)
-                shutil.move(src, dst)
-            shutil.rmtree(nested_dir, ignore_errors=True)
-            logging.info(f"[AscendaraGofileHelper] Moved files from nested '{nested_dir}' to '{self.download_dir}'.")
-            moved = True
-            # Rebuild filemap after flattening
-            watching_data = {}
-            archive_exts = {'.rar', '.zip', '.7z', '.tar', '.gz', '.bz2', '.xz', '.iso'}
-            for dirpath, _, filenames in os.walk(self.download_dir):
-                rel_dir = os.path.relpath(dirpath, self.download_dir)
-                for fname in filenames:
-                    if fname.endswith('.url') or '_CommonRedist' in dirpath:
-                        continue
-                    if os.path.splitext(fname)[1].lower() in archive_exts:
-                        continue
-                    rel_path = os.path.normpath(os.path.join(rel_dir, fname)) if rel_dir != '.' else fname
-                    rel_path = rel_path.replace('\\', '/').replace('\\', '/')
-                    watching_data[rel_path] = {"size": os.path.getsize(os.path.join(dirpath, fname))}
-            safe_write_json(watching_path, watching_data)
-        # Remove all .url files after extraction
-        for dirpath, _, filenames in os.walk(self.download_dir):
-            for fname in filenames:
-                if fname.endswith('.url'):
-                    file_path = os.path.join(dirpath, fname)
-                    try:
-                        os.remove(file_path)
-                        logging.info(f"[AscendaraGofileHelper] Deleted .url file: {file_path}")
-                    except Exception as e:
-                        logging.warning(f"[AscendaraGofileHelper] Could not delete .url file: {file_path}: {e}")
-        # If not found, try to match by first word of game name
-        if not moved:
-            first_word = self.game.strip().split()[0].lower()
-            for entry in os.listdir(self.download_dir):
-                entry_path = os.path.join(self.download_dir, entry)
-                if os.path.isdir(entry_path) and entry.lower().startswith(first_word):
-                    for item in os.listdir(entry_path):
-                        src = os.path.join(entry_path, item)
-                        dst = os.path.join(self.download_dir, item)
-                        if os.path.exists(dst):
-                            if os.path.isdir(dst):
-                                shutil.rmtree(dst, ignore_errors=True)
-                            else:
-                                os.remove(dst)
-                        shutil.move(src, dst)
-                    shutil.rmtree(entry_path, ignore_errors=True)
-                    logging.info(f"[AscendaraGofileHelper] Moved files from nested '{entry_path}' (matched by first word) to '{self.download_dir}'.")
-                    # Rebuild filemap after flattening
-                    watching_data = {}
-                    archive_exts = {'.rar', '.zip', '.7z', '.tar', '.gz', '.bz2', '.xz', '.iso'}
-                    for dirpath, _, filenames in os.walk(self.download_dir):
-                        rel_dir = os.path.relpath(dirpath, self.download_dir)
-                        for fname in filenames:
-                            if fname.endswith('.url') or '_CommonRedist' in dirpath:
-                                continue
-                            if os.path.splitext(fname)[1].lower() in archive_exts:
-                                continue
-                            rel_path = os.path.normpath(os.path.join(rel_dir, fname)) if rel_dir != '.' else fname
-                            rel_path = rel_path.replace('\\', '/').replace('\\', '/')
-                            watching_data[rel_path] = {"size": os.path.getsize(os.path.join(dirpath, fname))}
-                    safe_write_json(watching_path, watching_data)
-                    break
-        # Remove archive files from watching_data (if not already rebuilt)
-        archive_exts = {'.rar', '.zip', '.7z', '.tar', '.gz', '.bz2', '.xz', '.iso'}
-        watching_data = {k: v for k, v in watching_data.items() if os.path.splitext(k)[1].lower() not in archive_exts}
+        failed = []
+        # First extract all archives; the download list already says where they are. The volumes of a
+        # split release form one set, extracted once from its first volume
+        archive_sets = find_archive_sets(path for path in self._downloaded_paths if os.path.isfile(path))
+        # Only rar sets may need a tool, and only those the pipeline didn't already extract
+        if not self._check_extraction_tools([archive_set.kind for archive_set in archive_sets
+                                             if os.path.normpath(archive_set.head) not in pre_extracted]):
+            raise RuntimeError("Required extraction tools are not available. Please install 'unrar' manually.")
+        # Totals come from the archive indexes, so bytes written, throughput and ETA are real numbers
+        progress = ExtractionProgress([archive_set for archive_set in archive_sets if can_extract(archive_set)],
+                                      on_update=self._report_extract_progress)
+        for index, archive_set in enumerate(archive_sets, 1):
+            if not can_extract(archive_set):
+                logging.warning(f"[AscendaraGofileHelper] No extractor for {archive_set.kind} archives, skipping {archive_set.name}")
+                continue
+            # Store every volume for later cleanup
+            self.archive_paths.extend(archive_set.volumes)
+            if os.path.normpath(archive_set.head) in pre_extracted:
+                progress.skip(archive_set)
+                continue
+            logging.info(f"[AscendaraGofileHelper] Extracting set {index}/{len(archive_sets)}: {archive_set.head} "
+                         f"({len(archive_set.volumes)} volume(s))")
+            try:
+                watching_data.update(self._extract_archive(archive_set, progress.tracker(archive_set)))
+            except Exception as e:
+                logging.error(f"[AscendaraGofileHelper] Error extracting {archive_set.head}: {str(e)}")
+                failed.append(archive_set.name)
+                continue
+            finally:
+                progress.finish(archive_set)
+        logging.info(f"[AscendaraGofileHelper] Extraction finished: {progress.summary()}")
+        if failed:
+            # The installed filemap is left as it was, so the old files are still known to the next update
+            raise RuntimeError(f"Failed to extract {len(failed)} archive(s): {', '.join(failed)}")
+
+        # Root folders were stripped and junk skipped while extracting, so the filemap is already final
+        watching_data = {k: v for k, v in watching_data.items() if not is_archive(k)}
+        if self._installed_filemap and (self.archive_paths or self._remote_entries):
+            # Only once the whole new version is in place, or a failed archive would take its old files with it
+            with self._telemetry.phase("cleanup"):
+                remove_stale_files(self.download_dir, self._installed_filemap, watching_data)
         safe_write_json(watching_path, watching_data)
 
-        # Set extraction to false and verifying to true (after flattening and filemap rebuild)
+        # Set extraction to false and verifying to true
         self.game_info["downloadingData"]["extracting"] = False
         self.game_info["downloadingData"]["verifying"] = True
         safe_write_json(self.game_info_path, self.game_info)
+        self._report_phase("verifying")
 
         # Start verification
         self._verify_extracted_files(watching_path)
@@ -831,47 +1055,19 @@ class GofileDownloader:
             with open(watching_path, 'r') as f:
                 watching_data = json.load(f)
 
-            # Find and delete _CommonRedist directories
-            for root, dirs, files in os.walk(self.download_dir):
-                if "_CommonRedist" in dirs:
-                    common_redist_path = os.path.join(root, "_CommonRedist")
-                    logging.info(f"[AscendaraGofileHelper] Found _CommonRedist directory at {common_redist_path}, deleting...")
-                    try:
-                        import shutil
-                        shutil.rmtree(common_redist_path)
-                        logging.info(f"[AscendaraGofileHelper] Successfully deleted {common_redist_path}")
-                    except Exception as e:
-                        logging.error(f"[AscendaraGofileHelper] Error deleting _CommonRedist directory: {str(e)}")
-
             verify_errors = []
             filtered_watching_data = {}
             for file_path, file_info in watching_data.items():
                 if "_CommonRedist" not in file_path:
                     filtered_watching_data[file_path] = file_info
-                    
-            for file_path, file_info in filtered_watching_data.items():
-                full_path = os.path.join(self.download_dir, file_path)
-                # Skip verification for directories
-                if os.path.isdir(full_path):
-                    continue
-                    
-                if not os.path.exists(full_path):
-                    verify_errors.append({
-                        "file": file_path,
-                        "error": "File not found",
-                        "expected_size": file_info["size"]
-                    })
-                    continue
 
-                # Verify file size
-                actual_size = os.path.getsize(full_path)
-                if actual_size != file_info["size"]:
-                    verify_errors.append({
-                        "file": file_path,
-                        "error": f"Size mismatch: expected {file_info['size']}, got {actual_size}",
-                        "expected_size": file_info["size"],
-                        "actual_size": actual_size
-                    })
+            # Directories are skipped; files are checked for size, and checksum in hash mode
+            with self._telemetry.phase("verify"):
+                verify_errors = verify_files(self.download_dir, filtered_watching_data, check_hashes=self._verify_hashes,
+                                             on_progress=self._report_verify_progress)
+            self._telemetry.add_bytes("verify", sum(info.get("size", 0) for info in filtered_watching_data.values()))
+            # Keep the stat stamps so the next verification skips files that haven't changed
+            safe_write_json(watching_path, watching_data)
 
             if verify_errors:
                 logging.warning(f"[AscendaraGofileHelper] Found {len(verify_errors)} verification errors")
@@ -885,13 +1081,14 @@ class GofileDownloader:
             else:
                 logging.info("[AscendaraGofileHelper] All extracted files verified successfully")
                 # Try to remove all archive files that were extracted
-                for archive_path in getattr(self, 'archive_paths', []):
-                    try:
-                        if os.path.exists(archive_path):
-                            os.remove(archive_path)
-                            logging.info(f"[AscendaraGofileHelper] Removed archive file: {archive_path}")
-                    except Exception as e:
-                        logging.error(f"[AscendaraGofileHelper] Error removing archive file {archive_path}: {str(e)}")
+                with self._telemetry.phase("cleanup"):
+                    for archive_path in getattr(self, 'archive_paths', []):
+                        try:
+                            if os.path.exists(archive_path):
+                                os.remove(archive_path)
+                                logging.info(f"[AscendaraGofileHelper] Removed archive file: {archive_path}")
+                        except Exception as e:
+                            logging.error(f"[AscendaraGofileHelper] Error removing archive file {archive_path}: {str(e)}")
                 if "verifyError" in self.game_info["downloadingData"]:
                     del self.game_info["downloadingData"]["verifyError"]
                 
@@ -997,6 +1194,8 @@ def main():
     parser.add_argument("download_dir", help="Directory to save the downloaded files")
     parser.add_argument("--password", help="Password for protected content", default=None)
     parser.add_argument("--withNotification", help="Theme name for notifications (e.g. light, dark, blue)", default=None)
+    parser.add_argument("--progressStream", help="Stream progress events as JSON lines to 'stdout' or a local 'HOST:PORT' socket", default=None)
+    parser.add_argument("--verifyHashes", action="store_true", help="Verify extracted files against archive checksums, not just sizes")
 
     try:
         if len(sys.argv) == 1:  # No arguments provided
@@ -1012,7 +1211,8 @@ def main():
                      f"isVr={args.isVr}, update={args.updateFlow}, version={args.version}, size={args.size}, "
                      f"download_dir={args.download_dir}, withNotification={args.withNotification}")
         
-        downloader = GofileDownloader(args.game, args.online, args.dlc, args.isVr, args.updateFlow, args.version, args.size, args.download_dir)
+        downloader = GofileDownloader(args.game, args.online, args.dlc, args.isVr, args.updateFlow, args.version, args.size, args.download_dir,
+                                      progress_stream=args.progressStream, verify_hashes=args.verifyHashes)
         if args.withNotification:
             _launch_notification(args.withNotification, "Download Started", f"Starting download for {args.game}")
         downloader.download_from_gofile(args.url, args.password, args.withNotification)
@@ -0,0 +1,74 @@
+# ==============================================================================
+# Ascendara HTTP Client
+# ==============================================================================
+# Shared HTTP layer for the Ascendara binaries. Hands out process-wide
+# requests sessions with connection pooling, keep-alive, default timeouts
+# and a retry/backoff policy so every call reuses warm TCP/TLS connections.
+# Used by the Downloader, GoFile Helper and Language Translation tools.
+
+
+
+
+
+
+
+
+
+import logging
+from threading import Lock
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+DEFAULT_POOL_SIZE = 10
+DEFAULT_TIMEOUT = (9, 30)  # (connect, read) seconds
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 0.5  # Sleeps 0.5s, 1s, 2s, ... between retries
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+_sessions = {}
+_sessions_lock = Lock()
+
+
+class HttpClient(requests.Session):
+    def __init__(self, pool_size=DEFAULT_POOL_SIZE, timeout=DEFAULT_TIMEOUT, retries=DEFAULT_RETRIES,
+                 backoff=DEFAULT_BACKOFF, user_agent=None):
+        super().__init__()
+        self.timeout = timeout
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=retries,
+            status=retries,
+            backoff_factor=backoff,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset({"HEAD", "GET", "OPTIONS"}),
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.mount("https://", adapter)
+        self.mount("http://", adapter)
+        if user_agent:
+            self.headers["User-Agent"] = user_agent
+
+    def request(self, method, url, **kwargs):
+        # requests has no session-wide timeout, so apply ours unless the caller chose one
+        kwargs.setdefault("timeout", self.timeout)
+        return super().request(method, url, **kwargs)
+
+
+def get_session(name="default", **options):
+    """Return the shared client called name, creating it with options on first use.
+
+    Options are HttpClient keyword arguments and only take effect when the
+    client is created, so the component that owns a pool should ask for it first.
+    """
+    with _sessions_lock:
+        session = _sessions.get(name)
+        if session is None:
+            session = HttpClient(**options)
+            _sessions[name] = session
+            logging.debug(f"[AscendaraHttpClient] Created '{name}' session with options {options}")
+        return session
+
@@ -0,0 +1,206 @@
+# ==============================================================================
+# Ascendara Progress
+# ==============================================================================
+# Progress reporting for the download binaries. ProgressWriter keeps the
+# downloadingData block of <game>.ascendara.json up to date from a background
+# thread, coalescing ticks into compact writes. ProgressChannel optionally
+# streams structured progress events as newline-delimited JSON on stdout or a
+# local socket, leaving the JSON file as the durable state record.
+# Shared by the downloader and torrent binaries.
+
+
+
+
+
+
+
+
+
+import os
+import sys
+import copy
+import json
+import time
+import socket
+import logging
+import threading
+
+# Fields that change on every tick; anything else changing is written right away
+PROGRESS_FIELDS = ("progressCompleted", "progressDownloadSpeeds", "timeUntilComplete")
+
+_writers = {}
+_writers_lock = threading.Lock()
+
+
+def settle_progress_writes(filepath):
+    """Wait for any background write to filepath and drop its queued snapshot.
+
+    Called before a direct write of the same file so an older progress snapshot
+    can never land on top of newer state such as an error or a phase change.
+    """
+    with _writers_lock:
+        writer = _writers.get(os.path.abspath(filepath))
+    if writer:
+        writer.discard()
+
+
+class ProgressWriter:
+    def __init__(self, filepath, interval=0.5, max_age=2.0, min_progress_step=0.1):
+        self.filepath = filepath
+        self.interval = interval  # Minimum seconds between two writes
+        self.max_age = max_age  # Speed/ETA-only changes are written at least this often
+        self.min_progress_step = min_progress_step  # Percentage points worth an immediate write
+        self._cond = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._pending = None
+        self._generation = 0
+        self._last_written = None
+        self._last_write = 0
+        self._closed = False
+        with _writers_lock:
+            _writers[os.path.abspath(filepath)] = self
+        self._thread = threading.Thread(target=self._run, name="AscendaraProgressWriter", daemon=True)
+        self._thread.start()
+
+    def submit(self, data):
+        """Queue a snapshot of data. Never touches the disk on the caller's thread."""
+        snapshot = copy.deepcopy(data)
+        with self._cond:
+            self._pending = snapshot
+            self._cond.notify()
+
+    def discard(self):
+        with self._write_lock:
+            with self._cond:
+                self._pending = None
+                self._generation += 1
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join(timeout=5)
+        with _writers_lock:
+            if _writers.get(os.path.abspath(self.filepath)) is self:
+                del _writers[os.path.abspath(self.filepath)]
+
+    def _is_meaningful(self, snapshot):
+        previous = self._last_written
+        if previous is None:
+            return True
+        if {k: v for k, v in snapshot.items() if k != "downloadingData"} != \
+                {k: v for k, v in previous.items() if k != "downloadingData"}:
+            return True
+        current_data = snapshot.get("downloadingData") or {}
+        previous_data = previous.get("downloadingData") or {}
+        for key in set(current_data) | set(previous_data):
+            if key not in PROGRESS_FIELDS and current_data.get(key) != previous_data.get(key):
+                return True
+        try:
+            step = abs(float(current_data.get("progressCompleted", 0)) - float(previous_data.get("progressCompleted", 0)))
+        except (TypeError, ValueError):
+            return True
+        return step >= self.min_progress_step
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._pending is None and not self._closed:
+                    self._cond.wait()
+                if self._pending is None:
+                    return
+                now = time.monotonic()
+                due = self._last_write + self.interval
+                if not self._is_meaningful(self._pending):
+                    due = self._last_write + self.max_age
+                if now < due and not self._closed:
+                    # Newer snapshots replace this one while we wait
+                    self._cond.wait(due - now)
+                    continue
+                snapshot = self._pending
+                generation = self._generation
+                self._pending = None
+
+            with self._write_lock:
+                if generation != self._generation:
+                    continue  # A direct write happened after this snapshot was taken
+                if not self._write(snapshot):
+                    with self._cond:
+                        if self._pending is None:
+                            self._pending = snapshot  # Try again on the next cycle
+
+    def _write(self, snapshot):
+        temp_path = f"{self.filepath}.{os.getpid()}.progress.tmp"
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(snapshot, f, separators=(",", ":"))
+            os.replace(temp_path, self.filepath)
+        except OSError as e:
+            # Usually a reader holding the file open on Windows; don't stall, just retry later
+            logging.debug(f"[AscendaraProgress] Deferred progress write to {self.filepath}: {e}")
+            self._last_write = time.monotonic()
+            return False
+        self._last_written = snapshot
+        self._last_write = time.monotonic()
+        return True
+
+
+class ProgressChannel:
+    """Newline-delimited JSON progress events for a live consumer such as the Electron app."""
+    def __init__(self, target, game):
+        self.game = game
+        self._lock = threading.Lock()
+        self._socket = None
+        if target == "stdout":
+            self._stream = sys.stdout
+            # stdout now carries events only; prints, progress bars and console logging move to stderr
+            for handler in logging.getLogger().handlers:
+                if isinstance(handler, logging.StreamHandler) and getattr(handler, "stream", None) is sys.stdout:
+                    handler.setStream(sys.stderr)
+            sys.stdout = sys.stderr
+        else:
+            host, _, port = target.rpartition(":")
+            self._socket = socket.create_connection((host or "127.0.0.1", int(port)), timeout=5)
+            self._stream = self._socket.makefile('w', encoding='utf-8', newline='\n')
+        logging.info(f"[AscendaraProgress] Streaming progress events to {target}")
+
+    def emit(self, event, **fields):
+        if self._stream is None:
+            return
+        line = json.dumps({"event": event, "game": self.game, "ts": round(time.time(), 3), **fields}, separators=(",", ":"))
+        with self._lock:
+            try:
+                self._stream.write(line + "\n")
+                self._stream.flush()
+            except (OSError, ValueError) as e:
+                logging.warning(f"[AscendaraProgress] Progress channel closed, no more events will be sent: {e}")
+                self._stream = None
+
+    def progress(self, phase, done_bytes, total_bytes, rate=0, eta=0):
+        percent = min(done_bytes / total_bytes * 100, 100) if total_bytes else 0
+        self.emit("progress", phase=phase, bytes=int(done_bytes), total=int(total_bytes),
+                  rate=int(rate), eta=int(eta), percent=round(percent, 2))
+
+    def phase(self, phase, **fields):
+        self.emit("phase", phase=phase, **fields)
+
+    def close(self):
+        with self._lock:
+            if self._socket:
+                try:
+                    self._stream.close()
+                    self._socket.close()
+                except OSError:
+                    pass
+            self._stream = None
+
+
+def open_progress_channel(target, game):
+    """ProgressChannel for a --progressStream value, or None when streaming is off or unreachable."""
+    if not target:
+        return None
+    try:
+        return ProgressChannel(target, game)
+    except (OSError, ValueError) as e:
+        logging.warning(f"[AscendaraProgress] Could not open progress channel {target}, using the JSON file only: {e}")
+        return None
@@ -0,0 +1,259 @@
+# ==============================================================================
+# Ascendara Remote Zip
+# ==============================================================================
+# Reads the central directory of a zip release straight from the server with
+# ranged GETs, before (or instead of) downloading the archive. The index gives
+# the member list, installed size and checksums up front, and single members
+# can be fetched on their own, so an update only transfers the byte ranges of
+# the files that changed. Shared by the downloader binaries in this directory.
+
+
+
+
+
+
+
+
+
+import io
+import os
+import time
+import shutil
+import zipfile
+import logging
+import requests
+import urllib3
+from AscendaraHttpClient import get_session
+from AscendaraSegmentedDownload import probe_remote_file
+from AscendaraExtraction import (COPY_BUFFER_SIZE, is_wanted_member, member_path, plan_zip_members,
+                                 find_root_folder, top_level_folders)
+
+# The end of central directory record sits in the last 22 bytes plus an optional comment of up to 64 KiB
+TAIL_PREFETCH = 64 * 1024 + 22
+SKIP_THRESHOLD = 1024 * 1024  # Forward gaps up to this size are read through rather than re-requested
+DELTA_MAX_RATIO = 0.5  # Above this share of the archive a plain full download is the better deal
+
+
+class HttpRangeReader(io.RawIOBase):
+    """Seekable read-only file over HTTP Range requests, for zipfile to parse in place.
+
+    The tail of the file is fetched once up front. Other reads come from one
+    ranged response that is kept while reads stay sequential, so consecutive
+    zip members cost a single request. Setting window_end bounds new requests
+    at that offset, letting the connection be reused once the window is read.
+    """
+    def __init__(self, url, size, headers=None, session=None, limiter=None, timeout=30, max_retries=3):
+        super().__init__()
+        self.url = url
+        self.size = size
+        self.headers = dict(headers or {})
+        self.headers["Accept-Encoding"] = "identity"  # Byte offsets must refer to the file itself
+        self.session = session or get_session()
+        self.limiter = limiter  # Anything with a consume(byte_count) method
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.fetched = 0  # Bytes received from the server
+        self.retries = 0  # Ranged reads retried after a failure
+        self.on_fetch = None  # Called with fetched after every network read
+        self.window_end = None  # Last offset new requests ask for; None reads to the end of the file
+        self._pos = 0
+        self._response = None
+        self._stream_pos = 0
+        self._stream_end = size - 1
+        self._tail_start = max(0, size - TAIL_PREFETCH)
+        self._tail = self._get_range(self._tail_start, size - 1)
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._pos
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self._pos
+        elif whence == io.SEEK_END:
+            offset += self.size
+        self._pos = max(0, offset)
+        return self._pos
+
+    def readinto(self, buffer):
+        count = min(len(buffer), self.size - self._pos)
+        if count <= 0:
+            return 0
+        if self._pos >= self._tail_start:
+            offset = self._pos - self._tail_start
+            data = self._tail[offset:offset + count]
+        else:
+            data = self._read_stream(count)
+        buffer[:len(data)] = data
+        self._pos += len(data)
+        return len(data)
+
+    def close(self):
+        self._close_stream()
+        super().close()
+
+    def _count(self, amount):
+        self.fetched += amount
+        if self.limiter:
+            self.limiter.consume(amount)
+        if self.on_fetch:
+            self.on_fetch(self.fetched)
+
+    def _get_range(self, start, end):
+        headers = dict(self.headers)
+        headers["Range"] = f"bytes={start}-{end}"
+        response = self.session.get(self.url, headers=headers, timeout=(9, self.timeout))
+        if response.status_code != 206:
+            raise requests.exceptions.HTTPError(f"Expected 206 for range {headers['Range']}, got {response.status_code}")
+        self._count(len(response.content))
+        return response.content
+
+    def _close_stream(self):
+        if self._response is not None:
+            self._response.close()
+            self._response = None
+
+    def _align(self):
+        gap = self._pos - self._stream_pos
+        if self._response is not None and 0 <= gap <= SKIP_THRESHOLD and self._pos <= self._stream_end:
+            while gap:
+                skipped = self._response.raw.read(min(gap, COPY_BUFFER_SIZE))
+                if not skipped:
+                    raise requests.exceptions.ConnectionError(f"Stream ended early at byte {self._stream_pos}")
+                self._stream_pos += len(skipped)
+                gap -= len(skipped)
+                self._count(len(skipped))
+            return
+        self._close_stream()
+        end = self.window_end if self.window_end is not None and self.window_end >= self._pos else self.size - 1
+        headers = dict(self.headers)
+        headers["Range"] = f"bytes={self._pos}-{end}"
+        response = self.session.get(self.url, headers=headers, stream=True, timeout=(9, self.timeout))
+        if response.status_code != 206:
+            response.close()
+            raise requests.exceptions.HTTPError(f"Expected 206 for range {headers['Range']}, got {response.status_code}")
+        self._response = response
+        self._stream_pos = self._pos
+        self._stream_end = end
+
+    def _read_stream(self, count):
+        for retry in range(self.max_retries):
+            try:
+                self._align()
+                chunks = []
+                remaining = count
+                while remaining:
+                    chunk = self._response.raw.read(remaining)
+                    if not chunk:
+                        raise requests.exceptions.ConnectionError(f"Stream ended early at byte {self._stream_pos}")
+                    chunks.append(chunk)
+                    remaining -= len(chunk)
+                    self._stream_pos += len(chunk)
+                    self._count(len(chunk))
+                return b"".join(chunks)
+            except (requests.exceptions.RequestException, urllib3.exceptions.HTTPError, OSError) as e:
+                # Start over from the read position on a fresh response
+                self._close_stream()
+                if retry == self.max_retries - 1:
+                    raise
+                logging.warning(f"[AscendaraRemoteZip] Ranged read at byte {self._pos} failed, retrying: {e}")
+                self.retries += 1
+                time.sleep(2 ** retry)  # Exponential backoff
+
+
+class RemoteZip:
+    """Index of a zip on the server, with the means to fetch single members from it."""
+    def __init__(self, reader):
+        self.reader = reader
+        self.zip_ref = zipfile.ZipFile(reader)
+        self.infos = self.zip_ref.infolist()
+        self.size = reader.size
+        self.install_size = sum(info.file_size for info in self.infos if is_wanted_member(info.filename))
+        # A member occupies the archive from its local header up to the next member or the central directory
+        offsets = sorted({info.header_offset for info in self.infos}) + [self.zip_ref.start_dir]
+        self._spans = {start: end - start for start, end in zip(offsets, offsets[1:])}
+
+    def plan(self, dest_dir, game_folder=None, first_word=None, installed=None):
+        """Return (root folder, filemap entries of the release, members that need writing)."""
+        root = find_root_folder(top_level_folders(info.filename for info in self.infos), game_folder, first_word)
+        watching_data, members = plan_zip_members(self.infos, dest_dir, root, installed)
+        return root, watching_data, members
+
+    def fetch_size(self, members):
+        """Bytes that fetching members transfers, headers included."""
+        return sum(self._spans.get(info.header_offset, info.compress_size) for info in members if not info.is_dir())
+
+    def extract(self, dest_dir, members, root=None, on_progress=None):
+        """Fetch members in archive order and write them to their final location.
+
+        Each file is written next to its target and renamed over it only once
+        zipfile has checked its CRC, so a failed fetch leaves the installed copy intact.
+        """
+        files = sorted((info for info in members if not info.is_dir()), key=lambda member: member.header_offset)
+        for info in members:
+            if info.is_dir():
+                os.makedirs(member_path(dest_dir, info.filename, root), exist_ok=True)
+        # Members close enough together share one bounded request; the gaps between them are read through
+        window_ends = [0] * len(files)
+        for index in range(len(files) - 1, -1, -1):
+            start = files[index].header_offset
+            window_ends[index] = start + self._spans.get(start, files[index].compress_size) - 1
+            if index + 1 < len(files) and files[index + 1].header_offset - window_ends[index] <= SKIP_THRESHOLD:
+                window_ends[index] = window_ends[index + 1]
+
+        self.reader.on_fetch = on_progress
+        try:
+            for info, window_end in zip(files, window_ends):
+                self.reader.window_end = window_end
+                target = member_path(dest_dir, info.filename, root)
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                part_path = f"{target}.part"
+                try:
+                    with self.zip_ref.open(info) as source, open(part_path, 'wb') as part:
+                        shutil.copyfileobj(source, part, COPY_BUFFER_SIZE)
+                    os.replace(part_path, target)
+                except BaseException:
+                    # Never leave a half-written member behind in the game folder
+                    try:
+                        os.remove(part_path)
+                    except OSError:
+                        pass
+                    raise
+        finally:
+            self.reader.on_fetch = None
+            self.reader.window_end = None
+
+    def close(self):
+        self.zip_ref.close()
+        self.reader.close()
+
+
+def peek_remote_zip(url, headers=None, session=None, limiter=None, remote=None):
+    """RemoteZip for url, or None when the server ignores ranges or the file isn't a single zip.
+
+    remote is an earlier probe_remote_file result for url, saving another probe.
+    """
+    try:
+        if remote is None:
+            remote = probe_remote_file(url, headers=headers, session=session)
+        if not remote["ranges"] or remote["size"] < 22:
+            return None
+        reader = HttpRangeReader(remote["final_url"], remote["size"], headers=headers, session=session, limiter=limiter)
+    except (requests.exceptions.RequestException, OSError) as e:
+        logging.info(f"[AscendaraRemoteZip] Could not peek at {url}: {e}")
+        return None
+    try:
+        remote_zip = RemoteZip(reader)
+    except (zipfile.BadZipFile, requests.exceptions.RequestException, OSError) as e:
+        # Not a zip, or a split one zipfile can't read without its other volumes
+        logging.info(f"[AscendaraRemoteZip] No readable zip index at {url}: {e}")
+        reader.close()
+        return None
+    logging.info(f"[AscendaraRemoteZip] Remote zip has {len(remote_zip.infos)} member(s), "
+                 f"{remote_zip.install_size} bytes installed from {remote_zip.size} bytes")
+    return remote_zip
@@ -0,0 +1,257 @@
+# ==============================================================================
+# Ascendara Segmented Download
+# ==============================================================================
+# Splits a single large file into byte ranges and fetches them over parallel
+# connections into a preallocated file. Completed ranges are journaled next to
+# the partial file, together with the URL, its resolved location and ETag, so
+# a resume after a crash only re-fetches what is missing from the same file.
+# Shared by the downloader binaries in this directory.
+
+
+
+
+
+
+
+
+
+import os
+import json
+import time
+import logging
+import threading
+from tempfile import NamedTemporaryFile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import requests
+import urllib3
+from AscendaraHttpClient import get_session
+from AscendaraDiskSpace import preallocate
+
+SEGMENT_JOURNAL_SUFFIX = ".segments.json"
+MIN_SEGMENT_SIZE = 16 * 1024 * 1024  # Never split a file into ranges smaller than this
+MIN_READ_SIZE = 64 * 1024
+MAX_READ_SIZE = 4 * 1024 * 1024
+READ_TARGET_SECONDS = 0.25  # Reads are sized to take about this long, keeping progress and limits responsive
+
+
+def probe_remote_file(url, headers=None, session=None, timeout=30):
+    """Return {"size", "ranges", "etag", "final_url", "disposition"} for url using a one-byte ranged GET."""
+    http = session or get_session()
+    probe_headers = dict(headers or {})
+    probe_headers["Range"] = "bytes=0-0"
+    remote = {"size": 0, "ranges": False, "etag": None, "final_url": url, "disposition": None}
+    with http.get(url, headers=probe_headers, stream=True, timeout=(9, timeout)) as response:
+        remote["etag"] = response.headers.get("ETag")
+        remote["disposition"] = response.headers.get("Content-Disposition")
+        remote["final_url"] = response.url  # After redirects, so segments skip the hops
+        if response.status_code == 206 and "Content-Range" in response.headers:
+            total = response.headers["Content-Range"].split("/")[-1]
+            if total.isdigit():
+                remote["size"] = int(total)
+                remote["ranges"] = True
+        elif response.status_code == 200:
+            remote["size"] = int(response.headers.get("Content-Length", 0))
+    return remote
+
+
+def stream_to_file(response, f, on_data=None, limit=None, initial_size=256 * 1024):
+    """Copy a streamed response body into f through one reused buffer; returns the bytes written.
+
+    The read size adapts to the measured throughput, growing towards
+    MAX_READ_SIZE on fast links and shrinking when a read (including on_data,
+    which may sleep for a bandwidth limit) takes too long. Reads bypass
+    requests' content decoding, so ask for Accept-Encoding: identity.
+    Stops after limit bytes when given; on_data is called with each count written.
+    """
+    buffer = memoryview(bytearray(MAX_READ_SIZE))
+    read_size = max(MIN_READ_SIZE, min(initial_size, MAX_READ_SIZE))
+    written = 0
+    while limit is None or written < limit:
+        wanted = read_size if limit is None else min(read_size, limit - written)
+        started = time.monotonic()
+        count = response.raw.readinto(buffer[:wanted])
+        if not count:
+            break
+        pending = buffer[:count]
+        while pending:
+            # An unbuffered file may take only part of a write
+            pending = pending[f.write(pending):]
+        written += count
+        if on_data:
+            on_data(count)
+        elapsed = time.monotonic() - started
+        if count == wanted and elapsed < READ_TARGET_SECONDS / 2:
+            read_size = min(read_size * 2, MAX_READ_SIZE)
+        elif elapsed > READ_TARGET_SECONDS * 2:
+            read_size = max(read_size // 2, MIN_READ_SIZE)
+    return written
+
+
+class _Cancelled(Exception):
+    """Stops a segment worker once another segment has failed; never caught by the retry loop."""
+
+
+def plan_segments(total_size, segment_count):
+    """Split total_size bytes into at most segment_count contiguous ranges."""
+    segment_count = max(1, min(segment_count, total_size // MIN_SEGMENT_SIZE or 1))
+    segment_size = -(-total_size // segment_count)
+    segments = []
+    start = 0
+    while start < total_size:
+        end = min(start + segment_size, total_size) - 1
+        segments.append({"start": start, "end": end, "done": 0})
+        start = end + 1
+    return segments
+
+
+class SegmentedDownload:
+    def __init__(self, url, filepath, total_size, headers=None, segments=4, session=None,
+                 timeout=30, max_retries=3, chunk_size=262144, on_progress=None, limiter=None,
+                 etag=None, final_url=None):
+        self.url = url
+        self.final_url = final_url or url  # Where the bytes are fetched from this run
+        self.etag = etag  # A resume only continues a journal written for the same ETag
+        self.filepath = filepath
+        self.part_path = f"{filepath}.part"
+        self.journal_path = f"{self.part_path}{SEGMENT_JOURNAL_SUFFIX}"
+        self.total_size = total_size
+        self.headers = dict(headers or {})
+        self.segment_count = segments
+        self.session = session or get_session()
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.chunk_size = chunk_size
+        self.on_progress = on_progress  # Called with the total bytes on disk
+        self.limiter = limiter  # Anything with a consume(byte_count) method
+        self.retries = 0  # Segment requests retried after a failure
+        self._lock = threading.Lock()
+        self._cancel = threading.Event()  # Set on the first failed segment so the others stop early
+        self._last_journal_save = 0
+        self._segments = []
+
+    @property
+    def downloaded(self):
+        return sum(segment["done"] for segment in self._segments)
+
+    def _load_journal(self):
+        if not (os.path.exists(self.journal_path) and os.path.exists(self.part_path)):
+            return None
+        try:
+            with open(self.journal_path, 'r') as f:
+                journal = json.load(f)
+            if journal.get("size") != self.total_size:
+                return None
+            # Where the file couldn't be preallocated it is only as long as its furthest write
+            part_size = os.path.getsize(self.part_path)
+            if part_size > self.total_size or any(s["start"] + s["done"] > part_size for s in journal["segments"]):
+                return None
+            if self.etag and journal.get("etag") and journal["etag"] != self.etag:
+                logging.info(f"[SegmentedDownload] {os.path.basename(self.filepath)} changed on the server, starting over")
+                return None
+            return journal["segments"]
+        except Exception as e:
+            logging.warning(f"[SegmentedDownload] Ignoring unreadable segment journal {self.journal_path}: {e}")
+            return None
+
+    def _save_journal(self, force=False):
+        with self._lock:
+            now = time.monotonic()
+            if not force and now - self._last_journal_save < 1:
+                return
+            self._last_journal_save = now
+            journal = {"url": self.url, "final_url": self.final_url, "size": self.total_size, "etag": self.etag,
+                       "segments": [dict(s) for s in self._segments]}
+        temp_file_path = None
+        try:
+            with NamedTemporaryFile('w', delete=False, dir=os.path.dirname(self.journal_path)) as temp_file:
+                json.dump(journal, temp_file)
+                temp_file_path = temp_file.name
+            os.replace(temp_file_path, self.journal_path)
+        except OSError as e:
+            logging.warning(f"[SegmentedDownload] Could not save segment journal: {e}")
+            if temp_file_path and os.path.exists(temp_file_path):
+                os.remove(temp_file_path)
+
+    def _prepare(self):
+        segments = self._load_journal()
+        if segments is not None:
+            self._segments = segments
+            logging.info(f"[SegmentedDownload] Resuming {os.path.basename(self.filepath)}: "
+                         f"{sum(1 for s in segments if s['start'] + s['done'] > s['end'])}/{len(segments)} segments complete")
+            return
+        self._segments = plan_segments(self.total_size, self.segment_count)
+        os.makedirs(os.path.dirname(self.filepath), exist_ok=True)
+        with open(self.part_path, 'wb') as f:
+            preallocate(f, self.total_size)
+        self._save_journal(force=True)
+
+    def _fetch_segment(self, segment):
+        for retry in range(self.max_retries):
+            position = segment["start"] + segment["done"]
+            if position > segment["end"] or self._cancel.is_set():
+                return
+            headers = dict(self.headers)
+            headers["Range"] = f"bytes={position}-{segment['end']}"
+            headers["Accept-Encoding"] = "identity"  # Offsets refer to the file itself, read without decoding
+            if self.etag and not self.etag.startswith("W/"):
+                # A changed file comes back as a 200 instead of being spliced into the old one
+                headers["If-Range"] = self.etag
+            try:
+                with self.session.get(self.final_url, headers=headers, stream=True, timeout=(9, self.timeout)) as response:
+                    if response.status_code != 206:
+                        raise requests.exceptions.HTTPError(f"Expected 206 for range {headers['Range']}, got {response.status_code}")
+                    def on_data(count):
+                        with self._lock:
+                            segment["done"] += count
+                        if self._cancel.is_set():
+                            raise _Cancelled()
+                        if self.limiter:
+                            self.limiter.consume(count)
+                        if self.on_progress:
+                            self.on_progress(self.downloaded)
+                        self._save_journal()
+                    # Unbuffered so the journal never claims bytes that are still in a Python buffer
+                    with open(self.part_path, 'r+b', buffering=0) as f:
+                        f.seek(position)
+                        stream_to_file(response, f, on_data, limit=segment["end"] + 1 - position, initial_size=self.chunk_size)
+                position = segment["start"] + segment["done"]
+                if position > segment["end"]:
+                    return
+                raise requests.exceptions.ConnectionError(f"Range {headers['Range']} ended early at byte {position}")
+            except (requests.exceptions.RequestException, urllib3.exceptions.HTTPError, IOError) as e:
+                logging.warning(f"[SegmentedDownload] Segment {segment['start']}-{segment['end']} failed: {e}")
+                # Resolved links can expire, so retries go through the original URL again
+                self.final_url = self.url
+                if retry < self.max_retries - 1:
+                    with self._lock:
+                        self.retries += 1
+                    self._cancel.wait(2 ** retry)  # Exponential backoff, cut short when another segment failed
+                    continue
+                raise
+
+    def run(self):
+        """Download every missing segment and move the finished file into place."""
+        self._cancel.clear()
+        self._prepare()
+        pending = [s for s in self._segments if s["start"] + s["done"] <= s["end"]]
+        if self.on_progress:
+            self.on_progress(self.downloaded)
+        if pending:
+            try:
+                with ThreadPoolExecutor(max_workers=len(pending)) as pool:
+                    futures = [pool.submit(self._fetch_segment, segment) for segment in pending]
+                    try:
+                        for future in as_completed(futures):
+                            future.result()
+                    except BaseException:
+                        # The others stop at their next chunk rather than finishing before the error surfaces
+                        self._cancel.set()
+                        raise
+            finally:
+                # Once every worker has stopped, so the journal has their last bytes
+                self._save_journal(force=True)
+
+        os.replace(self.part_path, self.filepath)
+        if os.path.exists(self.journal_path):
+            os.remove(self.journal_path)
+        return self.total_size
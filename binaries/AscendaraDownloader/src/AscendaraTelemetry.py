@@ -0,0 +1,170 @@
+# ==============================================================================
+# Ascendara Telemetry
+# ==============================================================================
+# Per-download timing records for the downloader binaries. Every run appends
+# one JSON line to downloadtimings.jsonl in the Ascendara log directory with
+# the provider, the outcome, and for each phase (resolve, probe, transfer,
+# extract, cleanup, verify) its duration, bytes, average and peak rate and
+# retry count, so regressions and bottlenecks show up across installs. The
+# record stays on the machine; nothing is sent anywhere.
+
+
+
+
+
+
+
+
+
+import os
+import json
+import time
+import logging
+import threading
+from contextlib import contextmanager
+
+TELEMETRY_NAME = "downloadtimings.jsonl"
+MAX_FILE_SIZE = 5 * 1024 * 1024  # Rolled over to a single .1 file beyond this
+PEAK_WINDOW = 1.0  # Seconds of progress a peak rate is measured over
+
+
+class _Phase:
+    def __init__(self, offset):
+        self.offset = offset  # Seconds into the run the phase was first entered
+        self.seconds = 0.0
+        self.count = 0
+        self.bytes = 0
+        self.peak_rate = 0
+        self.retries = 0
+
+    def to_json(self):
+        record = {"start": round(self.offset, 3), "seconds": round(self.seconds, 3)}
+        if self.count > 1:
+            record["count"] = self.count
+        if self.bytes:
+            record["bytes"] = self.bytes
+            record["avgRate"] = int(self.bytes / self.seconds) if self.seconds > 0 else 0
+            if self.peak_rate:
+                record["peakRate"] = int(self.peak_rate)
+        if self.retries:
+            record["retries"] = self.retries
+        return record
+
+
+class DownloadTelemetry:
+    """Timings of one download run, appended as a JSON line by finish().
+
+    Phases may overlap where the binaries run them concurrently, and a phase
+    entered from several threads at once adds up the time spent in each.
+    """
+    def __init__(self, game, binary, log_dir):
+        self.game = game
+        self.binary = binary
+        self.path = os.path.join(log_dir, TELEMETRY_NAME)
+        self.provider = None
+        self.host = None
+        self.error = None
+        self._phases = {}
+        self._lock = threading.Lock()
+        self._started = time.monotonic()
+        self._started_at = time.time()
+        self._cpu_started = cpu_time()
+        self._finished = False
+
+    def set_provider(self, provider, host=None):
+        self.provider = provider
+        self.host = host
+
+    @contextmanager
+    def phase(self, name, counter=None):
+        """Time the block as phase name; counter, if given, returns the bytes the phase has processed so far."""
+        started = time.monotonic()
+        with self._lock:
+            phase = self._get(name, started)
+            phase.count += 1
+        stop = threading.Event()
+        baseline = counter() if counter else 0
+        if counter:
+            threading.Thread(target=self._sample, args=(phase, counter, stop), name="AscendaraTelemetry", daemon=True).start()
+        try:
+            yield
+        finally:
+            stop.set()
+            with self._lock:
+                phase.seconds += time.monotonic() - started
+                if counter:
+                    phase.bytes += counter() - baseline
+
+    def add_bytes(self, name, count):
+        with self._lock:
+            self._get(name).bytes += count
+
+    def note_rate(self, name, rate):
+        """Offer a measured rate for the phase's peak, for transfers that don't go through a counter."""
+        with self._lock:
+            phase = self._get(name)
+            phase.peak_rate = max(phase.peak_rate, rate)
+
+    def retry(self, name, count=1):
+        if count:
+            with self._lock:
+                self._get(name).retries += count
+
+    def fail(self, message):
+        self.error = str(message)
+
+    def finish(self):
+        """Append the record for this run; later calls do nothing."""
+        with self._lock:
+            if self._finished:
+                return
+            self._finished = True
+            elapsed = time.monotonic() - self._started
+            record = {
+                "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self._started_at)),
+                "binary": self.binary,
+                "game": self.game,
+                "provider": self.provider,
+                "host": self.host,
+                "status": "error" if self.error else "done",
+                "seconds": round(elapsed, 3),
+                "cpuSeconds": round(cpu_time() - self._cpu_started, 3),
+                "retries": sum(phase.retries for phase in self._phases.values()),
+                "phases": {name: phase.to_json() for name, phase in self._phases.items()},
+            }
+            if self.error:
+                record["error"] = self.error
+        try:
+            if os.path.isfile(self.path) and os.path.getsize(self.path) > MAX_FILE_SIZE:
+                os.replace(self.path, f"{self.path}.1")
+            # One write per record, so concurrent downloads append whole lines
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record, separators=(",", ":")) + "\n")
+        except OSError as e:
+            logging.warning(f"[AscendaraTelemetry] Could not write the timing record to {self.path}: {e}")
+            return
+        logging.info(f"[AscendaraTelemetry] {record['status']} in {record['seconds']}s: "
+                     + ", ".join(f"{name} {phase['seconds']}s" for name, phase in record["phases"].items()))
+
+    def _get(self, name, now=None):
+        phase = self._phases.get(name)
+        if phase is None:
+            phase = self._phases[name] = _Phase((now or time.monotonic()) - self._started)
+        return phase
+
+    def _sample(self, phase, counter, stop):
+        last_time = time.monotonic()
+        last_bytes = counter()
+        while not stop.wait(PEAK_WINDOW):
+            now = time.monotonic()
+            current = counter()
+            rate = (current - last_bytes) / (now - last_time)
+            with self._lock:
+                phase.peak_rate = max(phase.peak_rate, rate)
+            last_time, last_bytes = now, current
+
+
+def cpu_time():
+    """CPU seconds used by this process and its children, so unrar and unar run as tools count too."""
+    times = os.times()
+    return times.user + times.system + times.children_user + times.children_system
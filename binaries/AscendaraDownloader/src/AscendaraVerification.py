@@ -0,0 +1,169 @@
+# ==============================================================================
+# Ascendara Verification
+# ==============================================================================
+# Checks an installed game against its filemap.ascendara.json. Every entry is
+# checked for presence and size; in hash mode files are also CRC32-hashed
+# through memory maps on a thread pool and compared with the checksum taken
+# from the archive index at extraction time. Entries remember the mtime and
+# inode seen at their last successful check, so re-verifying an unchanged
+# install only lists its directories instead of re-checking every file.
+
+
+
+
+
+
+
+
+
+import os
+import stat
+import mmap
+import time
+import zlib
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+VERIFY_WORKERS = min(8, os.cpu_count() or 1)
+HASH_CHUNK_SIZE = 16 * 1024 * 1024
+PROGRESS_INTERVAL = 0.5  # Seconds between two on_progress calls
+
+
+def format_crc32(value):
+    return f"{value & 0xFFFFFFFF:08x}"
+
+
+def file_crc32(path):
+    """CRC32 of a file as 8 hex digits, read through a memory map."""
+    crc = 0
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return format_crc32(crc)
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            with memoryview(mapped) as view:
+                # zlib releases the GIL on large buffers, so worker threads hash in parallel
+                for offset in range(0, size, HASH_CHUNK_SIZE):
+                    crc = zlib.crc32(view[offset:offset + HASH_CHUNK_SIZE], crc)
+    return format_crc32(crc)
+
+
+def check_file(base_dir, rel_path, file_info, check_hashes=False):
+    """Return a verifyError entry for rel_path, or None if it matches its filemap entry."""
+    full_path = os.path.join(base_dir, rel_path)
+    try:
+        st = os.stat(full_path)
+    except OSError:
+        return {"file": rel_path, "error": "File not found", "expected_size": file_info["size"]}
+    if stat.S_ISDIR(st.st_mode):
+        return None
+    if st.st_size != file_info["size"]:
+        return {
+            "file": rel_path,
+            "error": f"Size mismatch: expected {file_info['size']}, got {st.st_size}",
+            "expected_size": file_info["size"],
+            "actual_size": st.st_size
+        }
+    expected_crc = file_info.get("crc32")
+    if check_hashes and expected_crc:
+        actual_crc = file_crc32(full_path)
+        if actual_crc != expected_crc:
+            return {
+                "file": rel_path,
+                "error": f"Checksum mismatch: expected {expected_crc}, got {actual_crc}",
+                "expected_size": file_info["size"]
+            }
+    return None
+
+
+def _is_unchanged(file_info, st, check_hashes):
+    if "mtime" not in file_info:
+        return False
+    if check_hashes and file_info.get("crc32") and not file_info.get("hashed"):
+        return False  # Only its size was ever checked
+    return (st.st_size, st.st_mtime_ns // 1000, str(st.st_ino)) == \
+        (file_info["size"], file_info["mtime"], file_info.get("inode"))
+
+
+def _remember(file_info, st, hashed):
+    # Microseconds keep the value exact for JavaScript readers of the filemap
+    file_info["mtime"] = st.st_mtime_ns // 1000
+    file_info["inode"] = str(st.st_ino)
+    if hashed:
+        file_info["hashed"] = True
+    else:
+        file_info.pop("hashed", None)
+
+
+def _list_directories(base_dir, filemap):
+    """Map every filemap entry to its os.DirEntry, listing each directory once."""
+    by_directory = {}
+    for rel_path in filemap:
+        normalized = os.path.normpath(rel_path)
+        by_directory.setdefault(os.path.dirname(normalized), []).append((rel_path, os.path.basename(normalized)))
+    entries = {}
+    for directory, members in by_directory.items():
+        try:
+            with os.scandir(os.path.join(base_dir, directory)) as listing:
+                found = {entry.name: entry for entry in listing}
+        except OSError:
+            found = {}
+        for rel_path, name in members:
+            entries[rel_path] = found.get(name)
+    return entries
+
+
+def verify_files(base_dir, filemap, check_hashes=False, workers=VERIFY_WORKERS, on_progress=None):
+    """Check filemap entries on a thread pool and return the list of verifyError entries.
+
+    Files whose size, mtime and inode still match what the last successful
+    check recorded are trusted without being opened; everything else is
+    checked (and hashed in hash mode) and, when it passes, stamped again, so
+    the caller should save the filemap afterwards. on_progress is called with
+    (bytes checked, total bytes) at most every PROGRESS_INTERVAL seconds and
+    once at the end.
+    """
+    total_bytes = sum(info.get("size", 0) for info in filemap.values())
+    done_bytes = 0
+    last_report = time.monotonic()
+    errors = []
+    pending = []
+    stats = {}
+    for rel_path, entry in _list_directories(base_dir, filemap).items():
+        info = filemap[rel_path]
+        try:
+            if entry is not None and entry.is_dir():
+                done_bytes += info.get("size", 0)
+                continue
+            if entry is not None:
+                # DirEntry.stat() leaves st_ino at 0 on Windows; os.stat() reads the
+                # file index, the same value Electron's fs.stat stamps
+                stats[rel_path] = os.stat(entry.path)
+                if _is_unchanged(info, stats[rel_path], check_hashes):
+                    done_bytes += info.get("size", 0)
+                    continue
+        except OSError:
+            pass
+        pending.append(rel_path)
+    logging.info(f"[AscendaraVerification] {len(filemap) - len(pending)} file(s) unchanged since the last check, "
+                 f"{'hashing' if check_hashes else 'checking'} {len(pending)} on {workers} thread(s)")
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="AscendaraVerify") as pool:
+        futures = {pool.submit(check_file, base_dir, rel_path, filemap[rel_path], check_hashes): rel_path
+                   for rel_path in pending}
+        for future in as_completed(futures):
+            rel_path = futures[future]
+            info = filemap[rel_path]
+            error = future.result()
+            if error:
+                errors.append(error)
+            elif rel_path in stats:
+                _remember(info, stats[rel_path], check_hashes and bool(info.get("crc32")))
+            done_bytes += info.get("size", 0)
+            now = time.monotonic()
+            if on_progress and now - last_report >= PROGRESS_INTERVAL:
+                on_progress(done_bytes, total_bytes)
+                last_report = now
+    if on_progress:
+        on_progress(total_bytes, total_bytes)
+    return sorted(errors, key=lambda error: error["file"])
@@ -0,0 +1,59 @@
+# Tests for grouping the volumes of split releases into archive sets.
+# Run with: python -m unittest discover binaries/AscendaraDownloader/tests
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from AscendaraExtraction import find_archive_sets, is_independent_archive, archive_kind
+
+
+def _names(archive_sets):
+    return [(archive_set.kind, [os.path.basename(path) for path in archive_set.volumes]) for archive_set in archive_sets]
+
+
+class ArchiveSetTest(unittest.TestCase):
+    def test_rar_parts_are_one_set_in_volume_order(self):
+        paths = [os.path.join("dl", name) for name in ("Game.part10.rar", "Game.part2.rar", "Game.part1.rar", "readme.txt")]
+        self.assertEqual(_names(find_archive_sets(paths)),
+                         [('rar', ["Game.part1.rar", "Game.part2.rar", "Game.part10.rar"])])
+
+    def test_old_style_rar_set_starts_at_the_rar(self):
+        paths = ["Game.r01", "Game.rar", "Game.r00"]
+        self.assertEqual(_names(find_archive_sets(paths)), [('rar', ["Game.rar", "Game.r00", "Game.r01"])])
+
+    def test_raw_7z_volumes(self):
+        paths = ["Game.7z.003", "Game.7z.001", "Game.7z.002"]
+        self.assertEqual(_names(find_archive_sets(paths)), [('7z', ["Game.7z.001", "Game.7z.002", "Game.7z.003"])])
+
+    def test_split_zip_starts_at_the_zip(self):
+        paths = ["Game.z02", "Game.zip", "Game.z01"]
+        self.assertEqual(_names(find_archive_sets(paths)), [('zip', ["Game.zip", "Game.z01", "Game.z02"])])
+
+    def test_sets_are_grouped_per_name_and_folder(self):
+        paths = ["a.part1.rar", "a.part2.rar", "b.7z.001", os.path.join("sub", "a.part1.rar"), "c.zip", "d.tar.gz", "e.exe"]
+        self.assertEqual(_names(find_archive_sets(paths)), [
+            ('rar', ["a.part1.rar", "a.part2.rar"]),
+            ('7z', ["b.7z.001"]),
+            ('zip', ["c.zip"]),
+            ('tar', ["d.tar.gz"]),
+            ('rar', ["a.part1.rar"]),
+        ])
+
+    def test_independent_archives(self):
+        self.assertTrue(is_independent_archive("c.zip", ["c.zip", "a.part1.rar", "a.part2.rar"]))
+        self.assertFalse(is_independent_archive("a.part1.rar", ["a.part1.rar", "a.part2.rar"]))
+        self.assertFalse(is_independent_archive("Game.zip", ["Game.zip", "Game.z01"]))
+        self.assertFalse(is_independent_archive("setup.exe", ["setup.exe"]))
+
+    def test_archive_kind_of_volumes(self):
+        self.assertEqual(archive_kind("Game.part3.rar"), 'rar')
+        self.assertEqual(archive_kind("Game.z01"), 'zip')
+        self.assertEqual(archive_kind("Game.7z.002"), '7z')
+        self.assertIsNone(archive_kind("Game.exe"))
+
+
+if __name__ == '__main__':
+    unittest.main()
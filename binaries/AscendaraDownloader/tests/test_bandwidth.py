@@ -0,0 +1,65 @@
+# Tests for sharing the global speed limit between downloader processes through lease files.
+# Run with: python -m unittest discover binaries/AscendaraDownloader/tests
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from AscendaraBandwidth import BandwidthLimiter, LEASE_SUFFIX, LEASE_TTL
+
+
+class BandwidthLeaseTest(unittest.TestCase):
+    def setUp(self):
+        self.coordination_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.coordination_dir, ignore_errors=True)
+        self.lease_dir = os.path.join(self.coordination_dir, "bandwidth")
+        os.makedirs(self.lease_dir)
+
+    def _lease(self, name, age=0):
+        path = os.path.join(self.lease_dir, f"{name}{LEASE_SUFFIX}")
+        open(path, 'w').close()
+        stamp = time.time() - age
+        os.utime(path, (stamp, stamp))
+        return path
+
+    def _limiter(self, limit_kbps):
+        limiter = BandwidthLimiter(limit_kbps, self.coordination_dir)
+        self.addCleanup(limiter.close)
+        return limiter
+
+    def test_limit_is_split_between_active_leases(self):
+        self._lease("other")
+        limiter = self._limiter(1000)
+        self.assertEqual(limiter.share(), 500 * 1024)
+        self.assertTrue(os.path.exists(os.path.join(self.lease_dir, f"{os.getpid()}{LEASE_SUFFIX}")))
+
+    def test_idle_leases_dont_count_and_stale_ones_are_removed(self):
+        idle = self._lease("idle", age=LEASE_TTL * 2)
+        crashed = self._lease("crashed", age=LEASE_TTL * 13)
+        limiter = self._limiter(1000)
+        self.assertEqual(limiter.share(), 1000 * 1024)
+        self.assertTrue(os.path.exists(idle))
+        self.assertFalse(os.path.exists(crashed))
+
+    def test_close_releases_the_lease(self):
+        limiter = self._limiter(1000)
+        lease = os.path.join(self.lease_dir, f"{os.getpid()}{LEASE_SUFFIX}")
+        self.assertTrue(os.path.exists(lease))
+        limiter.close()
+        self.assertFalse(os.path.exists(lease))
+
+    def test_unlimited_counts_bytes_without_leasing(self):
+        limiter = self._limiter(0)
+        limiter.consume(4096)
+        self.assertEqual(limiter.share(), 0)
+        self.assertEqual(limiter.transferred, 4096)
+        self.assertEqual(os.listdir(self.lease_dir), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+# Tests for updating an installed game in place from its filemap.
+# Run with: python -m unittest discover binaries/AscendaraDownloader/tests
+
+import os
+import sys
+import json
+import shutil
+import zipfile
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from AscendaraExtraction import extract_zip_parallel, read_installed_filemap, remove_stale_files, filemap_key, FILEMAP_NAME
+
+
+class UpdateFromFilemapTest(unittest.TestCase):
+    def setUp(self):
+        self.dest_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dest_dir, ignore_errors=True)
+
+    def _write(self, rel_path, data):
+        path = os.path.join(self.dest_dir, *rel_path.split('/'))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(data)
+        return path
+
+    def _install(self, files, keys):
+        # keys maps each installed file to the filemap key an earlier build wrote for it
+        filemap = {}
+        for rel_path, data in files.items():
+            self._write(rel_path, data)
+            filemap[keys[rel_path]] = {"size": len(data), "crc32": f"{zipfile.crc32(data) & 0xFFFFFFFF:08x}"}
+        with open(os.path.join(self.dest_dir, FILEMAP_NAME), 'w') as f:
+            json.dump(filemap, f)
+
+    def _release(self, files):
+        archive_path = os.path.join(self.dest_dir, "update.zip")
+        with zipfile.ZipFile(archive_path, 'w') as zip_ref:
+            for rel_path, data in files.items():
+                zip_ref.writestr(f"Game/{rel_path}", data)
+        return archive_path
+
+    def _update(self, release):
+        installed = read_installed_filemap(self.dest_dir)
+        archive_path = self._release(release)
+        watching_data = extract_zip_parallel(archive_path, self.dest_dir, game_folder="Game", installed=installed)
+        os.remove(archive_path)
+        remove_stale_files(self.dest_dir, installed, watching_data)
+        return watching_data
+
+    def _check_update(self, keys):
+        self._install({"bin/game.exe": b"same", "bin/old.dll": b"gone", "readme.txt": b"v1"}, keys)
+        unchanged = os.path.join(self.dest_dir, "bin", "game.exe")
+        os.utime(unchanged, (0, 0))
+
+        watching_data = self._update({"bin/game.exe": b"same", "bin/new.dll": b"added", "readme.txt": b"v2"})
+
+        self.assertEqual(set(watching_data), {"bin/game.exe", "bin/new.dll", "readme.txt"})
+        with open(os.path.join(self.dest_dir, "bin", "new.dll"), 'rb') as f:
+            self.assertEqual(f.read(), b"added")
+        with open(os.path.join(self.dest_dir, "readme.txt"), 'rb') as f:
+            self.assertEqual(f.read(), b"v2")
+        # Unchanged members are neither rewritten nor removed as stale
+        self.assertEqual(os.path.getmtime(unchanged), 0)
+        self.assertFalse(os.path.exists(os.path.join(self.dest_dir, "bin", "old.dll")))
+
+    def test_update_against_slash_keyed_filemap(self):
+        self._check_update({"bin/game.exe": "bin/game.exe", "bin/old.dll": "bin/old.dll", "readme.txt": "readme.txt"})
+
+    def test_update_against_backslash_keyed_filemap(self):
+        self._check_update({"bin/game.exe": "bin\\game.exe", "bin/old.dll": "bin\\old.dll", "readme.txt": "readme.txt"})
+
+    def test_filemap_keys_use_forward_slashes(self):
+        self.assertEqual(filemap_key(os.path.join("bin", "sub", "x.exe")), "bin/sub/x.exe")
+        self.assertEqual(filemap_key("bin\\x.exe"), "bin/x.exe")
+
+
+if __name__ == '__main__':
+    unittest.main()
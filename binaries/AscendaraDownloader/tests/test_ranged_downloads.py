@@ -0,0 +1,158 @@
+# Tests for the downloads that read ranges of a remote file: resuming a segmented
+# download from its journal, and peeking at the index of a remote zip.
+# Run with: python -m unittest discover binaries/AscendaraDownloader/tests
+
+import io
+import os
+import re
+import sys
+import json
+import shutil
+import zipfile
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from AscendaraSegmentedDownload import SegmentedDownload
+from AscendaraRemoteZip import peek_remote_zip
+
+
+class RangeServer(ThreadingHTTPServer):
+    """Serves files from memory, honouring Range requests unless ranges is False."""
+    daemon_threads = True
+
+    def __init__(self, files, ranges=True):
+        super().__init__(("127.0.0.1", 0), _RangeHandler)
+        self.files = files
+        self.ranges = ranges
+        self.requested = []  # Range headers in the order they arrived
+        threading.Thread(target=self.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True).start()
+
+    def url(self, name):
+        return f"http://127.0.0.1:{self.server_address[1]}/{name}"
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+class _RangeHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        data = self.server.files.get(self.path.lstrip('/'))
+        if data is None:
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        match = re.match(r"bytes=(\d+)-(\d*)", self.headers.get("Range", ""))
+        if match and self.server.ranges:
+            self.server.requested.append(self.headers["Range"])
+            start = int(match.group(1))
+            end = min(int(match.group(2)) if match.group(2) else len(data) - 1, len(data) - 1)
+            body = data[start:end + 1]
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{len(data)}")
+        else:
+            body = data
+            self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class SegmentedResumeTest(unittest.TestCase):
+    def setUp(self):
+        self.dest_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dest_dir, ignore_errors=True)
+        self.data = os.urandom(300000)
+        self.server = RangeServer({"game.bin": self.data})
+        self.addCleanup(self.server.stop)
+
+    def test_resume_fetches_only_what_the_journal_is_missing(self):
+        filepath = os.path.join(self.dest_dir, "game.bin")
+        download = SegmentedDownload(self.server.url("game.bin"), filepath, len(self.data))
+        # An earlier run finished the first segment and stopped partway into the second
+        segments = [{"start": 0, "end": 99999, "done": 100000},
+                    {"start": 100000, "end": 199999, "done": 40000},
+                    {"start": 200000, "end": 299999, "done": 0}]
+        with open(download.part_path, 'wb') as f:
+            f.write(self.data[:140000])
+            f.write(bytes(len(self.data) - 140000))
+        with open(download.journal_path, 'w') as f:
+            json.dump({"url": download.url, "final_url": download.url, "size": len(self.data), "etag": None,
+                       "segments": segments}, f)
+
+        self.assertEqual(download.run(), len(self.data))
+
+        self.assertEqual(sorted(self.server.requested), ["bytes=140000-199999", "bytes=200000-299999"])
+        with open(filepath, 'rb') as f:
+            self.assertEqual(f.read(), self.data)
+        self.assertFalse(os.path.exists(download.part_path))
+        self.assertFalse(os.path.exists(download.journal_path))
+
+    def test_journal_for_another_size_starts_over(self):
+        filepath = os.path.join(self.dest_dir, "game.bin")
+        download = SegmentedDownload(self.server.url("game.bin"), filepath, len(self.data))
+        with open(download.part_path, 'wb') as f:
+            f.write(bytes(1000))
+        with open(download.journal_path, 'w') as f:
+            json.dump({"size": 1000, "segments": [{"start": 0, "end": 999, "done": 1000}]}, f)
+
+        download.run()
+
+        self.assertEqual(self.server.requested, ["bytes=0-299999"])
+        with open(filepath, 'rb') as f:
+            self.assertEqual(f.read(), self.data)
+
+
+class RemoteZipPeekTest(unittest.TestCase):
+    def setUp(self):
+        self.dest_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dest_dir, ignore_errors=True)
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, 'w') as zip_ref:
+            zip_ref.writestr("Game/same.dat", b"same" * 1000)
+            zip_ref.writestr("Game/changed.dat", b"new" * 1000)
+        self.files = {"release.zip": buffer.getvalue(), "setup.exe": b"MZ" + bytes(5000)}
+
+    def _serve(self, ranges=True):
+        server = RangeServer(self.files, ranges=ranges)
+        self.addCleanup(server.stop)
+        return server
+
+    def test_peek_plans_only_changed_members(self):
+        server = self._serve()
+        with open(os.path.join(self.dest_dir, "same.dat"), 'wb') as f:
+            f.write(b"same" * 1000)
+        installed = {"same.dat": {"size": 4000, "crc32": f"{zipfile.crc32(b'same' * 1000) & 0xFFFFFFFF:08x}"}}
+
+        remote_zip = peek_remote_zip(server.url("release.zip"))
+        self.assertIsNotNone(remote_zip)
+        try:
+            self.assertEqual(sorted(info.filename for info in remote_zip.infos), ["Game/changed.dat", "Game/same.dat"])
+            root, watching_data, members = remote_zip.plan(self.dest_dir, game_folder="Game", installed=installed)
+        finally:
+            remote_zip.close()
+        self.assertEqual(root, "Game")
+        self.assertEqual(set(watching_data), {"changed.dat", "same.dat"})
+        self.assertEqual([info.filename for info in members], ["Game/changed.dat"])
+
+    def test_no_peek_without_ranges(self):
+        server = self._serve(ranges=False)
+        self.assertIsNone(peek_remote_zip(server.url("release.zip")))
+
+    def test_no_peek_at_other_files(self):
+        server = self._serve()
+        self.assertIsNone(peek_remote_zip(server.url("setup.exe")))
+
+
+if __name__ == '__main__':
+    unittest.main()
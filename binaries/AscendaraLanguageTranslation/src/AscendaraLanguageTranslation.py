@@ -16,13 +16,19 @@ import sys
 import time
 import logging
 import argparse
-import requests
 from collections import deque
 from threading import Lock
 import subprocess
 import atexit
 from typing import Dict, Any
 
+try:
+    from AscendaraHttpClient import get_session
+except ImportError:
+    # Running from the source tree, where the shared client lives with the downloader binaries
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'AscendaraDownloader', 'src'))
+    from AscendaraHttpClient import get_session
+
 logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
 
 # Rate limiting setup - 8 requests per second
@@ -82,7 +88,7 @@ def get_window_tkk():
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8',
             'Accept-Language': 'en-US,en;q=0.9',
         }
-        response = requests.get('https://translate.google.com', headers=headers, timeout=10)
+        response = get_session().get('https://translate.google.com', headers=headers, timeout=10)
         response.raise_for_status()
         # Extract TKK from response
         code = response.text
@@ -238,7 +244,7 @@ def translate_text(text, target_lang):
     try:
         # Apply rate limiting
         rate_limiter.wait()
-        response = requests.get(url, params=params, headers=headers, timeout=10)
+        response = get_session().get(url, params=params, headers=headers, timeout=10)
         response.raise_for_status()
         result = response.json()
         
@@ -294,7 +300,7 @@ def get_english_translations():
             'Accept': '*/*',
         }
         logging.debug("Fetching English translations from API...")
-        response = requests.get('https://api.ascendara.app/language/en', headers=headers, timeout=10)
+        response = get_session().get('https://api.ascendara.app/language/en', headers=headers, timeout=10)
         logging.debug(f"API Response status: {response.status_code}")
         response.raise_for_status()
         data = response.json()
@@ -327,7 +333,7 @@ def save_translations(translations, output_path):
         
         # Fetch and save language version
         try:
-            version_response = requests.get('https://api.ascendara.app/language/version', timeout=10)
+            version_response = get_session().get('https://api.ascendara.app/language/version', timeout=10)
             version_response.raise_for_status()
             version_data = version_response.json()
             
@@ -24,6 +24,13 @@ import argparse
 import subprocess
 from typing import Dict, Any
 
+try:
+    from AscendaraProgress import ProgressWriter, settle_progress_writes, open_progress_channel
+except ImportError:
+    # Running from the source tree, where the shared module lives with the downloader binaries
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'AscendaraDownloader', 'src'))
+    from AscendaraProgress import ProgressWriter, settle_progress_writes, open_progress_channel
+
 def _launch_crash_reporter_on_exit(error_code, error_message):
     try:
         crash_reporter_path = os.path.join('./AscendaraCrashReporter.exe')
@@ -52,6 +59,7 @@ def resource_path(relative_path):
     return os.path.join(base_path, relative_path)
 
 def safe_write_json(filepath, data):
+    settle_progress_writes(filepath)
     temp_dir = os.path.dirname(filepath)
     temp_file_path = None
     try:
@@ -169,8 +177,10 @@ class TorrentManager:
             self.connect_thread = threading.Thread(target=self._connect_qbittorrent)
             self.connect_thread.start()
         
-    def download_torrent(self, magnet_link, game, online, dlc, version, size, download_dir, theme=None):
+    def download_torrent(self, magnet_link, game, online, dlc, version, size, download_dir, theme=None, progress_stream=None):
         self.notification_theme = theme
+        # Optional live event stream; when present the JSON file only records state changes
+        progress_channel = open_progress_channel(progress_stream, game)
         logging.info(f"Starting torrent download for game: {game}")
         logging.debug(f"Download parameters: magnet={magnet_link}, online={online}, dlc={dlc}, "
                      f"version={version}, size={size}, download_dir={download_dir}, theme={theme}")
@@ -218,6 +228,9 @@ class TorrentManager:
         try:
             # Create the JSON file right before adding the torrent
             safe_write_json(game_info_path, game_info)
+            progress_writer = ProgressWriter(game_info_path)
+            if progress_channel:
+                progress_channel.phase("downloading")
             
             # Wait for qBittorrent connection if not ready
             if self.connect_thread and self.connect_thread.is_alive():
@@ -268,13 +281,18 @@ class TorrentManager:
                     "timeUntilComplete": f"{int(eta_seconds)}s"
                 })
                 
-                safe_write_json(game_info_path, game_info)
+                if progress_channel:
+                    progress_channel.progress("downloading", torrent.completed, torrent.size, torrent.dlspeed, eta_seconds)
+                else:
+                    progress_writer.submit(game_info)
                 time.sleep(1)
             
             # Download complete, now find and run setup
             game_info["downloadingData"]["downloading"] = False
             game_info["downloadingData"]["extracting"] = True
             safe_write_json(game_info_path, game_info)
+            if progress_channel:
+                progress_channel.phase("extracting")
             logging.info(f"Download complete for {game}, starting extraction")
             if self.notification_theme:
                 _launch_notification(self.notification_theme, "Download Complete", f"Download complete for {game}, starting installation")
@@ -302,7 +320,8 @@ class TorrentManager:
             while process.poll() is None:
                 time.sleep(1)
                 game_info["downloadingData"]["extracting"] = True
-                safe_write_json(game_info_path, game_info)
+                if not progress_channel:
+                    progress_writer.submit(game_info)
 
             if process.returncode != 0:
                 raise Exception(f"Setup failed with code {process.returncode}")
@@ -312,6 +331,8 @@ class TorrentManager:
             del game_info["downloadingData"]
             game_info["executable"] = os.path.join(install_dir, f"{game}.exe")
             safe_write_json(game_info_path, game_info)
+            if progress_channel:
+                progress_channel.phase("done")
             logging.info(f"Installation complete for game: {game}")
             if self.notification_theme:
                 _launch_notification(self.notification_theme, "Installation Complete", f"Successfully installed {game}")
@@ -322,6 +343,8 @@ class TorrentManager:
             if self.notification_theme:
                 _launch_notification(self.notification_theme, "Download Failed", error_msg)
             handleerror(game_info, game_info_path, e)
+            if progress_channel:
+                progress_channel.phase("error", message=str(e))
             launch_crash_reporter(1, str(e))
             raise
 
@@ -344,6 +367,7 @@ def main():
     parser.add_argument("size", help="Download size")
     parser.add_argument("dir", help="Download directory")
     parser.add_argument("--withNotification", help="Theme name for notifications (e.g. light, dark, blue)", default=None)
+    parser.add_argument("--progressStream", help="Stream progress events as JSON lines to 'stdout' or a local 'HOST:PORT' socket", default=None)
     
     try:
         if len(sys.argv) == 1:  # No arguments provided
@@ -368,7 +392,8 @@ def main():
             args.version,
             args.size,
             args.dir,
-            args.withNotification
+            args.withNotification,
+            progress_stream=args.progressStream
         )
         
         logging.info(f"Torrent process completed successfully for game: {args.game}")
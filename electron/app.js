@@ -1813,26 +1813,63 @@ ipcMain.handle("verify-game", async (event, game) => {
     let gameInfo = JSON.parse(gameInfoData);
 
     const verifyErrors = [];
+    let stampsChanged = false;
     for (const filePath in filemap) {
+      const entry = filemap[filePath];
       // Normalize path separators to match OS and convert to lowercase on Windows
       const normalizedPath = filePath.replace(/[\/\\]/g, path.sep);
       const fullPath = path.join(gameDirectory, normalizedPath);
 
-      // On Windows, do case-insensitive path existence check
-      const pathExists =
+      // On Windows, do case-insensitive path lookups
+      const candidates =
         process.platform === "win32"
-          ? fs.existsSync(fullPath.toLowerCase()) ||
-            fs.existsSync(fullPath.toUpperCase()) ||
-            fs.existsSync(fullPath)
-          : fs.existsSync(fullPath);
+          ? [fullPath, fullPath.toLowerCase(), fullPath.toUpperCase()]
+          : [fullPath];
+      let stat = null;
+      for (const candidate of candidates) {
+        try {
+          stat = await fs.promises.stat(candidate, { bigint: true });
+          break;
+        } catch (err) {
+          continue;
+        }
+      }
 
-      if (!pathExists) {
+      if (!stat) {
         verifyErrors.push({
           file: filePath,
           error: "File not found",
-          expected_size: filemap[filePath].size,
+          expected_size: entry.size,
+        });
+        continue;
+      }
+      if (stat.isDirectory()) {
+        continue;
+      }
+      // Stamps match the ones AscendaraVerification records: mtime in microseconds and the inode
+      // (a full-path stat on both sides, so Windows reports the real file index rather than 0)
+      const size = Number(stat.size);
+      const mtime = Number(stat.mtimeNs / 1000n);
+      const inode = String(stat.ino);
+      if (entry.mtime === mtime && entry.inode === inode && entry.size === size) {
+        continue; // Unchanged since its last successful check
+      }
+      if (size !== entry.size) {
+        verifyErrors.push({
+          file: filePath,
+          error: `Size mismatch: expected ${entry.size}, got ${size}`,
+          expected_size: entry.size,
+          actual_size: size,
         });
+        continue;
       }
+      entry.mtime = mtime;
+      entry.inode = inode;
+      delete entry.hashed; // Only its size was checked this time
+      stampsChanged = true;
+    }
+    if (stampsChanged) {
+      fs.writeFileSync(filemapPath, JSON.stringify(filemap, null, 4));
     }
 
     if (verifyErrors.length > 0) {
@@ -2173,9 +2210,18 @@ ipcMain.handle(
           gameDirectory = testPath;
           console.log(`Found existing game directory at: ${gameDirectory}`);
 
+          // With a filemap the GoFile and direct downloaders update in place, writing only
+          // changed files and removing the ones the new version dropped. The torrent
+          // handler has no such step, so its updates still start from a clean folder
+          const updatesInPlace =
+            settings.gameSource !== "fitgirl" && !link.startsWith("magnet:");
+          const files = await fs.promises.readdir(gameDirectory);
+          if (updatesInPlace && files.includes("filemap.ascendara.json")) {
+            console.log(`Filemap found - keeping existing files for an in-place update`);
+            break;
+          }
           // Delete all contents except game.ascendara.json
           console.log(`Starting cleanup of existing game directory`);
-          const files = await fs.promises.readdir(gameDirectory);
           console.log(`Found ${files.length} files/directories to process`);
           for (const file of files) {
             if (file !== `${sanitizedGame}.ascendara.json`) {
@@ -3132,7 +3178,7 @@ ipcMain.handle("install-python", async () => {
           updateProgress(40);
 
           // Install pip packages
-          const packages = ["requests", "psutil", "pypresence", "patool", "pySmartDL"];
+          const packages = ["requests", "psutil", "pypresence", "patool", "pySmartDL", "py7zr"];
 
           try {
             const pipCommand = process.platform === "darwin" ? "pip3" : "pip3";
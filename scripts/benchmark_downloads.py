@@ -0,0 +1,373 @@
+# This script benchmarks the downloader binaries against a local mock file host,
+# so their throughput can be measured reproducibly and compared between changes.
+# The host imitates the GoFile accounts/contents API, Buzzheavier's hx-redirect
+# flow and plain direct links, with configurable latency, per-connection
+# bandwidth, Range support and injected failures. Every run launches the binary
+# the way the app does, with its own home folder so the real token cache, logs
+# and settings are never touched, and reports MB/s, CPU seconds per MB and
+# time to first byte.
+
+# Example: python scripts/benchmark_downloads.py --size 512 --latency 40 --bandwidth 25 --runs 3
+
+import os
+import re
+import sys
+import json
+import time
+import random
+import shutil
+import zipfile
+import tempfile
+import threading
+import statistics
+import subprocess
+from argparse import ArgumentParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'binaries', 'AscendaraDownloader', 'src')
+BINARIES = {
+    'gofile': 'AscendaraGofileHelper.py',
+    'buzzheavier': 'AscendaraDownloader.py',
+    'direct': 'AscendaraDownloader.py',
+}
+GAME = "BenchmarkGame"
+RELEASE_NAME = "release.zip"
+CHUNK_SIZE = 64 * 1024
+MB = 1024 * 1024
+
+
+class MockHost:
+    """Serves one release file under every provider's URL scheme, with the configured network conditions."""
+    def __init__(self, release_path, volumes, latency=0.0, bandwidth=0, ranges=True, error_rate=0.0, drop_rate=0.0, seed=None):
+        self.release_path = release_path
+        self.volumes = volumes  # {name: (offset, length)} of the GoFile volumes within the release file
+        self.latency = latency
+        self.bandwidth = bandwidth  # Bytes per second per connection, 0 for unlimited
+        self.ranges = ranges
+        self.error_rate = error_rate
+        self.drop_rate = drop_rate
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.reset()
+        host = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_POST(self):
+                host.handle(self)
+
+            def do_HEAD(self):
+                host.handle(self)
+
+            def do_GET(self):
+                host.handle(self)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.base = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def reset(self):
+        with self.lock:
+            self.first_byte = None
+            self.bytes_sent = 0
+            self.requests = 0
+            self.failures = 0
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def urls(self):
+        return {
+            'gofile': f"{self.base}/d/release",
+            # The downloader recognises Buzzheavier by its domain anywhere in the URL
+            'buzzheavier': f"{self.base}/buzzheavier.com/release",
+            'direct': f"{self.base}/files/{RELEASE_NAME}",
+        }
+
+    def handle(self, request):
+        with self.lock:
+            self.requests += 1
+        if self.latency:
+            time.sleep(self.latency)
+        path = request.path.split('?')[0]
+        if path == "/accounts" and request.command == "POST":
+            return self._send_json(request, {"status": "ok", "data": {"id": "benchmark", "token": "benchmark-token"}})
+        if path == "/contents/release":
+            children = {name: {"id": name, "type": "file", "name": name, "size": length, "link": f"{self.base}/download/{name}"}
+                        for name, (_, length) in self.volumes.items()}
+            return self._send_json(request, {"status": "ok", "data": {"id": "release", "type": "folder", "name": GAME,
+                                                                     "children": children}})
+        if path == "/buzzheavier.com/release":
+            return self._send(request, 200, f"<html><head><title>{RELEASE_NAME}</title></head></html>".encode(),
+                              {"Content-Type": "text/html"})
+        if path == "/buzzheavier.com/release/download" and request.headers.get("hx-request"):
+            return self._send(request, 204, b"", {"hx-redirect": f"{self.base}/files/{RELEASE_NAME}"})
+        if path == f"/files/{RELEASE_NAME}":
+            return self._send_file(request, 0, os.path.getsize(self.release_path))
+        if path.startswith("/download/") and path[len("/download/"):] in self.volumes:
+            return self._send_file(request, *self.volumes[path[len("/download/"):]])
+        self._send(request, 404, b"")
+
+    def _send(self, request, status, body, headers=None):
+        request.send_response(status)
+        for key, value in (headers or {}).items():
+            request.send_header(key, value)
+        request.send_header("Content-Length", str(len(body)))
+        request.end_headers()
+        if request.command != "HEAD":
+            request.wfile.write(body)
+
+    def _send_json(self, request, data):
+        self._send(request, 200, json.dumps(data).encode(), {"Content-Type": "application/json"})
+
+    def _send_file(self, request, offset, length):
+        start, end = 0, length - 1
+        match = re.match(r"bytes=(\d*)-(\d*)$", request.headers.get("Range", ""))
+        headers = {"Content-Type": "application/octet-stream"}
+        if self.ranges:
+            headers["Accept-Ranges"] = "bytes"
+        status = 200
+        if match and self.ranges:
+            if match.group(1):
+                start = int(match.group(1))
+                end = min(int(match.group(2)), length - 1) if match.group(2) else length - 1
+            else:
+                start = max(0, length - int(match.group(2)))
+            if start >= length:
+                return self._send(request, 416, b"", {"Content-Range": f"bytes */{length}"})
+            status = 206
+            headers["Content-Range"] = f"bytes {start}-{end}/{length}"
+        count = end - start + 1
+        if request.command == "GET":
+            with self.lock:
+                failure = self.random.random()
+                cut = self.random.randint(0, count - 1) if failure < self.drop_rate else None
+                if failure >= self.drop_rate and failure < self.drop_rate + self.error_rate:
+                    self.failures += 1
+                    cut = -1
+            if cut == -1:
+                return self._send(request, 503, b"", {"Retry-After": "1"})
+        request.send_response(status)
+        for key, value in headers.items():
+            request.send_header(key, value)
+        request.send_header("Content-Length", str(count))
+        request.end_headers()
+        if request.command == "HEAD":
+            return
+        sent = 0
+        started = time.monotonic()
+        with open(self.release_path, 'rb') as f:
+            f.seek(offset + start)
+            while sent < count:
+                size = min(CHUNK_SIZE, count - sent)
+                if cut is not None:
+                    size = min(size, cut - sent)
+                    if size <= 0:
+                        # Closing mid-body is what a dropped connection looks like to the client
+                        with self.lock:
+                            self.failures += 1
+                        request.close_connection = True
+                        return
+                data = f.read(size)
+                try:
+                    request.wfile.write(data)
+                except OSError:
+                    return  # The client gave up on this connection
+                sent += len(data)
+                with self.lock:
+                    if self.first_byte is None:
+                        self.first_byte = time.monotonic()
+                    self.bytes_sent += len(data)
+                if self.bandwidth:
+                    # Sleep until this connection is back under its rate
+                    ahead = sent / self.bandwidth - (time.monotonic() - started)
+                    if ahead > 0:
+                        time.sleep(ahead)
+
+
+def build_release(work_dir, size, files, volumes):
+    """Write a stored zip of incompressible files, like most game data, split into GoFile volumes.
+
+    Returns the release path, its volumes and the {file name: size} it extracts to.
+    """
+    release_path = os.path.join(work_dir, RELEASE_NAME)
+    members = {}
+    file_size = max(1, size // files)
+    with zipfile.ZipFile(release_path, 'w', zipfile.ZIP_STORED) as zip_ref:
+        for index in range(files):
+            name = f"data/chunk_{index:04d}.bin"
+            with zip_ref.open(f"{GAME}/{name}", 'w', force_zip64=True) as member:
+                written = 0
+                while written < file_size:
+                    block = os.urandom(min(MB, file_size - written))
+                    member.write(block)
+                    written += len(block)
+            members[os.path.basename(name)] = file_size
+    total = os.path.getsize(release_path)
+    if volumes <= 1:
+        return release_path, {RELEASE_NAME: (0, total)}, members
+    # .zip.001 volumes are plain byte ranges of one archive, served straight from the release file
+    volume_size = -(-total // volumes)
+    parts = {}
+    for index in range(volumes):
+        offset = index * volume_size
+        if offset < total:
+            parts[f"{RELEASE_NAME}.{index + 1:03d}"] = (offset, min(volume_size, total - offset))
+    return release_path, parts, members
+
+
+def read_timings(home):
+    # Each binary appends one record per run to the log directory of the home it ran with
+    if sys.platform == "win32":
+        log_dir = os.path.join(home, "AppData", "Roaming", "Ascendara by tagoWorks")
+    else:
+        log_dir = os.path.join(home, ".config", "Ascendara by tagoWorks")
+    try:
+        with open(os.path.join(log_dir, "downloadtimings.jsonl"), 'r', encoding='utf-8') as f:
+            lines = f.read().splitlines()
+    except FileNotFoundError:
+        return None
+    return json.loads(lines[-1]) if lines else None
+
+
+def check_install(download_dir, members):
+    """True when every file of the release is in the game folder with its full size."""
+    found = {}
+    for root, _, names in os.walk(download_dir):
+        for name in names:
+            found[name] = os.path.getsize(os.path.join(root, name))
+    return all(found.get(name) == size for name, size in members.items())
+
+
+def run_once(provider, host, members, payload, work_dir, timeout):
+    run_dir = tempfile.mkdtemp(prefix=f"{provider}-", dir=work_dir)
+    home = os.path.join(run_dir, "home")
+    download_dir = os.path.join(run_dir, "games")
+    os.makedirs(os.path.join(home, "AppData", "Roaming"))
+    os.makedirs(download_dir)
+    env = dict(os.environ, HOME=home, USERPROFILE=home, APPDATA=os.path.join(home, "AppData", "Roaming"),
+               GF_API_URL=host.base)
+    command = [sys.executable, os.path.join(SRC_DIR, BINARIES[provider]), host.urls()[provider], GAME,
+               "false", "false", "false", "false", "1.0", f"{payload / MB:.0f} MB", download_dir]
+    host.reset()
+    started = time.monotonic()
+    with open(os.path.join(run_dir, "output.log"), 'w', encoding='utf-8') as output:
+        try:
+            exit_code = subprocess.run(command, cwd=SRC_DIR, env=env, stdout=output, stderr=subprocess.STDOUT,
+                                       timeout=timeout).returncode
+        except subprocess.TimeoutExpired:
+            exit_code = "timeout"
+    elapsed = time.monotonic() - started
+    timings = read_timings(home) or {}
+    transfer = timings.get("phases", {}).get("transfer", {})
+    ok = exit_code == 0 and timings.get("status") == "done" and check_install(download_dir, members)
+    if not ok:
+        print(f"  {provider} run failed (exit code {exit_code}), output and logs kept in {run_dir}")
+    result = {
+        "provider": provider,
+        "ok": ok,
+        "seconds": round(elapsed, 3),
+        "mbPerSecond": round(payload / MB / elapsed, 2),
+        "transferMbPerSecond": round(transfer.get("avgRate", 0) / MB, 2),
+        "cpuSecondsPerMb": round(timings["cpuSeconds"] / (payload / MB), 4) if "cpuSeconds" in timings else None,
+        # Measured from launch, so it includes interpreter startup and the resolve and probe requests
+        "ttfbMs": round((host.first_byte - started) * 1000) if host.first_byte else None,
+        "wireMb": round(host.bytes_sent / MB, 2),
+        "requests": host.requests,
+        "injectedFailures": host.failures,
+        "retries": timings.get("retries"),
+        "phases": {name: phase["seconds"] for name, phase in timings.get("phases", {}).items()},
+    }
+    if ok:
+        shutil.rmtree(run_dir, ignore_errors=True)
+    return result
+
+
+def print_table(results):
+    columns = [("provider", "provider", "{}"), ("ok", "ok", "{}"), ("seconds", "wall s", "{:.2f}"),
+               ("mbPerSecond", "MB/s", "{:.1f}"), ("transferMbPerSecond", "xfer MB/s", "{:.1f}"),
+               ("cpuSecondsPerMb", "CPU s/MB", "{:.4f}"), ("ttfbMs", "TTFB ms", "{}"), ("wireMb", "wire MB", "{:.1f}"),
+               ("injectedFailures", "faults", "{}"), ("retries", "retries", "{}")]
+    rows = [[label for _, label, _ in columns]]
+    for result in results:
+        rows.append(["-" if result[key] is None else fmt.format(result[key]) for key, _, fmt in columns])
+    widths = [max(len(row[index]) for row in rows) for index in range(len(columns))]
+    for row in rows:
+        print("  ".join(cell.rjust(width) for cell, width in zip(row, widths)))
+
+
+def main():
+    parser = ArgumentParser(description="Benchmark the Ascendara downloader binaries against a local mock file host.")
+    parser.add_argument("--providers", default="gofile,buzzheavier,direct", help="Comma separated providers to run")
+    parser.add_argument("--runs", type=int, default=1, help="Runs per provider")
+    parser.add_argument("--size", type=int, default=256, help="Release size in MB")
+    parser.add_argument("--files", type=int, default=16, help="Files in the release")
+    parser.add_argument("--volumes", type=int, default=1, help="Volumes GoFile serves the release as (.zip.001, ...)")
+    parser.add_argument("--latency", type=float, default=0, help="Milliseconds added before every response")
+    parser.add_argument("--bandwidth", type=float, default=0, help="MB/s per connection, 0 for unlimited")
+    parser.add_argument("--no-ranges", action="store_true", help="Ignore Range headers and never advertise them")
+    parser.add_argument("--error-rate", type=float, default=0, help="Share of file requests answered with a 503")
+    parser.add_argument("--drop-rate", type=float, default=0, help="Share of file requests cut off mid-body")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for the injected failures")
+    parser.add_argument("--timeout", type=int, default=1800, help="Seconds before a run is abandoned")
+    parser.add_argument("--json", help="Also write every result to this JSON file")
+    args = parser.parse_args()
+
+    providers = [provider.strip() for provider in args.providers.split(",") if provider.strip()]
+    unknown = [provider for provider in providers if provider not in BINARIES]
+    if unknown:
+        parser.error(f"unknown provider(s): {', '.join(unknown)}")
+
+    work_dir = tempfile.mkdtemp(prefix="ascendara-benchmark-")
+    release_path = os.path.join(work_dir, RELEASE_NAME)
+    try:
+        print(f"Building a {args.size} MB release of {args.files} file(s)...")
+        release_path, volumes, members = build_release(work_dir, args.size * MB, args.files, args.volumes)
+        payload = os.path.getsize(release_path)
+        host = MockHost(release_path, volumes, latency=args.latency / 1000, bandwidth=args.bandwidth * MB,
+                        ranges=not args.no_ranges, error_rate=args.error_rate, drop_rate=args.drop_rate, seed=args.seed)
+        print(f"Mock host at {host.base}: {args.latency:g} ms latency, "
+              f"{f'{args.bandwidth:g} MB/s' if args.bandwidth else 'unlimited'} per connection, "
+              f"ranges {'off' if args.no_ranges else 'on'}, {args.error_rate:.0%} errors, {args.drop_rate:.0%} drops")
+        results = []
+        try:
+            for provider in providers:
+                for run in range(1, args.runs + 1):
+                    print(f"  {provider} run {run}/{args.runs}...")
+                    results.append(run_once(provider, host, members, payload, work_dir, args.timeout))
+        finally:
+            host.close()
+    finally:
+        if os.path.exists(release_path):
+            os.remove(release_path)
+        # Failed runs keep their folders for inspection
+        if not os.listdir(work_dir):
+            os.rmdir(work_dir)
+
+    print()
+    print_table(results)
+    if args.runs > 1:
+        print()
+        print("Medians of successful runs:")
+        for provider in providers:
+            runs = [result for result in results if result["provider"] == provider and result["ok"]]
+            if runs:
+                print(f"  {provider}: {statistics.median(r['mbPerSecond'] for r in runs):.1f} MB/s, "
+                      f"{statistics.median(r['cpuSecondsPerMb'] or 0 for r in runs):.4f} CPU s/MB, "
+                      f"{statistics.median(r['ttfbMs'] or 0 for r in runs):.0f} ms TTFB")
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({"settings": vars(args), "payloadBytes": payload, "results": results}, f, indent=2)
+        print(f"\nResults written to {args.json}")
+    if not all(result["ok"] for result in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
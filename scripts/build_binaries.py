@@ -0,0 +1,104 @@
+# This script builds the Python binaries into single-file executables with PyInstaller,
+# writing each one to binaries/<name>/dist where the app looks for it on Windows.
+# The translator and torrent handler import shared modules (AscendaraHttpClient,
+# AscendaraProgress, ...) that live with the downloader binaries; in the source tree
+# they find them through a sys.path fallback, which a frozen build can't use, so the
+# downloader folder is put on PyInstaller's search path and every shared module a
+# binary imports is passed as a hidden import. The packages in requirements.txt are
+# installed first so PyInstaller can bundle them.
+
+# Usage: python scripts/build_binaries.py [AscendaraTorrentHandler AscendaraLanguageTranslation ...]
+
+import os
+import re
+import sys
+import shutil
+import tempfile
+import subprocess
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BINARIES_DIR = os.path.join(ROOT_DIR, 'binaries')
+SHARED_DIR = os.path.join(BINARIES_DIR, 'AscendaraDownloader', 'src')
+REQUIREMENTS = os.path.join(ROOT_DIR, 'requirements.txt')
+
+# Binary folder -> entry scripts in its src folder, each built to <script name>.exe
+ENTRY_POINTS = {
+    'AscendaraDownloader': ['AscendaraDownloader.py', 'AscendaraGofileHelper.py'],
+    'AscendaraCrashReporter': ['AscendaraCrashReporter.py'],
+    'AscendaraGameHandler': ['AscendaraGameHandler.py'],
+    'AscendaraLanguageTranslation': ['AscendaraLanguageTranslation.py'],
+    'AscendaraNotificationHelper': ['AscendaraNotificationHelper.py'],
+    'AscendaraTorrentHandler': ['AscendaraTorrentHandler.py'],
+}
+
+IMPORT_PATTERN = re.compile(r'^\s*(?:from|import)\s+(Ascendara\w+)', re.MULTILINE)
+
+
+def shared_imports(script_path, seen=None):
+    """Shared modules script_path imports from the downloader folder, including what those import in turn."""
+    seen = set() if seen is None else seen
+    with open(script_path, 'r', encoding='utf-8') as f:
+        names = IMPORT_PATTERN.findall(f.read())
+    for name in names:
+        module_path = os.path.join(SHARED_DIR, f"{name}.py")
+        if name not in seen and os.path.isfile(module_path) and os.path.abspath(module_path) != os.path.abspath(script_path):
+            seen.add(name)
+            shared_imports(module_path, seen)
+    return seen
+
+
+def install_requirements():
+    print(f"Installing build dependencies from {REQUIREMENTS}")
+    try:
+        subprocess.run([sys.executable, '-m', 'pip', 'install', '-r', REQUIREMENTS, 'pyinstaller'], check=True)
+        return True
+    except subprocess.CalledProcessError as e:
+        print(f"Installing dependencies failed with error: {e}")
+        return False
+
+
+def build(binary, script):
+    src_dir = os.path.join(BINARIES_DIR, binary, 'src')
+    script_path = os.path.join(src_dir, script)
+    dist_dir = os.path.join(BINARIES_DIR, binary, 'dist')
+    work_dir = tempfile.mkdtemp(prefix='ascendara-pyinstaller-')
+    command = [
+        sys.executable, '-m', 'PyInstaller', '--onefile', '--noconfirm',
+        '--distpath', dist_dir, '--workpath', work_dir, '--specpath', work_dir,
+        '--paths', SHARED_DIR,
+    ]
+    hidden = sorted(shared_imports(script_path))
+    for name in hidden:
+        command += ['--hidden-import', name]
+    icon_path = os.path.join(src_dir, 'ascendara.ico')
+    if os.path.isfile(icon_path):
+        command += ['--icon', icon_path]
+    command.append(script_path)
+    print(f"Building {script} into {dist_dir}" + (f" with {', '.join(hidden)}" if hidden else ""))
+    try:
+        subprocess.run(command, check=True, cwd=src_dir)
+        return True
+    except subprocess.CalledProcessError as e:
+        print(f"Build of {script} failed with error: {e}")
+        return False
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def main():
+    selected = sys.argv[1:] or list(ENTRY_POINTS)
+    unknown = [binary for binary in selected if binary not in ENTRY_POINTS]
+    if unknown:
+        print(f"Unknown binaries: {', '.join(unknown)}. Choose from: {', '.join(ENTRY_POINTS)}")
+        sys.exit(1)
+    if not install_requirements():
+        sys.exit(1)
+    failed = [script for binary in selected for script in ENTRY_POINTS[binary] if not build(binary, script)]
+    if failed:
+        print(f"Failed to build: {', '.join(failed)}")
+        sys.exit(1)
+    print("All binaries built successfully")
+
+
+if __name__ == '__main__':
+    main()